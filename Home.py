@@ -5,8 +5,12 @@ from sections.clientes import render_clientes
 from sections.jurisprudencias import render_jurisprudencias
 from sections.empresas import render_empresas
 from utils.auth_manager import check_authentication, handle_logout
+from utils.logger import setup_logger
 import os
 
+# Logging em fila (idempotente: o Streamlit reexecuta este arquivo a cada interação)
+setup_logger()
+
 def render_sidebar():
     """Renderiza a barra lateral com a estrutura definida"""
     # Logo
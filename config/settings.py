@@ -1,15 +1,72 @@
 import streamlit as st
 
-# Configurações do Supabase
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
+# Backend do banco: "supabase" (padrão) ou "sqlite" (local, para testes e benchmarks offline)
+DATABASE_BACKEND = st.secrets.get("DATABASE_BACKEND", "supabase")
+SQLITE_DATABASE_PATH = st.secrets.get("SQLITE_DATABASE_PATH", "data/smartlegal.db")
+
+# Configurações do Supabase (não são necessárias com o backend SQLite)
+SUPABASE_URL = st.secrets.get("SUPABASE_URL", "")
+SUPABASE_KEY = st.secrets.get("SUPABASE_KEY", "")
+
+# Pool de conexões HTTP compartilhado com o Supabase
+SUPABASE_POOL_MAX_CONNECTIONS = int(st.secrets.get("SUPABASE_POOL_MAX_CONNECTIONS", 20))
+SUPABASE_POOL_MAX_KEEPALIVE = int(st.secrets.get("SUPABASE_POOL_MAX_KEEPALIVE", 10))
+SUPABASE_POOL_KEEPALIVE_EXPIRY = float(st.secrets.get("SUPABASE_POOL_KEEPALIVE_EXPIRY", 60.0))
+
+# Cache das tabelas de referência (companhiasAereas, jurisprudenciaAereo)
+REFERENCE_CACHE_TTL = float(st.secrets.get("REFERENCE_CACHE_TTL", 600.0))
+REFERENCE_CACHE_MAXSIZE = int(st.secrets.get("REFERENCE_CACHE_MAXSIZE", 64))
+
+# Índice local de busca de clientes: intervalo (s) para buscar clientes novos
+CLIENT_INDEX_REFRESH_INTERVAL = float(st.secrets.get("CLIENT_INDEX_REFRESH_INTERVAL", 60.0))
+
+# Índice de busca textual das jurisprudências: intervalo (s) para reconstruí-lo
+# do banco (as alterações feitas por este processo já entram na hora)
+JURISPRUDENCIA_INDEX_REFRESH_INTERVAL = float(st.secrets.get("JURISPRUDENCIA_INDEX_REFRESH_INTERVAL", 1800.0))
+
+# Sincronização incremental de clientes (sql/client_sync.sql): margem (s) ao
+# reler alterações recentes e por quantos dias os registros de exclusão ficam no banco
+CLIENT_SYNC_OVERLAP = float(st.secrets.get("CLIENT_SYNC_OVERLAP", 10.0))
+CLIENT_TOMBSTONE_RETENTION_DAYS = float(st.secrets.get("CLIENT_TOMBSTONE_RETENTION_DAYS", 30.0))
+
+# Métricas do SupabaseManager: chamadas acima deste tempo (ms) são logadas como lentas
+SLOW_QUERY_THRESHOLD_MS = float(st.secrets.get("SLOW_QUERY_THRESHOLD_MS", 500.0))
+METRICS_RESERVOIR_SIZE = int(st.secrets.get("METRICS_RESERVOIR_SIZE", 1024))
+
+# Novas tentativas (backoff exponencial com jitter) e disjuntor do Supabase
+SUPABASE_RETRY_MAX_ATTEMPTS = int(st.secrets.get("SUPABASE_RETRY_MAX_ATTEMPTS", 3))
+SUPABASE_RETRY_BASE_DELAY = float(st.secrets.get("SUPABASE_RETRY_BASE_DELAY", 0.2))
+SUPABASE_RETRY_MAX_DELAY = float(st.secrets.get("SUPABASE_RETRY_MAX_DELAY", 2.0))
+SUPABASE_CIRCUIT_FAILURE_THRESHOLD = int(st.secrets.get("SUPABASE_CIRCUIT_FAILURE_THRESHOLD", 5))
+SUPABASE_CIRCUIT_RECOVERY_TIMEOUT = float(st.secrets.get("SUPABASE_CIRCUIT_RECOVERY_TIMEOUT", 30.0))
+
+# Logging (utils/logger.py): nível, pasta, rotação do arquivo por tamanho e
+# amostragem das mensagens DEBUG repetidas (após as N primeiras, 1 a cada RATE)
+LOG_LEVEL = st.secrets.get("LOG_LEVEL", "INFO")
+LOG_DIR = st.secrets.get("LOG_DIR", "logs")
+LOG_FILE_MAX_BYTES = int(st.secrets.get("LOG_FILE_MAX_BYTES", 10 * 1024 * 1024))
+LOG_FILE_BACKUP_COUNT = int(st.secrets.get("LOG_FILE_BACKUP_COUNT", 5))
+LOG_DEBUG_SAMPLE_RATE = int(st.secrets.get("LOG_DEBUG_SAMPLE_RATE", 10))
+LOG_DEBUG_SAMPLE_BURST = int(st.secrets.get("LOG_DEBUG_SAMPLE_BURST", 20))
 
 # Configurações do Google
 GOOGLE_CREDENTIALS = st.secrets["GOOGLE_CREDENTIALS"]
+# Token de acesso compartilhado entre os processos (arquivo) e antecedência (s)
+# com que é renovado em segundo plano
+GOOGLE_TOKEN_CACHE_PATH = st.secrets.get("GOOGLE_TOKEN_CACHE_PATH", "data/google_token.json")
+GOOGLE_TOKEN_REFRESH_MARGIN = float(st.secrets.get("GOOGLE_TOKEN_REFRESH_MARGIN", 300.0))
 SHEETS_SCOPE = ['https://www.googleapis.com/auth/spreadsheets']
 DRIVE_SCOPE = ['https://www.googleapis.com/auth/drive']
 DOCS_SCOPE = ['https://www.googleapis.com/auth/documents']
 
+# Cache local dos IDs das pastas do Drive (SQLite) e por quanto tempo (s) uma
+# pasta confirmada no Drive dispensa nova verificação
+DRIVE_FOLDER_CACHE_PATH = st.secrets.get("DRIVE_FOLDER_CACHE_PATH", "data/drive_folders.db")
+DRIVE_FOLDER_VERIFY_INTERVAL = float(st.secrets.get("DRIVE_FOLDER_VERIFY_INTERVAL", 7 * 24 * 3600.0))
+
+# Cópias locais dos templates baixados do Drive (ex.: petição de atraso de voo)
+TEMPLATE_CACHE_DIR = st.secrets.get("TEMPLATE_CACHE_DIR", "data/templates")
+
 # IDs das planilhas do Google Sheets
 SHEET_ID_1 = st.secrets["SHEET_ID_1"]
 SHEET_ID_2 = st.secrets["SHEET_ID_2"]
@@ -0,0 +1,98 @@
+"""
+Compara o preenchimento antigo (laço parágrafo × chave em paragraph.text)
+com utils.docx_renderer (render_document e CompiledTemplate) no template da
+petição
+
+Uso:
+    python scripts/bench_docx_renderer.py [caminho/do/template.docx] [repetições]
+
+Sem caminho, usa um documento sintético do tamanho da petição de atraso de
+voo (mesmas chaves, placeholders quebrados em runs, tabela e cabeçalho).
+O template real pode ser baixado do Drive (TEMPLATE_ATRASO_VOO_ID).
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+
+from utils.docx_renderer import CompiledTemplate, render_document  # noqa: E402
+
+PETITION_KEYS = [
+    'nome_completo', 'nacionalidade', 'estado_civil', 'profissao', 'rg', 'cpf', 'endereco', 'bairro',
+    'cidade', 'cep', 'nome_empresa_re', 'cnpj_empresa_re', 'endereco_empresa_re', 'dos_fatos',
+    'tempo_atraso', 'valor_danos_material', 'valor_danos_material_extenso', 'explicacao_danos_material',
+    'vara_civil', 'tribunal_jurisprudencia_deveres_transportador', 'jurisprudencia_deveres_transportador',
+    'tribunal_jurisprudencia_da_inteligencia', 'jurisprudencia_da_inteligencia',
+    'tribunal_jurisprudencia_da_responsabilidadea', 'jurisprudencia_da_responsabilidadea',
+    'tribunal_jurisprudencia_dos_prejuizos', 'jurisprudencia_dos_prejuizos', 'motivos_danos_moral',
+    'valor_dano_moral', 'valor_dano_moral_extenso', 'valor_dano_moral_material',
+    'valor_dano_moral_material_extenso', 'data_extenso'
+]
+
+
+def synthetic_petition(paragraphs: int = 300) -> Document:
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].add_run('{{nome_completo}} x {{nome_empresa_re}}')
+    for i in range(paragraphs):
+        paragraph = doc.add_paragraph()
+        paragraph.add_run('Texto corrido da petição, sem placeholders, parágrafo %s. ' % i * 3)
+        if i % 4 == 0:
+            key = PETITION_KEYS[i // 4 % len(PETITION_KEYS)]
+            middle = len(key) // 2
+            paragraph.add_run('{{' + key[:middle])
+            paragraph.add_run(key[middle:] + '}}').bold = True
+            paragraph.add_run(' continua.')
+    table = doc.add_table(rows=2, cols=2)
+    table.rows[0].cells[0].paragraphs[0].add_run('{{valor_dano_moral}}')
+    table.rows[1].cells[1].paragraphs[0].add_run('{{valor_danos_material}}')
+    return doc
+
+
+def legacy_render(doc, data):
+    for paragraph in doc.paragraphs:
+        for key, value in data.items():
+            if f'{{{{{key}}}}}' in paragraph.text:
+                paragraph.text = paragraph.text.replace(f'{{{{{key}}}}}', str(value))
+
+
+def bench(render, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        render()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    if path:
+        with open(path, 'rb') as f:
+            content = f.read()
+    else:
+        buffer = io.BytesIO()
+        synthetic_petition().save(buffer)
+        content = buffer.getvalue()
+    start = time.perf_counter()
+    compiled = CompiledTemplate.from_bytes(content, 'petição')
+    compile_ms = (time.perf_counter() - start) * 1000
+    data = {key: f'valor de {key}' for key in sorted(compiled.placeholder_keys.union(PETITION_KEYS))}
+
+    # Os dois primeiros leem o template a cada documento, como antes;
+    # o CompiledTemplate lê e indexa uma vez e só copia a cada documento
+    legacy_ms = bench(lambda: legacy_render(Document(io.BytesIO(content)), data), repeat)
+    renderer_ms = bench(lambda: render_document(Document(io.BytesIO(content)), data), repeat)
+    compiled_ms = bench(lambda: compiled.render(data), repeat)
+
+    print(f"Template: {len(content) // 1024} KB  chaves: {len(data)}  repetições: {repeat}")
+    print(f"Laço por chave:   {legacy_ms:8.2f} ms/documento (só corpo)")
+    print(f"render_document:  {renderer_ms:8.2f} ms/documento")
+    print(f"CompiledTemplate: {compiled_ms:8.2f} ms/documento (compilação única: {compile_ms:.2f} ms)")
+    print(f"Ganho:            {legacy_ms / renderer_ms:8.1f}x / {legacy_ms / compiled_ms:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 import streamlit as st
 from utils.supabase_manager import SupabaseManager
+from utils.async_supabase_manager import AsyncSupabaseManager
+from sections.case_selector import client_cases_loaded, load_client_cases, select_client_case
 from utils.audio_manager import AudioManager  # Vamos criar esse módulo
 from datetime import datetime
 import logging
@@ -9,13 +11,13 @@ import os
 from dotenv import load_dotenv
 import time
 from num2words import num2words
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
+from googleapiclient.http import MediaIoBaseUpload
 import io
-from docx import Document
 import re
 from pathlib import Path
-from google.oauth2 import service_account
+from utils.google_services import get_service
+from utils.template_cache import get_template_cache
+from config.settings import TEMPLATE_CACHE_DIR
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +30,7 @@ def search_client(search_term, supabase):
         clients = supabase.search_clients_by_partial_name(search_term)
         return clients
     except Exception as e:
-        logger.error(f"Erro ao buscar clientes: {str(e)}")
+        logger.error("Erro ao buscar clientes: %s", e)
         return []
 
 def render_client_section():
@@ -58,8 +60,32 @@ def render_client_section():
             )
             
             if selected_client:
-                # Salvar dados do cliente selecionado
-                st.session_state.selected_client_data = client_options[selected_client]
+                # A busca traz só o resumo. O que ainda não está na sessão ou no
+                # cache (dados completos do cliente, casos, empresas e
+                # jurisprudências) é carregado em paralelo; empresas e
+                # jurisprudências ficam no cache para as seções seguintes
+                client_id = client_options[selected_client]['id']
+                current = st.session_state.get('selected_client_data')
+                queries = {}
+                if not AsyncSupabaseManager.reference_cached('companhiasAereas'):
+                    queries['companies'] = lambda db: db.get_all_companies()
+                if not AsyncSupabaseManager.reference_cached('jurisprudenciaAereo'):
+                    queries['jurisprudencias'] = lambda db: db.get_jurisprudencias_aereo()
+                if not client_cases_loaded(client_id):
+                    queries['cases'] = lambda db: db.get_client_cases_page(client_id)
+                if not current or current.get('id') != client_id:
+                    queries['client'] = lambda db: db.get_client_by_id(client_id)
+                
+                try:
+                    prefetched = AsyncSupabaseManager.run(queries)
+                except Exception as e:
+                    logger.error("Erro ao carregar dados do cliente em paralelo: %s", e)
+                    prefetched = {}
+                
+                if 'client' in queries:
+                    client_data = prefetched.get('client') if 'client' in prefetched \
+                        else supabase.get_client_by_id(client_id)
+                    st.session_state.selected_client_data = client_data or client_options[selected_client]
                 
                 # Mostrar dados do cliente selecionado
                 st.write("**Dados do cliente selecionado:**")
@@ -85,29 +111,23 @@ def render_client_section():
                         if i >= metade:
                             st.write(f"**{key}:** {value}")
                 
-                # Buscar casos do cliente
-                client_cases = supabase.get_client_cases(st.session_state.selected_client_data['id'])
+                # Casos do cliente: primeira página (só chave e assunto) carregada
+                # acima, salvo em caso de erro; depois fica na sessão
+                client_cases = load_client_cases(
+                    supabase, st.session_state.selected_client_data['id'],
+                    first_page=prefetched.get('cases')
+                )
                 
-                if client_cases:
+                if client_cases['rows']:
                     st.markdown("---")
                     st.write("**Selecione o caso:**")
                     
-                    # Criar lista de opções para o selectbox de casos
-                    case_options = {
-                        f"{case.get('chave_caso', 'Sem chave')} - {case.get('assunto_caso', 'Sem assunto')}": case 
-                        for case in client_cases
-                    }
-                    
-                    # Dropdown para seleção do caso
-                    selected_case = st.selectbox(
-                        "Casos do cliente",
-                        options=list(case_options.keys()),
-                        key="case_select"
-                    )
+                    # O caso completo é lido só depois da seleção
+                    selected_case = select_client_case(supabase, client_cases)
                     
                     if selected_case:
                         # Salvar dados do caso selecionado
-                        st.session_state.selected_case_data = case_options[selected_case]
+                        st.session_state.selected_case_data = selected_case
                         
                         # Mostrar informações do caso
                         st.write("**Detalhes do caso:**")
@@ -173,15 +193,15 @@ def get_openai_key():
         
         # Log para debug (não mostra a chave completa)
         if key:
-            logger.info(f"Chave encontrada com tamanho: {len(key)}")
-            logger.info(f"Primeiros caracteres: {key[:10]}")
+            logger.info("Chave encontrada com tamanho: %s", len(key))
+            logger.info("Primeiros caracteres: %s", key[:10])
         else:
             logger.error("Chave não encontrada em st.secrets")
             
         return key
         
     except Exception as e:
-        logger.error(f"Erro ao obter chave da API: {str(e)}")
+        logger.error("Erro ao obter chave da API: %s", e)
         raise Exception(f"Erro ao obter chave da API: {str(e)}")
 
 def extract_flight_info(fatos_cliente):
@@ -249,11 +269,11 @@ def extract_flight_info(fatos_cliente):
             return flight_info
             
         except Exception as e:
-            logger.error(f"Erro na chamada da API OpenAI: {str(e)}")
+            logger.error("Erro na chamada da API OpenAI: %s", e)
             raise Exception("Erro ao processar o texto com a OpenAI. Por favor, tente novamente.")
             
     except Exception as e:
-        logger.error(f"Erro ao processar texto com OpenAI: {str(e)}")
+        logger.error("Erro ao processar texto com OpenAI: %s", e)
         raise e
 
 def generate_facts():
@@ -369,9 +389,126 @@ def generate_facts():
         return generated_facts
 
     except Exception as e:
-        logger.error(f"Erro ao gerar fatos: {str(e)}")
+        logger.error("Erro ao gerar fatos: %s", e)
         raise Exception(f"Erro ao gerar fatos: {str(e)}")
 
+# Seções de jurisprudência da petição: opção padrão (sem fatos para comparar),
+# chave do selectbox e chaves do session_state usadas no documento
+JURISPRUDENCIA_SECTIONS = [
+    {
+        'secao': "Deveres do Transportador",
+        'default': "cancelamento_voo_sem_aviso_indenizacao_10k",
+        'select_key': "jurisprudencia_select",
+        'tribunal_key': 'tribunal_jurisprudencia_deveres_transportador',
+        'texto_key': 'jurisprudencia_deveres_transportador'
+    },
+    {
+        'secao': "Da Inteligência",
+        'default': "atraso_conexao_internacional_24h_indenizacao_10k",
+        'select_key': "jurisprudencia_intel_select",
+        'tribunal_key': 'tribunal_jurisprudencia_da_inteligencia',
+        'texto_key': 'jurisprudencia_da_inteligencia'
+    },
+    {
+        'secao': "Da Responsabilidade",
+        'default': "atraso_voo_ma_assistencia_30h_indenizacao_15k",
+        'select_key': "jurisprudencia_resp_select",
+        'tribunal_key': 'tribunal_jurisprudencia_da_responsabilidadea',
+        'texto_key': 'jurisprudencia_da_responsabilidadea'
+    },
+    {
+        'secao': "Dos Prejuízos",
+        'default': "cancelamento_voo_internacional_24h_indenizacao_10k",
+        'select_key': "jurisprudencia_prej_select",
+        'tribunal_key': 'tribunal_jurisprudencia_dos_prejuizos',
+        'texto_key': 'jurisprudencia_dos_prejuizos'
+    },
+]
+
+# Campos do voo que descrevem o problema (entram na comparação com as jurisprudências)
+FLIGHT_INFO_RANKING_FIELDS = [
+    'tipo_voo', 'escala', 'tempo_atraso', 'motivo_voo', 'problema', 'local_problema',
+    'momento_informacao', 'compromisso_perdido', 'contexto', 'opcao_reacomodacao',
+    'auxilio_recebido', 'descricao_custos'
+]
+
+def rank_jurisprudencias_for_facts(supabase):
+    """
+    Ordena as jurisprudências de cada seção pela semelhança com os fatos gerados e os dados do voo
+
+    Returns:
+        Seção -> lista de {'id', 'score'}; vazio se ainda não há fatos
+    """
+    flight_info = st.session_state.get('flight_info') or {}
+    parts = [st.session_state.get('generated_facts') or '']
+    parts += [
+        str(flight_info.get(field)) for field in FLIGHT_INFO_RANKING_FIELDS
+        if flight_info.get(field) and flight_info.get(field) != "Não informado"
+    ]
+    text = '\n'.join(part for part in parts if part)
+    if not text.strip():
+        return {}
+    return supabase.rank_jurisprudencias(text, [section['secao'] for section in JURISPRUDENCIA_SECTIONS])
+
+def render_jurisprudencia_select(supabase, jurisprudencias, section, ranked=None):
+    """
+    Selectbox de jurisprudência de uma seção da petição
+
+    Com ranked (lista de {'id', 'score'}), as opções vêm da mais para a menos
+    parecida com os fatos e a primeira fica selecionada; sem ela, vale a
+    opção padrão da seção.
+    """
+    label = f"Selecione a Jurisprudência - Seção {section['secao']}"
+    try:
+        if not jurisprudencias:
+            st.info("Nenhuma jurisprudência encontrada")
+            return
+
+        # Criar dicionário com nome como chave e dados completos como valor
+        jurisprudencia_options = {
+            jurisprudencia['nome']: jurisprudencia
+            for jurisprudencia in jurisprudencias
+        }
+        options = list(jurisprudencia_options.keys())
+        scores = {}
+        if ranked:
+            position = {item['id']: i for i, item in enumerate(ranked)}
+            scores = {item['id']: item['score'] for item in ranked}
+            options.sort(key=lambda nome: position.get(jurisprudencia_options[nome]['id'], len(position)))
+            default_index = 0
+        else:
+            default_index = options.index(section['default']) if section['default'] in options else 0
+
+        def format_option(nome):
+            score = scores.get(jurisprudencia_options[nome]['id'])
+            return f"{nome} (relevância {score:.2f})" if score is not None else nome
+
+        # Dropdown para seleção da jurisprudência
+        selected = st.selectbox(
+            label,
+            options=options,
+            index=default_index,
+            format_func=format_option,
+            key=section['select_key']
+        )
+
+        if selected:
+            # A lista não traz o texto; busca a jurisprudência completa pelo ID
+            jurisprudencia_data = supabase.get_jurisprudencia_by_id(jurisprudencia_options[selected]['id'])
+
+            # Salvar no session_state
+            st.session_state[section['tribunal_key']] = jurisprudencia_data['Tribunal']
+            st.session_state[section['texto_key']] = jurisprudencia_data['texto']
+
+            # Mostrar tribunal e texto um embaixo do outro
+            st.write(f"**Tribunal:** {jurisprudencia_data['Tribunal']}")
+            st.write("**Texto:**")
+            st.markdown(jurisprudencia_data['texto'])
+
+    except Exception as e:
+        logger.error("Erro ao carregar jurisprudências: %s", e)
+        st.error("Erro ao carregar lista de jurisprudências")
+
 def render_facts_section():
     """Renderiza a seção de fatos do voo"""
     st.markdown("---")
@@ -420,7 +557,7 @@ def render_facts_section():
                     st.session_state.transcription = transcription
                     st.session_state.last_text = transcription  # Guardar último texto processado
                 except Exception as e:
-                    logger.error(f"Erro na transcrição: {str(e)}")
+                    logger.error("Erro na transcrição: %s", e)
                     st.error("Erro ao transcrever o áudio")
     
     # Campo editável com a transcrição
@@ -742,160 +879,28 @@ def render_facts_section():
     st.markdown("### 4. Vara Cível")
     vara_civil = st.text_input("Vara Cível", key="vara_civil")
 
-    # Seção Jurisprudência Seção Deveres do Transportador
-    st.markdown("### 5. Jurisprudência Seção Deveres do Transportador")
-    
+    # Seções 5 a 8: jurisprudências, ordenadas pela semelhança com os fatos
+    supabase = SupabaseManager()
     try:
-        supabase = SupabaseManager()
         jurisprudencias = supabase.get_jurisprudencias_aereo()
-        
-        if jurisprudencias:
-            # Criar dicionário com nome como chave e dados completos como valor
-            jurisprudencia_options = {
-                jurisprudencia['nome']: jurisprudencia 
-                for jurisprudencia in jurisprudencias
-            }
-            
-            # Definir o valor padrão
-            default_option = "cancelamento_voo_sem_aviso_indenizacao_10k"
-            default_index = list(jurisprudencia_options.keys()).index(default_option) if default_option in jurisprudencia_options else 0
-            
-            # Dropdown para seleção da jurisprudência
-            selected_jurisprudencia = st.selectbox(
-                "Selecione a Jurisprudência - Seção Deveres do Transportador",
-                options=list(jurisprudencia_options.keys()),
-                index=default_index,
-                key="jurisprudencia_select"
-            )
-            
-            if selected_jurisprudencia:
-                # Mostrar detalhes da jurisprudência selecionada
-                jurisprudencia_data = jurisprudencia_options[selected_jurisprudencia]
-                
-                # Salvar no session_state
-                st.session_state['tribunal_jurisprudencia_deveres_transportador'] = jurisprudencia_data['Tribunal']
-                st.session_state['jurisprudencia_deveres_transportador'] = jurisprudencia_data['texto']
-                
-                # Mostrar tribunal e texto um embaixo do outro
-                st.write(f"**Tribunal:** {jurisprudencia_data['Tribunal']}")
-                st.write("**Texto:**")
-                st.markdown(jurisprudencia_data['texto'])
-        else:
-            st.info("Nenhuma jurisprudência encontrada")
-            
-    except Exception as e:
-        logger.error(f"Erro ao carregar jurisprudências: {str(e)}")
-        st.error("Erro ao carregar lista de jurisprudências")
-
-    # Seção Jurisprudência Seção Da Inteligência
-    st.markdown("### 6. Jurisprudência Seção Da Inteligência")
-    
-    try:
-        if jurisprudencias:
-            # Definir o valor padrão
-            default_option = "atraso_conexao_internacional_24h_indenizacao_10k"
-            default_index = list(jurisprudencia_options.keys()).index(default_option) if default_option in jurisprudencia_options else 0
-            
-            # Dropdown para seleção da jurisprudência
-            selected_jurisprudencia_intel = st.selectbox(
-                "Selecione a Jurisprudência - Seção Da Inteligência",
-                options=list(jurisprudencia_options.keys()),
-                index=default_index,
-                key="jurisprudencia_intel_select"
-            )
-            
-            if selected_jurisprudencia_intel:
-                # Mostrar detalhes da jurisprudência selecionada
-                jurisprudencia_data_intel = jurisprudencia_options[selected_jurisprudencia_intel]
-                
-                # Salvar no session_state
-                st.session_state['tribunal_jurisprudencia_da_inteligencia'] = jurisprudencia_data_intel['Tribunal']
-                st.session_state['jurisprudencia_da_inteligencia'] = jurisprudencia_data_intel['texto']
-                
-                # Mostrar tribunal e texto um embaixo do outro
-                st.write(f"**Tribunal:** {jurisprudencia_data_intel['Tribunal']}")
-                st.write("**Texto:**")
-                st.markdown(jurisprudencia_data_intel['texto'])
-        else:
-            st.info("Nenhuma jurisprudência encontrada")
-            
     except Exception as e:
-        logger.error(f"Erro ao carregar jurisprudências: {str(e)}")
+        logger.error("Erro ao carregar jurisprudências: %s", e)
         st.error("Erro ao carregar lista de jurisprudências")
+        jurisprudencias = None
 
-    # Seção Jurisprudência Seção Da Responsabilidade
-    st.markdown("### 7. Jurisprudência Seção Da Responsabilidade")
-    
-    try:
-        if jurisprudencias:
-            # Definir o valor padrão
-            default_option = "atraso_voo_ma_assistencia_30h_indenizacao_15k"
-            default_index = list(jurisprudencia_options.keys()).index(default_option) if default_option in jurisprudencia_options else 0
-            
-            # Dropdown para seleção da jurisprudência
-            selected_jurisprudencia_resp = st.selectbox(
-                "Selecione a Jurisprudência - Seção Da Responsabilidade",
-                options=list(jurisprudencia_options.keys()),
-                index=default_index,
-                key="jurisprudencia_resp_select"
-            )
-            
-            if selected_jurisprudencia_resp:
-                # Mostrar detalhes da jurisprudência selecionada
-                jurisprudencia_data_resp = jurisprudencia_options[selected_jurisprudencia_resp]
-                
-                # Salvar no session_state
-                st.session_state['tribunal_jurisprudencia_da_responsabilidadea'] = jurisprudencia_data_resp['Tribunal']
-                st.session_state['jurisprudencia_da_responsabilidadea'] = jurisprudencia_data_resp['texto']
-                
-                # Mostrar tribunal e texto um embaixo do outro
-                st.write(f"**Tribunal:** {jurisprudencia_data_resp['Tribunal']}")
-                st.write("**Texto:**")
-                st.markdown(jurisprudencia_data_resp['texto'])
-        else:
-            st.info("Nenhuma jurisprudência encontrada")
-            
-    except Exception as e:
-        logger.error(f"Erro ao carregar jurisprudências: {str(e)}")
-        st.error("Erro ao carregar lista de jurisprudências")
+    ranking = {}
+    if jurisprudencias:
+        try:
+            ranking = rank_jurisprudencias_for_facts(supabase)
+        except Exception as e:
+            # Sem a ordenação, as seções voltam às opções padrão
+            logger.warning("Jurisprudências sem ordenação por relevância: %s", e)
 
-    st.markdown("---")
-    
-    # Seção Jurisprudência Seção Dos Prejuízos
-    st.markdown("### 8. Jurisprudência Seção Dos Prejuízos")
-    
-    try:
-        if jurisprudencias:
-            # Definir o valor padrão
-            default_option = "cancelamento_voo_internacional_24h_indenizacao_10k"
-            default_index = list(jurisprudencia_options.keys()).index(default_option) if default_option in jurisprudencia_options else 0
-            
-            # Dropdown para seleção da jurisprudência
-            selected_jurisprudencia_prej = st.selectbox(
-                "Selecione a Jurisprudência - Seção Dos Prejuízos",
-                options=list(jurisprudencia_options.keys()),
-                index=default_index,
-                key="jurisprudencia_prej_select"
-            )
-            
-            if selected_jurisprudencia_prej:
-                # Mostrar detalhes da jurisprudência selecionada
-                jurisprudencia_data_prej = jurisprudencia_options[selected_jurisprudencia_prej]
-                
-                # Salvar no session_state
-                st.session_state['tribunal_jurisprudencia_dos_prejuizos'] = jurisprudencia_data_prej['Tribunal']
-                st.session_state['jurisprudencia_dos_prejuizos'] = jurisprudencia_data_prej['texto']
-                
-                # Mostrar tribunal e texto um embaixo do outro
-                st.write(f"**Tribunal:** {jurisprudencia_data_prej['Tribunal']}")
-                st.write("**Texto:**")
-                st.markdown(jurisprudencia_data_prej['texto'])
-        else:
-            st.info("Nenhuma jurisprudência encontrada")
-            
-    except Exception as e:
-        logger.error(f"Erro ao carregar jurisprudências: {str(e)}")
-        st.error("Erro ao carregar lista de jurisprudências")
+    for number, section in enumerate(JURISPRUDENCIA_SECTIONS, start=5):
+        if number == 8:
+            st.markdown("---")
+        st.markdown(f"### {number}. Jurisprudência Seção {section['secao']}")
+        render_jurisprudencia_select(supabase, jurisprudencias, section, ranking.get(section['secao']))
 
     st.markdown("---")
     
@@ -918,7 +923,7 @@ def render_facts_section():
                 valor_extenso = valor_extenso.replace(" real", " reais")
             st.session_state['valor_dano_moral_extenso'] = valor_extenso
         except Exception as e:
-            logger.error(f"Erro ao converter valor para extenso: {str(e)}")
+            logger.error("Erro ao converter valor para extenso: %s", e)
     
     valor_danos_morais = st.number_input(
         "Valor dos Danos Morais (R$)",
@@ -976,7 +981,7 @@ def render_facts_section():
         st.session_state['valor_danos_material_extenso'] = valor_materiais_extenso  # Salvar no session_state
         st.write(f"**Valor por extenso:** {valor_materiais_extenso}")
     except Exception as e:
-        logger.error(f"Erro ao converter valor material para extenso: {str(e)}")
+        logger.error("Erro ao converter valor material para extenso: %s", e)
         st.error("Erro ao converter valor material para extenso")
     
     # 9.4 - Valor Total da Causa
@@ -997,7 +1002,7 @@ def render_facts_section():
         st.session_state['valor_dano_moral_material'] = f"R$ {valor_total_causa:.2f}"  # Salvar valor formatado
         st.write(f"**Valor por extenso:** {valor_total_extenso}")
     except Exception as e:
-        logger.error(f"Erro ao converter valor total para extenso: {str(e)}")
+        logger.error("Erro ao converter valor total para extenso: %s", e)
         st.error("Erro ao converter valor total para extenso")
     
     st.markdown("---")
@@ -1204,27 +1209,13 @@ def generate_and_save_petition(st_session_state):
             if not pasta_caso_id:
                 raise Exception("ID da pasta do caso não encontrado")
         
-        # Criar serviço do Google Drive
-        credentials_dict = json.loads(st.secrets["GOOGLE_CREDENTIALS"])
-        creds = service_account.Credentials.from_service_account_info(
-            credentials_dict,
-            scopes=['https://www.googleapis.com/auth/drive']
-        )
-        drive_service = build('drive', 'v3', credentials=creds)
+        # Serviço do Google Drive compartilhado pelo processo
+        drive_service = get_service('drive')
 
-        # Baixar o template
-        request = drive_service.files().get_media(
-            fileId=st.secrets["TEMPLATE_ATRASO_VOO_ID"]
+        # Template compilado em cache; só é baixado de novo se mudou no Drive
+        template = get_template_cache(TEMPLATE_CACHE_DIR).drive(
+            drive_service, st.secrets["TEMPLATE_ATRASO_VOO_ID"]
         )
-        
-        template_content = io.BytesIO()
-        downloader = MediaIoBaseDownload(template_content, request)
-        done = False
-        while done is False:
-            status, done = downloader.next_chunk()
-
-        # Carregar o documento
-        doc = Document(template_content)
 
         # Preparar os dados para substituição
         replace_dict = {
@@ -1263,11 +1254,9 @@ def generate_and_save_petition(st_session_state):
             'data_extenso': st_session_state.get('data_extenso', '')
         }
 
-        # Substituir os placeholders no documento
-        for paragraph in doc.paragraphs:
-            for key, value in replace_dict.items():
-                if f'{{{{{key}}}}}' in paragraph.text:
-                    paragraph.text = paragraph.text.replace(f'{{{{{key}}}}}', str(value))
+        # Preencher o template (corpo, tabelas, cabeçalhos e rodapés); placeholders
+        # sem valor em replace_dict ficam como estão no documento
+        doc = template.render(replace_dict)
 
         # Nome do arquivo com data e hora
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -1321,5 +1310,5 @@ def generate_and_save_petition(st_session_state):
         return file.get('webViewLink')
 
     except Exception as e:
-        logger.error(f"Erro ao gerar petição: {str(e)}")
+        logger.error("Erro ao gerar petição: %s", e)
         raise Exception(f"Erro ao gerar petição: {str(e)}") 
\ No newline at end of file
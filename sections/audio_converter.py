@@ -37,7 +37,7 @@ def setup_ffmpeg():
                     return True
         return False
     except Exception as e:
-        logger.error(f"Erro ao configurar FFmpeg: {str(e)}")
+        logger.error("Erro ao configurar FFmpeg: %s", e)
         return False
 
 def convert_audio(input_file, output_format):
@@ -101,7 +101,7 @@ def convert_audio(input_file, output_format):
         return converted_data
         
     except Exception as e:
-        logger.error(f"Erro na conversão do áudio: {str(e)}")
+        logger.error("Erro na conversão do áudio: %s", e)
         # Tentar limpar arquivos temporários em caso de erro
         try:
             if 'input_path' in locals():
@@ -149,4 +149,4 @@ def render_audio_converter():
                 
             except Exception as e:
                 st.error(str(e))
-                logger.error(f"Erro detalhado: {str(e)}") 
\ No newline at end of file
+                logger.error("Erro detalhado: %s", e) 
\ No newline at end of file
@@ -0,0 +1,65 @@
+import streamlit as st
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seletor de casos compartilhado por Atraso de Voo e Enviar Email. Os casos do
+# cliente são lidos em páginas (só chave e assunto) e acumulados na sessão;
+# o caso completo só é lido depois da seleção.
+
+def client_cases_loaded(client_id, key="case_select"):
+    """Indica se os casos do cliente já estão na sessão (dispensa nova consulta)"""
+    state = st.session_state.get(f"{key}_pages")
+    return bool(state) and state['client_id'] == client_id
+
+def load_client_cases(supabase, client_id, first_page=None, key="case_select"):
+    """
+    Retorna os casos do cliente já carregados na sessão ({'rows', 'next_cursor'})
+
+    Na primeira chamada para o cliente usa first_page (ex.: vinda do
+    carregamento paralelo) ou busca a primeira página.
+    """
+    state_key = f"{key}_pages"
+    if not client_cases_loaded(client_id, key):
+        page = first_page or supabase.get_client_cases_page(client_id)
+        st.session_state[state_key] = {
+            'client_id': client_id,
+            'rows': list(page['rows']),
+            'next_cursor': page['next_cursor']
+        }
+    return st.session_state[state_key]
+
+def select_client_case(supabase, cases, key="case_select"):
+    """
+    Selectbox dos casos carregados, com "Carregar mais casos" se houver próxima página
+
+    Returns:
+        O caso completo selecionado (lido de novo só quando a seleção muda)
+    """
+    case_options = {
+        f"{case.get('chave_caso') or 'Sem chave'} - {case.get('assunto_caso') or 'Sem assunto'}": case['id']
+        for case in cases['rows']
+    }
+
+    # Dropdown para seleção do caso
+    selected_case = st.selectbox(
+        "Casos do cliente",
+        options=list(case_options.keys()),
+        key=key
+    )
+
+    if cases['next_cursor'] is not None:
+        if st.button("Carregar mais casos", key=f"{key}_more"):
+            page = supabase.get_client_cases_page(cases['client_id'], cursor=cases['next_cursor'])
+            cases['rows'].extend(page['rows'])
+            cases['next_cursor'] = page['next_cursor']
+            st.rerun()
+
+    if not selected_case:
+        return None
+
+    case_id = case_options[selected_case]
+    current = st.session_state.get('selected_case_data')
+    if current and current.get('id') == case_id:
+        return current
+    return supabase.get_case_by_id(case_id)
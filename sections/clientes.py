@@ -1,8 +1,40 @@
 import streamlit as st
 from utils.supabase_manager import SupabaseManager
 from utils.error_handler import handle_error
+from utils.client_importer import ClientImporter, report_to_csv, STATUS_IMPORTED, STATUS_VALID
 import pandas as pd
 
+# Opções de paginação da grade de clientes
+PAGE_SIZES = [25, 50, 100]
+SORT_OPTIONS = {
+    "Nome": ('nome_completo', False),
+    "Mais recentes": ('created_at', True),
+    "Mais antigos": ('created_at', False)
+}
+
+# Colunas de baixa cardinalidade guardadas como categorias na cópia usada
+# para comparação (a grade editável recebe texto livre; ver render_clientes)
+CATEGORICAL_COLUMNS = {
+    'estado': [
+        "AC", "AL", "AP", "AM", "BA", "CE", "DF", "ES", "GO", "MA", "MT", "MS",
+        "MG", "PA", "PB", "PR", "PE", "PI", "RJ", "RN", "RS", "RO", "RR", "SC",
+        "SP", "SE", "TO"
+    ],
+    'estado_civil': ["Solteiro(a)", "Casado(a)", "Divorciado(a)", "Viúvo(a)"]
+}
+
+def to_categoricals(df):
+    """Converte as colunas de baixa cardinalidade para o tipo category"""
+    for col, categories in CATEGORICAL_COLUMNS.items():
+        if col in df.columns:
+            extra = [v for v in df[col].dropna().unique() if v not in categories]
+            df[col] = pd.Categorical(df[col], categories=categories + extra)
+    return df
+
+def from_categoricals(df):
+    """Volta as colunas category para object (o data_editor mostraria um selectbox)"""
+    return df.astype({col: object for col in CATEGORICAL_COLUMNS if col in df.columns})
+
 def validate_cpf(cpf):
     """Validates CPF format"""
     # Remove non-numeric characters
@@ -18,6 +50,7 @@ def process_client_update(edited_rows, original_rows):
     supabase = SupabaseManager()
     
     try:
+        rows_to_update = []
         for index, changes in edited_rows.items():
             if not changes:  # Skip if no changes
                 continue
@@ -36,12 +69,19 @@ def process_client_update(edited_rows, original_rows):
                 st.error(f"Email inválido na linha {index + 1}")
                 continue
             
-            # Update the client in Supabase
-            try:
-                supabase.update_client(client_id, changes)
-                st.success(f"Cliente {client_id} atualizado com sucesso!")
-            except Exception as e:
-                st.error(f"Erro ao atualizar cliente {client_id}: {str(e)}")
+            # Só o id e as colunas alteradas: o resto da linha fica como está no banco
+            rows_to_update.append({'id': original_row['id'], **changes})
+        
+        if not rows_to_update:
+            return
+        
+        # Update all clients in Supabase in a single batch
+        results = supabase.update_many('clientes', rows_to_update)
+        failed = [r for r in results if not r['ok']]
+        for result in failed:
+            st.error(f"Erro ao atualizar cliente {result['row'].get('id')}: {result['error']}")
+        if len(failed) < len(results):
+            st.success(f"{len(results) - len(failed)} cliente(s) atualizado(s) com sucesso!")
         
     except Exception as e:
         handle_error("Erro ao atualizar dados do cliente", e)
@@ -53,17 +93,17 @@ def delete_client(client_id):
         # Debug message
         st.write(f"Tentando excluir cliente {client_id}")
         
-        # Verificar se o cliente tem casos
-        casos = supabase.get_client_cases(client_id)
-        if casos and len(casos) > 0:
+        # Verifica os casos e exclui numa única transação
+        result = supabase.delete_client_if_no_cases(client_id)
+        if result.get('case_count'):
             st.error(
                 "Não é possível excluir este cliente pois existem casos associados a ele. "
                 "Para excluir o cliente, primeiro exclua todos os casos relacionados."
             )
             return
-        
-        # Delete from database
-        supabase.delete_client(client_id)
+        if not result.get('deleted'):
+            st.error("Cliente não encontrado.")
+            return
         
         # Clear session state
         st.session_state.pop('confirm_delete', None)
@@ -82,25 +122,101 @@ def delete_client(client_id):
             st.error(f"Erro ao excluir cliente: {str(e)}")
             handle_error("Erro ao excluir cliente", e)
 
+def render_pagination_controls():
+    """Renderiza filtro, ordenação e tamanho de página; retorna os parâmetros da consulta"""
+    col1, col2, col3 = st.columns([4, 2, 1])
+    with col1:
+        filter_text = st.text_input("Filtrar por nome, email ou CPF", key="clientes_filter")
+    with col2:
+        sort_label = st.selectbox("Ordenar por", list(SORT_OPTIONS.keys()), key="clientes_sort")
+    with col3:
+        page_size = st.selectbox("Por página", PAGE_SIZES, index=1, key="clientes_page_size")
+    
+    sort_column, desc = SORT_OPTIONS[sort_label]
+    
+    # Volta para a primeira página quando a consulta muda
+    query_signature = (filter_text, sort_label, page_size)
+    if st.session_state.get('clientes_query_signature') != query_signature:
+        st.session_state.clientes_query_signature = query_signature
+        st.session_state.clientes_cursors = [None]
+    
+    return filter_text, sort_column, desc, page_size
+
+def render_client_import(supabase):
+    """Importação em lote de clientes (CSV ou XLSX) com relatório por linha"""
+    with st.expander("Importar clientes (CSV/XLSX)"):
+        st.caption(
+            "Colunas aceitas: nome_completo, email, cpf (obrigatórias), celular, "
+            "data_nascimento, rg, nacionalidade, estado_civil, profissao, endereco, "
+            "bairro, cidade, estado e cep. CPFs e emails já cadastrados são ignorados."
+        )
+        uploaded = st.file_uploader("Arquivo", type=['csv', 'xlsx'], key="clientes_import_file")
+        if uploaded is None:
+            return
+        
+        col1, col2 = st.columns(2)
+        dry_run = col1.button("Validar", use_container_width=True)
+        run = col2.button("Importar", type="primary", use_container_width=True)
+        if not (dry_run or run):
+            return
+        
+        progress = st.empty()
+        try:
+            report = ClientImporter(supabase).run(
+                uploaded, uploaded.name, dry_run=dry_run,
+                on_progress=lambda count: progress.caption(f"{count} linhas processadas...")
+            )
+        except Exception as e:
+            handle_error("Erro ao importar clientes", e)
+            return
+        
+        counts = report['status'].value_counts()
+        ok_status = STATUS_VALID if dry_run else STATUS_IMPORTED
+        progress.success(
+            f"{counts.get(ok_status, 0)} cliente(s) {'válido(s)' if dry_run else 'importado(s)'} "
+            f"de {len(report)} linha(s)."
+        )
+        problems = report[report['status'] != ok_status]
+        if not problems.empty:
+            st.dataframe(problems, hide_index=True, use_container_width=True)
+        st.download_button(
+            "Baixar relatório",
+            data=report_to_csv(report),
+            file_name=f"relatorio_importacao_{uploaded.name.rsplit('.', 1)[0]}.csv",
+            mime="text/csv"
+        )
+
 def render_clientes():
     """Render the clients page"""
     st.title("Gestão de Clientes")
     
     supabase = SupabaseManager()
+    render_client_import(supabase)
     
     try:
-        # Fetch clients data
-        clients_data = supabase.get_all_clients()
+        filter_text, sort_column, desc, page_size = render_pagination_controls()
+        
+        # Pilha de cursores: o último é o início da página atual
+        cursors = st.session_state.clientes_cursors
+        
+        # Fetch only the current page of clients
+        page = supabase.get_clients_page(
+            page_size=page_size,
+            cursor=cursors[-1],
+            sort_column=sort_column,
+            desc=desc,
+            filter_text=filter_text
+        )
+        clients_data = page['rows']
         
         if not clients_data:
-            st.info("Nenhum cliente cadastrado.")
+            st.info("Nenhum cliente encontrado." if filter_text else "Nenhum cliente cadastrado.")
             return
             
-        # Convert to DataFrame
-        df = pd.DataFrame(clients_data)
-        
-        # Create a copy of original data for comparison
-        original_df = df.copy()
+        # Cópia original (com categorias) para comparação; a grade editável
+        # usa texto, para aceitar valores que ainda não aparecem na página
+        original_df = to_categoricals(pd.DataFrame(clients_data))
+        df = from_categoricals(original_df)
         
         # Get visible columns (excluding 'id')
         visible_columns = [col for col in df.columns if col != 'id']
@@ -114,6 +230,19 @@ def render_clientes():
             on_change=lambda: st.session_state.update({'data_editor_changed': True})
         )
         
+        # Navegação entre páginas
+        nav1, nav2, nav3 = st.columns([1, 1, 6])
+        with nav1:
+            if st.button("← Anterior", disabled=len(cursors) == 1, use_container_width=True):
+                cursors.pop()
+                st.rerun()
+        with nav2:
+            if st.button("Próxima →", disabled=page['next_cursor'] is None, use_container_width=True):
+                cursors.append(page['next_cursor'])
+                st.rerun()
+        with nav3:
+            st.caption(f"Página {len(cursors)}")
+        
         # Process any edits
         if st.session_state.get('data_editor_changed', False):
             st.write("Detectada mudança na tabela")  # Debug message
@@ -14,24 +14,31 @@ def process_company_update(edited_rows, original_rows):
     supabase = SupabaseManager()
     
     try:
+        rows_to_update = []
         for index, changes in edited_rows.items():
             if not changes:  # Skip if no changes
                 continue
                 
             original_row = original_rows.iloc[index]
-            company_id = original_row['id']
             
             # Validate fields if they were changed
             if 'cnpj' in changes and not validate_cnpj(changes['cnpj']):
                 st.error(f"CNPJ inválido na linha {index + 1}")
                 continue
             
-            # Update the company in Supabase
-            try:
-                supabase.update_company(company_id, changes)
-                st.success(f"Empresa atualizada com sucesso!")
-            except Exception as e:
-                st.error(f"Erro ao atualizar empresa: {str(e)}")
+            # Só o id e as colunas alteradas: o resto da linha fica como está no banco
+            rows_to_update.append({'id': original_row['id'], **changes})
+        
+        if not rows_to_update:
+            return
+        
+        # Update all companies in Supabase in a single batch
+        results = supabase.update_many('companhiasAereas', rows_to_update)
+        failed = [r for r in results if not r['ok']]
+        for result in failed:
+            st.error(f"Erro ao atualizar empresa: {result['error']}")
+        if len(failed) < len(results):
+            st.success(f"{len(results) - len(failed)} empresa(s) atualizada(s) com sucesso!")
         
     except Exception as e:
         handle_error("Erro ao atualizar dados da empresa", e)
@@ -104,8 +111,9 @@ def render_empresas():
     supabase = SupabaseManager()
     
     try:
-        # Fetch companies data
-        companies_data = supabase.get_all_companies()
+        # Todas as colunas: a grade mostra a linha inteira, mas só as colunas
+        # alteradas são gravadas (update_many)
+        companies_data = supabase.get_all_companies(columns='*')
         
         if not companies_data:
             st.info("Nenhuma empresa cadastrada.")
@@ -1,5 +1,6 @@
 import streamlit as st
 from utils.supabase_manager import SupabaseManager
+from sections.case_selector import load_client_cases, select_client_case
 from utils.google_manager import GoogleManager
 from utils.auth_manager import check_authentication
 import logging
@@ -24,7 +25,7 @@ def search_client(search_term, supabase):
         clients = supabase.search_clients_by_partial_name(search_term)
         return clients
     except Exception as e:
-        logger.error(f"Erro ao buscar clientes: {str(e)}")
+        logger.error("Erro ao buscar clientes: %s", e)
         return []
 
 def send_email(client_data, case_data, google_manager):
@@ -154,7 +155,7 @@ def send_email(client_data, case_data, google_manager):
         return True
         
     except Exception as e:
-        logger.error(f"Erro ao enviar e-mail: {str(e)}")
+        logger.error("Erro ao enviar e-mail: %s", e)
         raise Exception(f"Erro ao enviar e-mail: {str(e)}")
 
 def render_gerar_documentos():
@@ -188,8 +189,14 @@ def render_gerar_documentos():
             )
             
             if selected_client:
-                # Salvar dados do cliente selecionado
-                st.session_state.selected_client_data = client_options[selected_client]
+                # A busca traz só o resumo; os dados completos são buscados
+                # uma vez por cliente selecionado
+                client_id = client_options[selected_client]['id']
+                current = st.session_state.get('selected_client_data')
+                if not current or current.get('id') != client_id:
+                    st.session_state.selected_client_data = (
+                        supabase.get_client_by_id(client_id) or client_options[selected_client]
+                    )
                 
                 # Mostrar dados do cliente selecionado
                 st.write("**Dados do cliente selecionado:**")
@@ -215,29 +222,19 @@ def render_gerar_documentos():
                         if i >= metade:
                             st.write(f"**{key}:** {value}")
                 
-                # Buscar casos do cliente
-                client_cases = supabase.get_client_cases(st.session_state.selected_client_data['id'])
+                # Casos do cliente, em páginas (só chave e assunto); ficam na sessão
+                client_cases = load_client_cases(supabase, st.session_state.selected_client_data['id'])
                 
-                if client_cases:
+                if client_cases['rows']:
                     st.markdown("---")
                     st.write("**Selecione o caso:**")
                     
-                    # Criar lista de opções para o selectbox de casos
-                    case_options = {
-                        f"{case.get('chave_caso', 'Sem chave')} - {case.get('assunto_caso', 'Sem assunto')}": case 
-                        for case in client_cases
-                    }
-                    
-                    # Dropdown para seleção do caso
-                    selected_case = st.selectbox(
-                        "Casos do cliente",
-                        options=list(case_options.keys()),
-                        key="case_select"
-                    )
+                    # O caso completo é lido só depois da seleção
+                    selected_case = select_client_case(supabase, client_cases)
                     
                     if selected_case:
                         # Salvar dados do caso selecionado
-                        st.session_state.selected_case_data = case_options[selected_case]
+                        st.session_state.selected_case_data = selected_case
                         
                         # Mostrar informações do caso
                         st.write("**Detalhes do caso:**")
@@ -378,14 +375,14 @@ def gerar_declaracao_residencia(client_data, parente_data, case_data, google_man
         # Verificar se o arquivo existe no Drive
         try:
             google_manager.drive_service.files().get(fileId=pdf_id).execute()
-            logger.info(f"Declaração de residência gerada com sucesso. PDF ID: {pdf_id}")
+            logger.info("Declaração de residência gerada com sucesso. PDF ID: %s", pdf_id)
             return pdf_id
         except Exception as e:
-            logger.error(f"Arquivo gerado mas não encontrado no Drive: {str(e)}")
+            logger.error("Arquivo gerado mas não encontrado no Drive: %s", e)
             raise Exception(f"Arquivo gerado mas não encontrado no Drive: {str(e)}")
         
     except Exception as e:
-        logger.error(f"Erro ao gerar declaração de residência: {str(e)}")
+        logger.error("Erro ao gerar declaração de residência: %s", e)
         raise Exception(f"Erro ao gerar declaração de residência: {str(e)}")
 
 def send_email_with_declaracao(client_data, case_data, google_manager, include_declaracao=False, declaracao_id=None):
@@ -446,7 +443,7 @@ def send_email_with_declaracao(client_data, case_data, google_manager, include_d
                 while done is False:
                     status, done = downloader.next_chunk()
             except Exception as e:
-                logger.error(f"Erro ao baixar declaração de residência: {str(e)}")
+                logger.error("Erro ao baixar declaração de residência: %s", e)
                 raise Exception(f"Erro ao baixar declaração de residência: {str(e)}")
         
         # Preparar o e-mail
@@ -536,7 +533,7 @@ def send_email_with_declaracao(client_data, case_data, google_manager, include_d
         return True
         
     except Exception as e:
-        logger.error(f"Erro ao enviar e-mail: {str(e)}")
+        logger.error("Erro ao enviar e-mail: %s", e)
         raise Exception(f"Erro ao enviar e-mail: {str(e)}")
 
 if __name__ == "__main__":
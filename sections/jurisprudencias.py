@@ -1,26 +1,35 @@
 import streamlit as st
 from utils.supabase_manager import SupabaseManager
+from utils.bm25_index import snippet
 from datetime import datetime
 import pandas as pd
+import time
 
 def process_jurisprudencia_update(edited_rows, original_rows):
     """Process updates to jurisprudencia data"""
     supabase = SupabaseManager()
     
     try:
+        rows_to_update = []
         for index, changes in edited_rows.items():
             if not changes:  # Skip if no changes
                 continue
                 
             original_row = original_rows.iloc[index]
-            jurisprudencia_id = original_row['id']
             
-            # Update the jurisprudencia in Supabase
-            try:
-                supabase.update_jurisprudencia(jurisprudencia_id, changes)
-                st.success(f"Jurisprudência atualizada com sucesso!")
-            except Exception as e:
-                st.error(f"Erro ao atualizar jurisprudência: {str(e)}")
+            # Só o id e as colunas alteradas: o resto da linha fica como está no banco
+            rows_to_update.append({'id': original_row['id'], **changes})
+        
+        if not rows_to_update:
+            return
+        
+        # Update all jurisprudencias in Supabase in a single batch
+        results = supabase.update_many('jurisprudenciaAereo', rows_to_update)
+        failed = [r for r in results if not r['ok']]
+        for result in failed:
+            st.error(f"Erro ao atualizar jurisprudência: {result['error']}")
+        if len(failed) < len(results):
+            st.success(f"{len(results) - len(failed)} jurisprudência(s) atualizada(s) com sucesso!")
         
     except Exception as e:
         st.error(f"Erro ao atualizar dados da jurisprudência: {str(e)}")
@@ -145,19 +154,40 @@ def render_jurisprudencias():
         }
         df = df.rename(columns=column_names)
         
-        # Sort by Seção
-        df = df.sort_values('Seção')
-        
         # Get visible columns (excluding 'ID')
         visible_columns = ['Data de Criação', 'Nome', 'Seção', 'Tribunal', 'Texto']
         
+        # Busca textual: mostra só os resultados, do mais relevante ao menos
+        # relevante, com o trecho do texto onde a busca foi encontrada
+        search_query = st.text_input(
+            "Buscar jurisprudências",
+            placeholder="Palavras do nome, seção, tribunal ou texto",
+            key="jurisprudencia_search"
+        )
+        if search_query.strip():
+            started = time.perf_counter()
+            hits = supabase.search_jurisprudencias(search_query)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            rank = {hit['id']: position for position, hit in enumerate(hits)}
+            df = df[df['ID'].isin(rank)]
+            df = df.iloc[df['ID'].map(rank).argsort()]
+            st.caption(f"{len(df)} resultado(s) em {elapsed_ms:.0f} ms")
+            if df.empty:
+                st.info("Nenhuma jurisprudência encontrada para a busca.")
+                return
+            df = df.assign(Trecho=[snippet(texto, search_query) for texto in df['Texto'].fillna('')])
+            visible_columns.insert(visible_columns.index('Nome') + 1, 'Trecho')
+        else:
+            # Sort by Seção
+            df = df.sort_values('Seção')
+        
         # Display editable table
         edited_df = st.data_editor(
             df,
             hide_index=True,
             column_order=visible_columns,
             key="jurisprudencia_editor",
-            disabled=['ID', 'Data de Criação'],
+            disabled=['ID', 'Data de Criação', 'Trecho'],
             on_change=lambda: st.session_state.update({'data_editor_changed': True})
         )
 
@@ -27,7 +27,10 @@ def format_sp_datetime(dt):
 
 def init_managers():
     """Inicializa os gerenciadores necessários"""
-    return SupabaseManager(), GoogleManager()
+    supabase_manager, google_manager = SupabaseManager(), GoogleManager()
+    # Na primeira vez, carrega no cache local as pastas do Drive já registradas
+    google_manager.seed_folder_cache(supabase_manager)
+    return supabase_manager, google_manager
 
 def create_form_section(title: str):
     """Cria uma seção do formulário com estilo consistente"""
@@ -68,11 +71,11 @@ def handle_file_upload(file, folder_id: str, google_manager: GoogleManager):
                 mime_type=mime_type,
                 folder_id=folder_id
             )
-            logger.info(f"Arquivo {file_name} enviado com sucesso")
+            logger.info("Arquivo %s enviado com sucesso", file_name)
             return file_id
             
         except Exception as e:
-            logger.error(f"Erro ao processar arquivo {file.name}: {str(e)}")
+            logger.error("Erro ao processar arquivo %s: %s", file.name, e)
             st.error(f"Erro ao processar arquivo {file.name}")
             return None
     return None
@@ -105,11 +108,12 @@ def render_onboarding():
             suggestions = supabase_manager.search_clients_by_partial_name(search_name)
             
             if suggestions:
-                # Criar lista de opções para o selectbox
-                options = ["Selecione um cliente..."] + [
-                    f"{cliente['nome_completo']} - CPF: {cliente['cpf']}" 
+                # Criar lista de opções para o selectbox (rótulo -> ID do cliente)
+                suggestion_ids = {
+                    f"{cliente['nome_completo']} - CPF: {cliente['cpf']}": cliente['id']
                     for cliente in suggestions
-                ]
+                }
+                options = ["Selecione um cliente..."] + list(suggestion_ids.keys())
                 
                 selected_option = st.selectbox(
                     "Clientes encontrados:",
@@ -118,9 +122,8 @@ def render_onboarding():
                 
                 # Se um cliente foi selecionado
                 if selected_option != "Selecione um cliente...":
-                    # Encontrar o cliente selecionado
-                    nome_selecionado = selected_option.split(" - CPF:")[0]
-                    cliente = supabase_manager.get_client_by_name(nome_selecionado)
+                    # A busca traz só o resumo; carrega os dados completos pelo ID
+                    cliente = supabase_manager.get_client_by_id(suggestion_ids[selected_option])
                     
                     if cliente:
                         st.success(f"Cliente selecionado: {cliente['nome_completo']}")
@@ -188,8 +191,13 @@ def render_onboarding():
                                     status_text.text("Criando pasta do caso...")
                                     progress_bar.progress(20)
                                     
-                                    client_folder_id = cliente['pasta_drive_id']
-                                    case_folder_id = google_manager.create_case_folder(client_folder_id, assunto_caso)
+                                    # Verificação da pasta do cliente e criação da do caso num único lote
+                                    client_folder_id, case_folder_id = google_manager.create_onboarding_folders(
+                                        cliente['nome_completo'], cliente['cpf'], assunto_caso,
+                                        client_folder_id=cliente['pasta_drive_id']
+                                    )
+                                    if client_folder_id != cliente['pasta_drive_id']:
+                                        supabase_manager.update_client(cliente['id'], {'pasta_drive_id': client_folder_id})
                                     
                                     # 2. Salvando dados do caso (40%)
                                     status_text.text("Salvando dados do caso...")
@@ -218,21 +226,21 @@ def render_onboarding():
                                         try:
                                             handle_file_upload(doc_identidade, case_folder_id, google_manager)
                                         except Exception as e:
-                                            logger.error(f"Erro ao processar {doc_identidade.name}: {str(e)}")
+                                            logger.error("Erro ao processar %s: %s", doc_identidade.name, e)
                                             st.warning(f"Erro ao processar {doc_identidade.name}")
 
                                     if doc_residencia:
                                         try:
                                             handle_file_upload(doc_residencia, case_folder_id, google_manager)
                                         except Exception as e:
-                                            logger.error(f"Erro ao processar {doc_residencia.name}: {str(e)}")
+                                            logger.error("Erro ao processar %s: %s", doc_residencia.name, e)
                                             st.warning(f"Erro ao processar {doc_residencia.name}")
 
                                     for doc in outros_docs:
                                         try:
                                             handle_file_upload(doc, case_folder_id, google_manager)
                                         except Exception as e:
-                                            logger.error(f"Erro ao processar {doc.name}: {str(e)}")
+                                            logger.error("Erro ao processar %s: %s", doc.name, e)
                                             st.warning(f"Erro ao processar {doc.name}")
                                     
                                     # 4. Gerando procuração (80%)
@@ -415,8 +423,12 @@ def render_full_form(supabase_manager: SupabaseManager, google_manager: GoogleMa
                     return
                 
                 try:
-                    # Verificar se o CPF já existe
-                    existing_client = supabase_manager.get_client_by_cpf(cpf)
+                    # Verificar se o CPF ou o email já existem antes de criar
+                    # qualquer pasta no Drive (o banco ainda rejeita duplicados
+                    # cadastrados entre esta verificação e a gravação)
+                    existing_client = supabase_manager.get_client_by_cpf(
+                        cpf, columns='id,nome_completo'
+                    )
                     if existing_client:
                         st.error(f"""
                             CPF já cadastrado para o cliente: {existing_client['nome_completo']}
@@ -425,6 +437,17 @@ def render_full_form(supabase_manager: SupabaseManager, google_manager: GoogleMa
                             por favor use a busca de clientes na tela inicial.
                         """)
                         return
+                    existing_client = supabase_manager.get_client_by_email(
+                        email, columns='id,nome_completo'
+                    )
+                    if existing_client:
+                        st.error(f"""
+                            Email já cadastrado para o cliente: {existing_client['nome_completo']}
+                            
+                            Se você deseja adicionar um novo caso para este cliente, 
+                            por favor use a busca de clientes na tela inicial.
+                        """)
+                        return
                     
                     # Criar barra de progresso
                     progress_bar = st.progress(0)
@@ -436,8 +459,8 @@ def render_full_form(supabase_manager: SupabaseManager, google_manager: GoogleMa
                     
                     # Log dos dados antes da formatação
                     logger.info("Dados recebidos do formulário:")
-                    logger.info(f"Nome: {nome_completo}")
-                    logger.info(f"CPF: {cpf}")
+                    logger.info("Nome: %s", nome_completo)
+                    logger.info("CPF: %s", cpf)
                     
                     # Formata os dados
                     nome_completo = format_title_case(nome_completo)
@@ -453,15 +476,17 @@ def render_full_form(supabase_manager: SupabaseManager, google_manager: GoogleMa
                     progress_bar.progress(30)
                     
                     try:
-                        # Criar/buscar pasta do cliente
-                        client_folder_id = google_manager.get_or_create_client_folder(nome_completo, cpf)
-                        logger.info(f"Pasta do cliente criada/encontrada: {client_folder_id}")
+                        # Criar/buscar pasta do cliente e criar a pasta do caso
+                        client_folder_id, case_folder_id = google_manager.create_onboarding_folders(
+                            nome_completo, cpf, assunto_caso
+                        )
+                        logger.info("Pasta do cliente criada/encontrada: %s", client_folder_id)
                     except Exception as e:
-                        logger.error(f"Erro ao criar pasta do cliente: {str(e)}")
+                        logger.error("Erro ao criar pastas do cliente: %s", e)
                         raise Exception("Erro ao criar pasta do cliente no Google Drive")
                     
-                    # 3. Salvando cliente no Supabase (50%)
-                    status_text.text("Salvando dados do cliente...")
+                    # 3. Salvando cliente e caso no Supabase (50%)
+                    status_text.text("Salvando dados do cliente e do caso...")
                     progress_bar.progress(50)
                     
                     client_data = {
@@ -483,20 +508,8 @@ def render_full_form(supabase_manager: SupabaseManager, google_manager: GoogleMa
                         'created_at': sp_now.isoformat()
                     }
 
-                    # Salvar cliente no Supabase
-                    client_response = supabase_manager.insert_client_data('clientes', client_data)
-                    client_id = client_response['id']
-
-                    # 4. Criando caso (70%)
-                    status_text.text("Criando novo caso...")
-                    progress_bar.progress(70)
-                    
-                    # Criar pasta do caso
-                    case_folder_id = google_manager.create_case_folder(client_folder_id, assunto_caso)
-
-                    # Preparar dados do caso
+                    # Preparar dados do caso (cliente_id é preenchido pelo banco)
                     case_data = {
-                        'cliente_id': client_id,
                         'nome_cliente': nome_completo,
                         'caso': caso,
                         'assunto_caso': assunto_caso,
@@ -506,8 +519,20 @@ def render_full_form(supabase_manager: SupabaseManager, google_manager: GoogleMa
                         'created_at': sp_now.isoformat()
                     }
 
-                    # Salvar caso no Supabase
-                    supabase_manager.insert_client_data('casos', case_data)
+                    # Salvar cliente e caso numa única transação; se o banco
+                    # recusar, a pasta do caso recém-criada vai para a lixeira
+                    try:
+                        created = supabase_manager.create_client_with_case(client_data, case_data)
+                    except Exception:
+                        try:
+                            google_manager.trash_folder(case_folder_id)
+                        except Exception as trash_error:
+                            logger.error("Erro ao descartar a pasta do caso %s: %s", case_folder_id, trash_error)
+                        raise
+                    case_data = created['caso']
+                    
+                    # 4. Caso criado (70%)
+                    progress_bar.progress(70)
 
                     # 5. Upload de documentos (80%)
                     status_text.text("Fazendo upload dos documentos...")
@@ -582,12 +607,18 @@ def render_full_form(supabase_manager: SupabaseManager, google_manager: GoogleMa
                             Se você deseja adicionar um novo caso para este cliente,
                             por favor use a busca de clientes na tela inicial.
                         """)
+                    elif "Email já cadastrado" in str(e):
+                        st.error("""
+                            Este email já está cadastrado. 
+                            Se você deseja adicionar um novo caso para este cliente,
+                            por favor use a busca de clientes na tela inicial.
+                        """)
                     else:
-                        logger.error(f"Erro durante o cadastro: {str(e)}")
+                        logger.error("Erro durante o cadastro: %s", e)
                         st.error(f"Erro durante o cadastro: {str(e)}")
                     
         except Exception as e:
-            logger.error(f"Erro ao renderizar formulário: {str(e)}")
+            logger.error("Erro ao renderizar formulário: %s", e)
             st.error(f"Erro ao renderizar formulário: {str(e)}")
 
 def data_por_extenso(data):
@@ -617,7 +648,7 @@ def data_por_extenso(data):
         return data.strftime("%d de %B de %Y")
         
     except Exception as e:
-        logger.error(f"Erro ao formatar data por extenso: {str(e)}")
+        logger.error("Erro ao formatar data por extenso: %s", e)
         # Retornar formato básico em caso de erro
         return data.strftime("%d/%m/%Y")
 
@@ -0,0 +1,68 @@
+-- Sincronização incremental da tabela clientes (SupabaseManager.get_client_changes).
+-- Cada cliente guarda a hora da última alteração (updated_at) e cada exclusão
+-- deixa um registro em clientes_excluidos, para que caches locais busquem só
+-- o que mudou desde a última sincronização.
+-- Aplicar no SQL Editor do Supabase (idempotente: pode ser reexecutado).
+
+alter table public.clientes
+    add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists clientes_updated_at_id_idx
+    on public.clientes (updated_at, id);
+
+-- clock_timestamp(), e não now(): várias alterações na mesma transação
+-- recebem horários diferentes e crescentes
+create or replace function public._touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$;
+
+drop trigger if exists clientes_touch_updated_at on public.clientes;
+create trigger clientes_touch_updated_at
+    before update on public.clientes
+    for each row execute function public._touch_updated_at();
+
+-- Registro das exclusões (tombstones)
+create table if not exists public.clientes_excluidos (
+    id bigint primary key,
+    deleted_at timestamptz not null default clock_timestamp()
+);
+
+create index if not exists clientes_excluidos_deleted_at_idx
+    on public.clientes_excluidos (deleted_at, id);
+
+create or replace function public._record_client_deletion()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into public.clientes_excluidos (id, deleted_at)
+    values (old.id, clock_timestamp())
+    on conflict (id) do update set deleted_at = excluded.deleted_at;
+    return old;
+end;
+$$;
+
+drop trigger if exists clientes_record_deletion on public.clientes;
+create trigger clientes_record_deletion
+    after delete on public.clientes
+    for each row execute function public._record_client_deletion();
+
+-- Remove tombstones antigos. Caches sem sincronizar há mais tempo que isso
+-- precisam recarregar a tabela inteira (ver CLIENT_TOMBSTONE_RETENTION_DAYS).
+-- Agendar com pg_cron, por exemplo:
+--   select cron.schedule('purge-clientes-excluidos', '0 4 * * *',
+--                        $$select public.purge_client_tombstones()$$);
+create or replace function public.purge_client_tombstones(p_older_than interval default interval '30 days')
+returns setof bigint
+language sql
+as $$
+    delete from public.clientes_excluidos
+     where deleted_at < now() - p_older_than
+    returning id;
+$$;
@@ -0,0 +1,107 @@
+-- Funções do banco chamadas via RPC pelo SupabaseManager.
+-- Cada uma executa numa única transação, numa única requisição HTTP.
+-- As funções chamadas pela API retornam linhas (setof/table): o postgrest-py
+-- só aceita respostas em lista.
+-- Aplicar no SQL Editor do Supabase (idempotente: pode ser reexecutado).
+
+-- Insere uma linha a partir de um objeto JSON, usando só as chaves presentes
+-- (colunas ausentes ficam com o DEFAULT da tabela). Retorna a linha inserida.
+-- Roda com os privilégios de quem chama (security invoker), então não permite
+-- nada além do que um INSERT direto pela API já permitiria.
+create or replace function public._insert_jsonb(p_table regclass, p_row jsonb)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_columns text;
+    v_result jsonb;
+begin
+    select string_agg(quote_ident(key), ', ')
+      into v_columns
+      from jsonb_object_keys(p_row) as key;
+
+    execute format(
+        'insert into %s (%s) select %s from jsonb_populate_record(null::%s, $1) returning to_jsonb(%s.*)',
+        p_table, v_columns, v_columns, p_table, p_table
+    )
+    into v_result
+    using p_row;
+
+    return v_result;
+end;
+$$;
+
+-- Insere um cliente garantindo email único. O lock por email serializa
+-- cadastros concorrentes do mesmo email; o CPF é protegido pela constraint
+-- clientes_cpf_key.
+create or replace function public.insert_client(p_client jsonb)
+returns setof public.clientes
+language plpgsql
+as $$
+declare
+    v_email text := lower(trim(p_client->>'email'));
+begin
+    perform pg_advisory_xact_lock(hashtext('clientes.email:' || coalesce(v_email, '')));
+
+    if exists (select 1 from public.clientes where lower(trim(email)) = v_email) then
+        raise exception 'Email já cadastrado no sistema'
+            using errcode = 'unique_violation';
+    end if;
+
+    return query
+        select * from jsonb_populate_record(
+            null::public.clientes,
+            public._insert_jsonb('public.clientes', p_client)
+        );
+end;
+$$;
+
+-- Cadastra cliente e primeiro caso na mesma transação: se o caso falhar,
+-- o cliente não é criado. Retorna uma linha (cliente, caso).
+create or replace function public.create_client_with_case(p_client jsonb, p_case jsonb)
+returns table (cliente jsonb, caso jsonb)
+language plpgsql
+as $$
+declare
+    v_client jsonb;
+    v_case jsonb;
+begin
+    select to_jsonb(c.*) into v_client from public.insert_client(p_client) as c;
+    v_case := public._insert_jsonb(
+        'public.casos',
+        p_case || jsonb_build_object(
+            'cliente_id', v_client->'id',
+            'nome_cliente', coalesce(p_case->>'nome_cliente', v_client->>'nome_completo')
+        )
+    );
+
+    return query select v_client, v_case;
+end;
+$$;
+
+-- Exclui o cliente só se não houver casos associados. A linha do cliente é
+-- bloqueada antes da contagem, para que nenhum caso seja criado no meio.
+-- Retorna uma linha (deleted, client_exists, case_count).
+create or replace function public.delete_client_if_no_cases(p_client_id bigint)
+returns table (deleted boolean, client_exists boolean, case_count integer)
+language plpgsql
+as $$
+declare
+    v_case_count integer;
+begin
+    perform 1 from public.clientes where id = p_client_id for update;
+    if not found then
+        return query select false, false, 0;
+        return;
+    end if;
+
+    select count(*) into v_case_count from public.casos as c where c.cliente_id = p_client_id;
+    if v_case_count > 0 then
+        return query select false, true, v_case_count;
+        return;
+    end if;
+
+    delete from public.clientes as c where c.id = p_client_id;
+    return query select true, true, 0;
+end;
+$$;
@@ -0,0 +1,57 @@
+import pytest
+
+import utils.async_supabase_manager as async_supabase_manager
+from utils.async_supabase_manager import AsyncSupabaseManager
+from utils.sqlite_backend import SQLiteDatabase, create_async_sqlite_client, seed_database
+from utils.supabase_manager import SupabaseManager
+
+
+@pytest.fixture
+def database():
+    db = SQLiteDatabase(':memory:')
+    seed_database(db, clientes=5, jurisprudencias=3)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def clients(database, monkeypatch):
+    created = []
+
+    def create_client():
+        created.append(create_async_sqlite_client(database))
+        return created[-1]
+
+    monkeypatch.setattr(AsyncSupabaseManager, '_create_client', staticmethod(create_client))
+    SupabaseManager.invalidate_reference_cache()
+    SupabaseManager.reset_metrics()
+    yield created
+    AsyncSupabaseManager.shutdown()
+    SupabaseManager.invalidate_reference_cache()
+    SupabaseManager.reset_metrics()
+
+
+def test_reruns_reuse_the_loop_and_client(clients):
+    assert AsyncSupabaseManager.run({}) == {}
+    assert clients == [] and async_supabase_manager._loop is None
+
+    first = AsyncSupabaseManager.run({
+        'client': lambda db: db.get_client_by_id(1),
+        'companies': lambda db: db.get_all_companies()
+    })
+    loop = async_supabase_manager._loop
+    second = AsyncSupabaseManager.run({'cases': lambda db: db.get_client_cases_page(1)})
+
+    assert first['client']['id'] == 1 and first['companies']
+    assert 'rows' in second['cases']
+    assert len(clients) == 1 and async_supabase_manager._loop is loop
+
+
+def test_reference_tables_are_shared_with_the_sync_cache_and_instrumented(clients):
+    assert not AsyncSupabaseManager.reference_cached('companhiasAereas')
+    companies = AsyncSupabaseManager.run({'companies': lambda db: db.get_all_companies()})['companies']
+    assert AsyncSupabaseManager.reference_cached('companhiasAereas')
+    assert not AsyncSupabaseManager.reference_cached('jurisprudenciaAereo')
+
+    metrics = SupabaseManager.get_metrics()['AsyncSupabaseManager.get_all_companies']
+    assert metrics['calls'] == 1 and metrics['rows'] == len(companies)
@@ -0,0 +1,47 @@
+from utils.bm25_index import BM25Index, snippet, stem, tokenize
+
+FIELDS = {'nome': 3.0, 'secao': 2.0, 'Tribunal': 1.5, 'texto': 1.0}
+
+def _index():
+    index = BM25Index(FIELDS)
+    index.add_many([
+        {'id': 1, 'nome': 'Atraso de voo', 'secao': 'Dano moral', 'Tribunal': 'TJSP',
+         'texto': 'O atraso do voo superior a quatro horas gera dano moral indenizável.'},
+        {'id': 2, 'nome': 'Extravio de bagagem', 'secao': 'Dano material', 'Tribunal': 'STJ',
+         'texto': 'A companhia aérea responde pelo extravio da bagagem do passageiro.'},
+        {'id': 3, 'nome': 'Cancelamento', 'secao': 'Dano moral', 'Tribunal': 'TJRJ',
+         'texto': 'Voos cancelados sem aviso prévio; atrasos sucessivos na reacomodação.'},
+    ])
+    return index
+
+def test_tokenize_folds_accents_stopwords_and_plurals():
+    assert tokenize('Indenização das Bagagens') == tokenize('indenizacao bagagem')
+    assert stem('atrasos') == stem('atraso') == stem('atrasado')
+    assert tokenize('de da do') == []
+
+def test_search_ranks_by_relevance():
+    hits = _index().search('atraso voo')
+    assert [doc['id'] for doc, _ in hits] == [1, 3]
+    assert hits[0][1] > hits[1][1]
+    assert [doc['id'] for doc, _ in _index().search('AÉREA')] == [2]
+    assert _index().search('') == []
+
+def test_search_expands_prefix_of_last_word():
+    assert [doc['id'] for doc, _ in _index().search('bag')] == [2]
+    assert _index().search('bag', prefix=False) == []
+
+def test_incremental_update_and_remove():
+    index = _index()
+    index.add({'id': 2, 'nome': 'Overbooking', 'secao': 'Dano moral', 'Tribunal': 'STJ',
+               'texto': 'Preterição de embarque.'})
+    assert index.search('bagagem') == []
+    assert [doc['id'] for doc, _ in index.search('overbooking')] == [2]
+    index.remove(1)
+    index.remove(99)
+    assert len(index) == 2
+    assert [doc['id'] for doc, _ in index.search('atraso')] == [3]
+
+def test_snippet_centers_on_match():
+    text = 'x ' * 200 + 'bagagem extraviada' + ' y' * 200
+    result = snippet(text, 'bagagens', width=60)
+    assert 'bagagem' in result and result.startswith('...') and result.endswith('...')
@@ -0,0 +1,81 @@
+import io
+
+import pandas as pd
+
+from utils.client_importer import (
+    STATUS_DUPLICATE,
+    STATUS_IMPORTED,
+    STATUS_INVALID,
+    ClientImporter,
+    cpf_check_digits_valid,
+    prepare_chunk,
+    read_client_file
+)
+from utils.form_validator import FormValidator
+
+def test_cpf_check_digits_match_scalar_validator():
+    cpfs = ['52998224725', '11144477735', '52998224724', '11111111111', '123', '']
+    vectorized = cpf_check_digits_valid(pd.Series(cpfs)).tolist()
+    assert vectorized == [FormValidator.validate_cpf_digits(cpf) for cpf in cpfs]
+    assert vectorized == [True, True, False, False, False, False]
+
+def test_prepare_chunk_normalizes_and_flags_errors():
+    df = pd.DataFrame({
+        'Nome': ['Ana Souza', 'Bruno'],
+        'E-mail': ['Ana@Example.com', 'bruno@'],
+        'CPF': ['529.982.247-25', '52998224724'],
+        'Telefone': ['+55 21 98765-4321', '123'],
+        'Data de Nascimento': ['02/01/1990', '31/02/1990'],
+        'CEP': ['20000000', ''],
+    })
+    chunk = prepare_chunk(df)
+    first = chunk.iloc[0]
+    assert (first['cpf'], first['email'], first['celular']) == ('529.982.247-25', 'ana@example.com', '(21) 98765-4321')
+    assert (first['data_nascimento'], first['cep'], first['erro']) == ('1990-01-02', '20000-000', '')
+    assert chunk.iloc[1]['erro'] == 'CPF inválido; Email inválido; Celular inválido; Data de nascimento inválida'
+
+class FakeManager:
+    def __init__(self, cpfs):
+        self.cpfs = set(cpfs)
+        self.inserted = []
+
+    def get_client_keys(self):
+        return {'cpfs': set(self.cpfs), 'emails': set()}
+
+    def insert_many(self, table, rows, chunk_size):
+        self.inserted.extend(rows)
+        return [{'row': row, 'ok': True, 'data': {'id': n}, 'error': None} for n, row in enumerate(rows)]
+
+def test_import_dedupes_and_reports_each_line():
+    csv = (
+        "nome_completo;email;cpf\n"
+        "Ana;ana@example.com;529.982.247-25\n"
+        "Bruno;bruno@example.com;111.444.777-35\n"
+        "Bruno de novo;bruno2@example.com;11144477735\n"
+        "Sem CPF;x@example.com;\n"
+    ).encode('utf-8')
+    manager = FakeManager(cpfs=['52998224725'])
+    report = ClientImporter(manager, chunk_size=2).run(io.BytesIO(csv), 'clientes.csv')
+    assert report['linha'].tolist() == [2, 3, 4, 5]
+    assert report['status'].tolist() == [STATUS_DUPLICATE, STATUS_IMPORTED, STATUS_DUPLICATE, STATUS_INVALID]
+    assert [row['nome_completo'] for row in manager.inserted] == ['Bruno']
+
+def test_read_latin1_csv_with_comma_separator():
+    data = "nome_completo,cidade\nJoão,Niterói\n".encode('latin-1')
+    chunk = next(read_client_file(io.BytesIO(data), 'clientes.csv'))
+    assert chunk.loc[2, 'cidade'] == 'Niterói'
+
+def test_read_xlsx_keeps_leading_zeros_of_numeric_cpf_and_cep():
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['Nome', 'E-mail', 'CPF', 'CEP', 'Telefone'])
+    sheet.append(['Ana', 'ana@example.com', 1234567890, 1310100, 21987654321])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+
+    chunk = prepare_chunk(next(read_client_file(buffer, 'clientes.xlsx')))
+    row = chunk.iloc[0]
+    assert (row['cpf'], row['cep'], row['erro']) == ('012.345.678-90', '01310-100', '')
@@ -0,0 +1,9 @@
+from utils.date_utils import latest_timestamp, rewind_timestamp
+
+def test_latest_timestamp_compares_instants_not_text():
+    assert latest_timestamp(None, []) is None
+    assert latest_timestamp('2024-01-01T10:00:00+00:00', ['2024-01-01T09:00:00-03:00']) == '2024-01-01T09:00:00-03:00'
+    assert latest_timestamp('2024-01-01T10:00:00.5+00:00', ['2024-01-01T10:00:00Z', None]) == '2024-01-01T10:00:00.5+00:00'
+
+def test_rewind_timestamp():
+    assert rewind_timestamp('2024-01-01T00:00:05+00:00', 10) == '2023-12-31T23:59:55+00:00'
@@ -0,0 +1,97 @@
+import io
+
+import pytest
+from docx import Document
+from docx.shared import Pt
+
+from utils.docx_renderer import CompiledTemplate, compile_placeholders, render_document
+from utils.error_handler import TemplateError
+
+
+def _paragraph(container, *parts):
+    paragraph = container.add_paragraph()
+    for text in parts:
+        paragraph.add_run(text)
+    return paragraph
+
+
+def test_placeholder_split_across_runs_keeps_formatting():
+    doc = Document()
+    paragraph = _paragraph(doc, 'Eu, {{nome_', 'completo}}, CPF ', '{{cpf}}.')
+    paragraph.runs[1].bold = True
+    paragraph.runs[2].font.size = Pt(14)
+
+    assert render_document(doc, {'nome_completo': 'Maria Silva', 'cpf': '123'}) == 2
+
+    assert paragraph.text == 'Eu, Maria Silva, CPF 123.'
+    assert [run.text for run in paragraph.runs] == ['Eu, Maria Silva', ', CPF ', '123.']
+    assert paragraph.runs[1].bold
+    assert paragraph.runs[2].font.size == Pt(14)
+
+
+def test_tables_headers_and_footers_are_filled():
+    doc = Document()
+    cell = doc.add_table(rows=1, cols=2).rows[0].cells[1]
+    cell.paragraphs[0].add_run('{{cidade}}')
+    nested = cell.add_table(rows=1, cols=1).rows[0].cells[0]
+    nested.paragraphs[0].add_run('{{ cep }}')
+    section = doc.sections[0]
+    section.header.paragraphs[0].add_run('Cliente: {{nome_completo}}')
+    section.footer.paragraphs[0].add_run('{{data_extenso}}')
+
+    render_document(doc, {'cidade': 'Rio', 'cep': '20000-000',
+                          'nome_completo': 'Ana', 'data_extenso': '1 de março'})
+
+    assert cell.paragraphs[0].text == 'Rio'
+    assert nested.paragraphs[0].text == '20000-000'
+    assert section.header.paragraphs[0].text == 'Cliente: Ana'
+    assert section.footer.paragraphs[0].text == '1 de março'
+
+
+def test_unknown_placeholders_and_longest_key_win():
+    doc = Document()
+    paragraph = _paragraph(doc, '{{rg}} {{rg_parente}} {{outro}}')
+
+    assert render_document(doc, {'rg': '1', 'rg_parente': '2', 'vazio': None}) == 2
+    assert paragraph.text == '1 2 {{outro}}'
+    assert compile_placeholders(['rg', 'rg_parente']).fullmatch('{{rg_parente}}').group(1) == 'rg_parente'
+
+
+def _template_bytes():
+    doc = Document()
+    paragraph = _paragraph(doc, 'Eu, {{nome_', 'completo }}, CPF ', '{{cpf}}.')
+    paragraph.runs[1].italic = True
+    doc.add_table(rows=1, cols=1).rows[0].cells[0].paragraphs[0].add_run('{{cidade}}')
+    doc.sections[0].footer.paragraphs[0].add_run('{{data_extenso}}')
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def test_compiled_template_indexes_keys_and_renders_copies():
+    template = CompiledTemplate.from_bytes(_template_bytes(), 'teste')
+    assert template.placeholder_keys == {'nome_completo', 'cpf', 'cidade', 'data_extenso'}
+
+    first = template.render({'nome_completo': 'Ana', 'cpf': '1', 'cidade': 'Rio', 'data_extenso': 'hoje'})
+    second = template.render({'nome_completo': 'Bia', 'cpf': '2', 'cidade': 'Niterói', 'data_extenso': 'ontem'})
+
+    assert first.paragraphs[0].text == 'Eu, Ana, CPF 1.'
+    assert first.paragraphs[0].runs[1].italic
+    assert second.paragraphs[0].text == 'Eu, Bia, CPF 2.'
+    assert second.tables[0].rows[0].cells[0].text == 'Niterói'
+    assert second.sections[0].footer.paragraphs[0].text == 'ontem'
+
+
+def test_compiled_template_reports_missing_keys_before_rendering():
+    template = CompiledTemplate.from_bytes(_template_bytes(), 'teste')
+    assert template.missing_keys({'cpf': '1'}) == ['cidade', 'data_extenso', 'nome_completo']
+    with pytest.raises(TemplateError, match='cidade, nome_completo'):
+        template.render({'cpf': '1'}, required={'nome_completo', 'cidade', 'cpf'})
+
+
+def test_compiled_template_keeps_placeholders_without_value():
+    template = CompiledTemplate.from_bytes(_template_bytes(), 'teste')
+    doc = template.render({'nome_completo': 'Ana', 'cpf': '1', 'cidade': 'Rio', 'extra': 'x'})
+    assert doc.paragraphs[0].text == 'Eu, Ana, CPF 1.'
+    assert doc.tables[0].rows[0].cells[0].text == 'Rio'
+    assert doc.sections[0].footer.paragraphs[0].text == '{{data_extenso}}'
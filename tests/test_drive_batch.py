@@ -0,0 +1,64 @@
+import pytest
+
+from utils.drive_batch import DriveBatch
+
+
+class FakeRequest:
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+        self.executed = 0
+
+    def execute(self):
+        self.executed += 1
+        if self.error:
+            raise self.error
+        return self.response
+
+
+class FakeBatchRequest:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.http_calls += 1
+        for request_id, request in reversed(self.requests):  # o Drive não garante a ordem
+            self.callback(request_id, request.response, request.error)
+
+
+class FakeDrive:
+    def __init__(self):
+        self.http_calls = 0
+
+    def new_batch_http_request(self, callback):
+        return FakeBatchRequest(self, callback)
+
+
+def test_batch_resolves_each_future_in_one_http_call():
+    drive = FakeDrive()
+    with DriveBatch(drive) as batch:
+        found = batch.add(FakeRequest({'id': 'pasta'}))
+        failed = batch.add(FakeRequest(error=ValueError('404')))
+        created = batch.add(FakeRequest({'id': 'nova'}))
+    assert drive.http_calls == 1
+    assert found.result() == {'id': 'pasta'}
+    assert created.result() == {'id': 'nova'}
+    assert isinstance(failed.exception(), ValueError)
+    with pytest.raises(ValueError):
+        failed.result()
+
+
+def test_result_sends_pending_batch_and_single_request_skips_envelope():
+    drive = FakeDrive()
+    batch = DriveBatch(drive)
+    request = FakeRequest({'id': 'x'})
+    future = batch.add(request)
+    assert not future.done()
+    assert future.result() == {'id': 'x'}
+    assert request.executed == 1 and drive.http_calls == 0
+    assert len(batch) == 0
@@ -0,0 +1,31 @@
+from utils.drive_folder_cache import DriveFolderCache
+
+
+def test_seed_keeps_registered_folders_and_is_persistent(tmp_path):
+    path = str(tmp_path / 'pastas.db')
+    cache = DriveFolderCache(path)
+    assert not cache.seeded
+    cache.set_client_folder('ANA_SILVA_12345678900', 'pasta-nova')
+    result = cache.seed(
+        [('ANA_SILVA_12345678900', 'pasta-antiga'), ('BRUNO_98765432100', 'pasta-bruno'), ('SEM_PASTA_1', None)],
+        [('caso-1', 'pasta-bruno', 'Atraso de Voo'), ('caso-sem-cliente', None, 'Outros')]
+    )
+    assert result == {'clients': 1, 'cases': 1}
+    assert cache.client_folder('ANA_SILVA_12345678900')['folder_id'] == 'pasta-nova'
+    cache.close()
+
+    reopened = DriveFolderCache(path)
+    assert reopened.seeded
+    assert reopened.client_folder('BRUNO_98765432100') == {'folder_id': 'pasta-bruno', 'verified_at': None}
+    assert [case['folder_id'] for case in reopened.case_folders('pasta-bruno')] == ['caso-1']
+
+
+def test_verification_and_forget():
+    cache = DriveFolderCache()
+    cache.seed([('BRUNO_98765432100', 'pasta-bruno')], [('caso-1', 'pasta-bruno', 'Atraso')])
+    assert cache.verified_at('pasta-bruno') is None
+    cache.mark_verified('pasta-bruno')
+    assert cache.verified_at('pasta-bruno') is not None
+    cache.forget('pasta-bruno')
+    assert cache.client_folder('BRUNO_98765432100') is None
+    assert cache.case_folders('pasta-bruno') == []
@@ -0,0 +1,109 @@
+import itertools
+
+from utils.drive_folder_cache import DriveFolderCache
+from utils.google_manager import GoogleManager
+
+
+class FakeRequest:
+    def __init__(self, run):
+        self.run = run
+
+    def execute(self):
+        return self.run()
+
+
+class FakeFiles:
+    def __init__(self, drive):
+        self.drive = drive
+
+    def get(self, fileId, fields):
+        def run():
+            if fileId not in self.drive.folders:
+                raise ValueError('404')
+            return {'id': fileId, 'trashed': self.drive.folders[fileId]['trashed']}
+        return FakeRequest(run)
+
+    def create(self, body, fields):
+        def run():
+            folder_id = 'pasta-%s' % next(self.drive.ids)
+            self.drive.folders[folder_id] = {'name': body['name'], 'parent': body['parents'][0], 'trashed': False}
+            return {'id': folder_id}
+        return FakeRequest(run)
+
+    def update(self, fileId, body, fields):
+        def run():
+            self.drive.folders[fileId]['trashed'] = body['trashed']
+            return {'id': fileId}
+        return FakeRequest(run)
+
+    def list(self, q, spaces, fields, pageSize):
+        return FakeRequest(lambda: {'files': []})
+
+
+class FakeBatchRequest:
+    def __init__(self, drive, callback):
+        self.drive = drive
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.drive.http_calls += 1
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except Exception as e:
+                self.callback(request_id, None, e)
+
+
+class FakeDrive:
+    def __init__(self):
+        self.folders = {}
+        self.ids = itertools.count(1)
+        self.http_calls = 0
+
+    def files(self):
+        return FakeFiles(self)
+
+    def new_batch_http_request(self, callback):
+        return FakeBatchRequest(self, callback)
+
+
+def _manager(drive):
+    manager = GoogleManager.__new__(GoogleManager)
+    manager.drive_service = drive
+    manager.folder_cache = DriveFolderCache()
+    return manager
+
+
+def _live(drive, parent):
+    return [folder for folder in drive.folders.values() if folder['parent'] == parent and not folder['trashed']]
+
+
+def test_unverified_client_folder_is_checked_then_skipped_while_fresh():
+    drive = FakeDrive()
+    drive.folders['cliente'] = {'name': 'ANA_123', 'parent': 'raiz', 'trashed': False}
+    manager = _manager(drive)
+    manager.folder_cache.seed([('ANA_123', 'cliente')], [])
+
+    assert manager.create_onboarding_folders('Ana', '123', 'Atraso', 'cliente')[0] == 'cliente'
+    assert drive.http_calls == 1
+    assert manager.folder_cache.verified_at('cliente') is not None
+
+    manager.create_onboarding_folders('Ana', '123', 'Extravio', 'cliente')
+    assert drive.http_calls == 1
+    assert len(_live(drive, 'cliente')) == 2
+
+
+def test_case_folder_created_in_trashed_client_folder_is_discarded():
+    drive = FakeDrive()
+    drive.folders['cliente'] = {'name': 'ANA_123', 'parent': 'raiz', 'trashed': True}
+    manager = _manager(drive)
+
+    client_folder_id, case_folder_id = manager.create_onboarding_folders('Ana', '123', 'Atraso', 'cliente')
+
+    assert client_folder_id != 'cliente'
+    assert _live(drive, 'cliente') == []
+    assert [folder['name'] for folder in _live(drive, client_folder_id)] == [drive.folders[case_folder_id]['name']]
@@ -0,0 +1,22 @@
+import logging
+
+from utils.logger import SamplingFilter
+
+
+def _record(level, msg='evento %s', name='teste'):
+    return logging.LogRecord(name, level, __file__, 1, msg, (1,), None)
+
+
+def test_sampling_keeps_burst_then_one_in_rate():
+    sampler = SamplingFilter(rate=5, burst=3)
+    kept = [sampler.filter(_record(logging.DEBUG)) for _ in range(20)]
+    assert kept[:3] == [True] * 3
+    assert sum(kept[3:]) == 4  # contagens 5, 10, 15 e 20
+
+
+def test_sampling_is_per_message_and_never_drops_info():
+    sampler = SamplingFilter(rate=100, burst=1)
+    assert sampler.filter(_record(logging.DEBUG))
+    assert not sampler.filter(_record(logging.DEBUG))
+    assert sampler.filter(_record(logging.DEBUG, msg='outro %s'))
+    assert all(sampler.filter(_record(logging.INFO)) for _ in range(10))
@@ -0,0 +1,66 @@
+import pytest
+from utils.metrics import MetricsRegistry, add_bytes, instrument, instrument_methods, percentile
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+def test_instrument_records_calls_rows_and_bytes():
+    registry = MetricsRegistry()
+
+    @instrument(registry, 'busca')
+    def busca():
+        add_bytes(100)
+        return [{'id': 1}, {'id': 2}]
+
+    busca()
+    busca()
+    snapshot = registry.snapshot()['busca']
+    assert snapshot['calls'] == 2
+    assert snapshot['rows'] == 4
+    assert snapshot['bytes'] == 200
+    assert snapshot['errors'] == 0
+
+def test_instrument_records_errors():
+    registry = MetricsRegistry()
+
+    @instrument(registry, 'falha')
+    def falha():
+        raise ValueError("erro")
+
+    with pytest.raises(ValueError):
+        falha()
+    assert registry.snapshot()['falha']['errors'] == 1
+
+def test_nested_calls_share_bytes_and_slow_log():
+    registry = MetricsRegistry(slow_threshold_ms=0)
+
+    @instrument_methods(registry)
+    class Manager:
+        def interno(self):
+            add_bytes(10)
+            return {'id': 1}
+
+        def externo(self):
+            add_bytes(5)
+            return [self.interno()]
+
+        def _privado(self):
+            return None
+
+    Manager().externo()
+    snapshot = registry.snapshot()
+    assert snapshot['Manager.externo']['bytes'] == 15
+    assert snapshot['Manager.interno']['bytes'] == 10
+    assert snapshot['Manager.externo']['slow_calls'] == 1
+    assert 'Manager._privado' not in snapshot
+
+def test_reservoir_is_bounded():
+    registry = MetricsRegistry(reservoir_size=8)
+    for _ in range(100):
+        registry.record('consulta', 0.01)
+    assert len(registry._methods['consulta']._samples) == 8
+    assert registry.snapshot()['consulta']['calls'] == 100
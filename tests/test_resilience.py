@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+from utils.error_handler import DatabaseError
+from utils.resilience import (
+    AMBIGUOUS,
+    NOT_SENT,
+    ROLLED_BACK,
+    CircuitBreaker,
+    RetryPolicy,
+    call_with_resilience,
+    call_with_resilience_async,
+    classify_error
+)
+
+def flaky(errors, result='ok'):
+    """Função que levanta os erros da lista, um por chamada, e depois retorna result"""
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+    return func, calls
+
+def no_sleep_policy(max_attempts=3):
+    return RetryPolicy(max_attempts=max_attempts, sleep=lambda seconds: None)
+
+def test_classify_error():
+    assert classify_error(httpx.ConnectError("falha")) == NOT_SENT
+    assert classify_error(httpx.ReadTimeout("lento")) == AMBIGUOUS
+    assert classify_error(APIError({'code': 503, 'message': 'x'})) == NOT_SENT
+    assert classify_error(APIError({'code': '40001', 'message': 'x'})) == ROLLED_BACK
+    assert classify_error(APIError({'code': '23505', 'message': 'duplicate key value'})) is None
+    assert classify_error(ValueError("x")) is None
+
+def test_backoff_is_bounded():
+    policy = RetryPolicy(base_delay=0.5, max_delay=1.0)
+    for attempt in range(1, 10):
+        assert 0 <= policy.delay(attempt) <= 1.0
+
+def test_retries_transient_errors_for_idempotent_calls():
+    func, calls = flaky([httpx.ReadTimeout("lento"), httpx.ConnectError("falha")])
+    assert call_with_resilience(func, no_sleep_policy()) == 'ok'
+    assert len(calls) == 3
+
+def test_does_not_retry_ambiguous_errors_for_non_idempotent_calls():
+    func, calls = flaky([httpx.ReadTimeout("lento")])
+    with pytest.raises(httpx.ReadTimeout):
+        call_with_resilience(func, no_sleep_policy(), idempotent=False)
+    assert len(calls) == 1
+
+    func, calls = flaky([httpx.ConnectError("falha")])
+    assert call_with_resilience(func, no_sleep_policy(), idempotent=False) == 'ok'
+
+def test_async_calls_follow_the_same_policy():
+    func, calls = flaky([httpx.ConnectError("falha")])
+
+    async def coroutine():
+        return func()
+
+    breaker = CircuitBreaker(failure_threshold=5)
+    policy = RetryPolicy(base_delay=0)
+    assert asyncio.run(call_with_resilience_async(coroutine, policy, breaker)) == 'ok'
+    assert len(calls) == 2 and breaker.state == CircuitBreaker.CLOSED
+
+    func, calls = flaky([httpx.ReadTimeout("lento")])
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(call_with_resilience_async(coroutine, policy, idempotent=False))
+    assert len(calls) == 1
+
+def test_does_not_retry_permanent_errors():
+    func, calls = flaky([APIError({'code': '23505', 'message': 'duplicate key value'})])
+    with pytest.raises(APIError):
+        call_with_resilience(func, no_sleep_policy())
+    assert len(calls) == 1
+
+def test_circuit_breaker_opens_and_recovers():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10, clock=lambda: now[0])
+    policy = no_sleep_policy(max_attempts=1)
+
+    for _ in range(2):
+        func, _calls = flaky([httpx.ConnectError("falha")])
+        with pytest.raises(httpx.ConnectError):
+            call_with_resilience(func, policy, breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    func, calls = flaky([])
+    with pytest.raises(DatabaseError):
+        call_with_resilience(func, policy, breaker)
+    assert calls == []
+
+    now[0] = 11.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert call_with_resilience(func, policy, breaker) == 'ok'
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,51 @@
+import pytest
+from utils.search_index import TrigramIndex, normalize
+
+CLIENTES = [
+    {'id': 1, 'nome_completo': 'João da Silva', 'cpf': '123.456.789-00', 'email': 'joao@example.com'},
+    {'id': 2, 'nome_completo': 'Maria Joana Souza', 'cpf': '987.654.321-00', 'email': 'mjs@example.com'},
+    {'id': 3, 'nome_completo': 'Pedro Álvares Cabral', 'cpf': '111.222.333-44', 'email': 'pedro@example.com'},
+]
+
+@pytest.fixture
+def index():
+    index = TrigramIndex()
+    index.add_many(CLIENTES)
+    return index
+
+def ids(results):
+    return [r['id'] for r in results]
+
+def test_normalize():
+    assert normalize("  João  ÁLVARES ") == "joao alvares"
+
+def test_search_ignores_accents(index):
+    assert ids(index.search("Joao")) == [1]
+    assert ids(index.search("alvares")) == [3]
+
+def test_search_partial_word(index):
+    assert ids(index.search("ilva")) == [1]
+    assert ids(index.search("jo")) == [1, 2]
+
+def test_search_cpf_and_email(index):
+    assert ids(index.search("987.654")) == [2]
+    assert ids(index.search("12345678")) == [1]
+    assert ids(index.search("pedro@")) == [3]
+
+def test_search_no_match(index):
+    assert index.search("xyz") == []
+    assert index.search("") == []
+
+def test_incremental_updates(index):
+    index.add({'id': 4, 'nome_completo': 'José Joaquim', 'cpf': '555', 'email': 'jj@example.com'})
+    assert ids(index.search("jose")) == [4]
+    assert 4 in index
+
+    index.add({'id': 1, 'nome_completo': 'Joana Prado', 'cpf': '123.456.789-00', 'email': 'joao@example.com'})
+    assert ids(index.search("silva")) == []
+    assert ids(index.search("prado")) == [1]
+
+    index.remove(1)
+    assert 1 not in index
+    assert ids(index.search("prado")) == []
+    assert len(index) == 3
@@ -0,0 +1,42 @@
+from utils.similarity_index import HashedTfidfIndex
+
+DOCS = [
+    {'id': 1, 'nome': 'cancelamento_voo_sem_aviso', 'secao': 'Deveres do Transportador',
+     'texto': 'Cancelamento do voo sem aviso prévio ao passageiro gera dano moral.'},
+    {'id': 2, 'nome': 'extravio_bagagem', 'secao': 'Dos Prejuízos',
+     'texto': 'Extravio definitivo de bagagem; indenização por danos materiais.'},
+    {'id': 3, 'nome': 'atraso_conexao', 'secao': 'Da Inteligência',
+     'texto': 'Atraso superior a quatro horas e perda da conexão internacional.'},
+]
+
+def test_scores_are_cosine_similarities():
+    index = HashedTfidfIndex(DOCS)
+    scores = index.scores('A bagagem do cliente foi extraviada e ele teve danos materiais')
+    assert scores.shape == (3,)
+    assert scores.argmax() == 1
+    assert 0 < scores.max() <= 1.0001
+    assert index.scores('').max() == 0
+
+def test_rank_for_sections_boosts_matching_secao():
+    index = HashedTfidfIndex(DOCS)
+    text = 'O voo atrasou cinco horas e o passageiro perdeu a conexão'
+    ranking = index.rank_for_sections(text, ['Da Inteligência', 'Dos Prejuízos'], boost=0.15)
+    assert ranking['Da Inteligência'][0]['id'] == 3
+    # A semelhança com os fatos continua valendo; a seção só soma o bônus
+    scores = {section: {item['id']: item['score'] for item in items} for section, items in ranking.items()}
+    assert abs(scores['Dos Prejuízos'][2] - scores['Da Inteligência'][2] - 0.15) < 1e-6
+    assert [item['id'] for item in ranking['Dos Prejuízos']][:2] == [3, 2]
+    assert len(index.rank_for_sections(text, ['Dos Prejuízos'], limit=1)['Dos Prejuízos']) == 1
+    assert HashedTfidfIndex([]).rank_for_sections(text, ['Dos Prejuízos']) == {'Dos Prejuízos': []}
+
+def test_snake_case_secao_matches_section_title():
+    docs = DOCS + [{'id': 4, 'nome': 'dever_informacao', 'secao': 'deveres_transportador',
+                    'texto': 'A companhia deve informar o passageiro sobre o cancelamento do voo.'}]
+    index = HashedTfidfIndex(docs)
+    text = 'O voo foi cancelado sem aviso'
+    base = {doc_id: float(score) for doc_id, score in zip(index.ids, index.scores(text))}
+    ranking = index.rank_for_sections(text, ['Deveres do Transportador'], boost=0.15)
+    scores = {item['id']: item['score'] for item in ranking['Deveres do Transportador']}
+    assert abs(scores[4] - base[4] - 0.15) < 1e-6
+    assert abs(scores[1] - base[1] - 0.15) < 1e-6
+    assert abs(scores[2] - base[2]) < 1e-6
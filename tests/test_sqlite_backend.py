@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from postgrest.exceptions import APIError
+
+from utils.sqlite_backend import (
+    SQLiteDatabase,
+    create_async_sqlite_client,
+    create_sqlite_client,
+    seed_database
+)
+
+@pytest.fixture
+def database():
+    db = SQLiteDatabase(':memory:')
+    seed_database(db, clientes=50, jurisprudencias=5)
+    yield db
+    db.close()
+
+@pytest.fixture
+def client(database):
+    return create_sqlite_client(database)
+
+def test_select_with_filters_order_and_limit(client):
+    rows = client.table('clientes')\
+        .select('id,nome_completo')\
+        .gt('id', 10)\
+        .order('id', desc=True)\
+        .limit(3)\
+        .execute().data
+    assert [row['id'] for row in rows] == [50, 49, 48]
+    assert set(rows[0]) == {'id', 'nome_completo'}
+
+def test_logic_filters_and_ilike(client):
+    nome = client.table('clientes').select('nome_completo').eq('id', 1).execute().data[0]['nome_completo']
+    query = client.table('clientes').select('id')
+    query.params = query.params.add('or', f'(nome_completo.ilike.*{nome.upper()}*,cpf.eq."000.000.000-02")')
+    ids = {row['id'] for row in query.execute().data}
+    assert {1, 2} <= ids
+
+def test_unique_violation_maps_to_postgres_error(client):
+    cpf = client.table('clientes').select('cpf').eq('id', 1).execute().data[0]['cpf']
+    with pytest.raises(APIError) as error:
+        client.table('clientes').insert({'nome_completo': 'X', 'email': 'x@x.com', 'cpf': cpf}).execute()
+    assert error.value.code == '23505'
+
+def test_write_and_rpc_round_trip(client):
+    result = client.rpc('create_client_with_case', {
+        'p_client': {'nome_completo': 'Novo Cliente', 'email': 'novo@example.com', 'cpf': '111.111.111-11'},
+        'p_case': {'caso': 'Aéreo', 'assunto_caso': 'Atraso', 'responsavel_comercial': 'Ana'}
+    }).execute().data[0]
+    client_id = result['cliente']['id']
+    assert result['caso']['cliente_id'] == client_id
+
+    with pytest.raises(APIError):
+        client.rpc('insert_client', {
+            'p_client': {'nome_completo': 'Outro', 'email': 'NOVO@example.com ', 'cpf': '222.222.222-22'}
+        }).execute()
+
+    status = client.rpc('delete_client_if_no_cases', {'p_client_id': client_id}).execute().data[0]
+    assert status == {'deleted': False, 'client_exists': True, 'case_count': 1}
+
+    client.table('casos').delete().eq('cliente_id', client_id).execute()
+    updated = client.table('clientes').update({'cidade': 'Niterói'}).eq('id', client_id).execute().data
+    assert updated[0]['cidade'] == 'Niterói'
+    status = client.rpc('delete_client_if_no_cases', {'p_client_id': client_id}).execute().data[0]
+    assert status['deleted'] is True
+
+def test_async_client(database):
+    async def fetch():
+        async with create_async_sqlite_client(database) as client:
+            return await client.table('companhiasAereas').select('id,nome').execute()
+
+    assert len(asyncio.run(fetch()).data) > 0
+
+def test_updates_touch_updated_at_and_deletions_leave_tombstones(client):
+    before = client.table('clientes').select('updated_at').eq('id', 1).execute().data[0]['updated_at']
+    client.table('clientes').update({'cidade': 'Niterói'}).eq('id', 1).execute()
+    after = client.table('clientes').select('updated_at').eq('id', 1).execute().data[0]['updated_at']
+    assert after > before
+
+    client.table('casos').delete().eq('cliente_id', 2).execute()
+    client.table('clientes').delete().eq('id', 2).execute()
+    tombstones = client.table('clientes_excluidos').select('id,deleted_at').execute().data
+    assert [row['id'] for row in tombstones] == [2]
@@ -0,0 +1,172 @@
+import pytest
+
+import utils.supabase_manager as supabase_manager
+from utils.sqlite_backend import SQLiteDatabase, create_sqlite_client, seed_database
+from utils.supabase_manager import SupabaseManager
+
+
+@pytest.fixture
+def database():
+    db = SQLiteDatabase(':memory:')
+    seed_database(db, clientes=30, jurisprudencias=12)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def manager(database, monkeypatch):
+    client = create_sqlite_client(database)
+    monkeypatch.setattr(supabase_manager, 'get_database_client', lambda: client)
+    SupabaseManager.invalidate_reference_cache()
+    supabase_manager._jurisprudencia_vectors.update({'rows': None, 'index': None})
+    yield SupabaseManager()
+    SupabaseManager.invalidate_reference_cache()
+    SupabaseManager.reset_client_index()
+    SupabaseManager.reset_jurisprudencia_index()
+
+
+def test_rank_jurisprudencias_builds_the_matrix_once(manager, monkeypatch):
+    builds = []
+    real_index = supabase_manager.HashedTfidfIndex
+
+    def counting_index(rows):
+        builds.append(len(rows))
+        return real_index(rows)
+
+    monkeypatch.setattr(supabase_manager, 'HashedTfidfIndex', counting_index)
+    sections = ['Dano moral']
+
+    first = manager.rank_jurisprudencias('atraso do voo', sections)
+    assert manager.rank_jurisprudencias('atraso do voo', sections) == first
+    assert manager.rank_jurisprudencias('extravio de bagagem', sections)
+    assert len(builds) == 1
+
+    # Uma escrita na tabela descarta a lista em cache e a matriz é refeita
+    manager.add_jurisprudencia({'nome': 'Nova', 'texto': 'overbooking', 'secao': 'Dano moral',
+                                'Tribunal': 'TJSP'})
+    manager.rank_jurisprudencias('overbooking', sections)
+    assert builds == [12, 13]
+
+
+def test_update_many_writes_only_changed_columns_and_never_inserts(manager, database):
+    client = manager.supabase
+    before = client.table('clientes').select('*').in_('id', [1, 2]).order('id').execute().data
+    # Outro usuário alterou a profissão do cliente 1 depois que a grade foi carregada
+    client.table('clientes').update({'profissao': 'Piloto'}).eq('id', 1).execute()
+
+    results = manager.update_many('clientes', [
+        {'id': 1, 'cidade': 'Niterói'},
+        {'id': 2, 'cidade': 'Niterói'},
+        {'id': 3, 'bairro': 'Centro'},
+        {'id': 9999, 'cidade': 'Niterói'},
+        {'cidade': 'Sem id'},
+    ])
+
+    assert [r['ok'] for r in results] == [True, True, True, False, False]
+    assert results[3]['error'] == 'Registro não encontrado'
+    after = {row['id']: row for row in client.table('clientes').select('*').in_('id', [1, 2, 3, 9999]).execute().data}
+    assert set(after) == {1, 2, 3}
+    assert after[1]['profissao'] == 'Piloto' and after[1]['cidade'] == 'Niterói'
+    assert after[2]['nome_completo'] == before[1]['nome_completo']
+    assert after[3]['bairro'] == 'Centro'
+
+
+def test_reference_cache_serves_copies_until_expiry(manager, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(supabase_manager.time, 'monotonic', lambda: clock[0])
+    cache = supabase_manager._reference_cache
+    misses = cache.misses
+
+    manager.get_all_companies().clear()
+
+    # Alterar a lista devolvida não altera a que está em cache
+    companies = manager.get_all_companies()
+    assert companies
+    companies.append({'id': -1})
+    again = manager.get_all_companies()
+    assert len(again) == len(companies) - 1
+    assert cache.misses == misses + 1
+
+    manager.supabase.table('companhiasAereas').update({'nome': 'Direto no banco'}).eq('id', again[0]['id']).execute()
+    assert manager.get_all_companies()[0]['nome'] != 'Direto no banco'
+    clock[0] += supabase_manager.REFERENCE_CACHE_TTL + 1
+    assert manager.get_all_companies()[0]['nome'] == 'Direto no banco'
+    assert cache.misses == misses + 2
+
+
+def test_writes_invalidate_the_reference_cache(manager):
+    companies = manager.get_all_companies()
+    manager.add_company({'nome': 'Nova Aérea', 'cnpj': '00.000.000/0001-00', 'endereco': 'Rua A'})
+    after_insert = manager.get_all_companies()
+    assert len(after_insert) == len(companies) + 1
+
+    new_id = next(row['id'] for row in after_insert if row['nome'] == 'Nova Aérea')
+    manager.update_company(new_id, {'nome': 'Renomeada'})
+    assert 'Renomeada' in [row['nome'] for row in manager.get_all_companies()]
+
+    manager.delete_company(new_id)
+    assert len(manager.get_all_companies()) == len(companies)
+
+    manager.update_many('companhiasAereas', [{'id': companies[0]['id'], 'endereco': 'Rua B'}])
+    assert manager.get_all_companies()[0]['endereco'] == 'Rua B'
+
+
+def _all_pages(fetch):
+    rows, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        rows.extend(page['rows'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return rows
+
+
+@pytest.mark.parametrize('sort_column', ['nome_completo', 'created_at', 'id'])
+@pytest.mark.parametrize('desc', [False, True])
+def test_clients_keyset_pages_cover_every_row_once_with_ties(manager, sort_column, desc):
+    client = manager.supabase
+    # Empates na coluna de ordenação, atravessando as fronteiras das páginas
+    client.table('clientes').update({'nome_completo': 'Maria Silva', 'created_at': '2024-01-01T00:00:00+00:00'})\
+        .lte('id', 12).execute()
+    expected = client.table('clientes').select('id,nome_completo,created_at').execute().data
+    expected.sort(key=lambda row: row['id'], reverse=desc)
+    expected.sort(key=lambda row: row[sort_column], reverse=desc)
+
+    rows = _all_pages(lambda cursor: manager.get_clients_page(
+        page_size=5, cursor=cursor, sort_column=sort_column, desc=desc, columns='id,nome_completo,created_at'
+    ))
+
+    assert [row['id'] for row in rows] == [row['id'] for row in expected]
+
+
+def test_clients_keyset_pages_with_filter(manager):
+    everyone = manager.supabase.table('clientes').select('id,nome_completo,email,cpf').execute().data
+    expected = sorted(
+        (row for row in everyone if any('silva' in row[field].lower() for field in ('nome_completo', 'email', 'cpf'))),
+        key=lambda row: (row['nome_completo'], row['id'])
+    )
+    rows = _all_pages(lambda cursor: manager.get_clients_page(
+        page_size=2, cursor=cursor, filter_text='silva', columns='id,nome_completo'
+    ))
+    assert expected and len(expected) < len(everyone)
+    assert [row['id'] for row in rows] == [row['id'] for row in expected]
+
+
+def test_case_keyset_pages_cover_ties_and_null_keys(manager):
+    client = manager.supabase
+    client_id = client.table('clientes').insert({
+        'nome_completo': 'Cliente Paginado', 'email': 'paginado@example.com', 'cpf': '000.000.000-00'
+    }).execute().data[0]['id']
+    keys = ['B', None, 'B', 'A', None, 'C', 'B', None, 'A', 'C', None]
+    client.table('casos').insert([
+        {'cliente_id': client_id, 'assunto_caso': f'Caso {i}', 'chave_caso': key}
+        for i, key in enumerate(keys)
+    ]).execute()
+    cases = client.table('casos').select('id,chave_caso').eq('cliente_id', client_id).execute().data
+    # chave_caso decrescente com as nulas por último; empates por id decrescente
+    expected = sorted(cases, key=lambda row: (row['chave_caso'] is not None, row['chave_caso'] or '', row['id']),
+                      reverse=True)
+
+    for page_size in (1, 2, 3, len(keys)):
+        rows = _all_pages(lambda cursor: manager.get_client_cases_page(client_id, cursor, page_size=page_size))
+        assert [row['id'] for row in rows] == [row['id'] for row in expected]
@@ -0,0 +1,86 @@
+import hashlib
+import io
+import os
+
+from docx import Document
+
+from utils.template_cache import TemplateCache
+
+
+def _docx(text):
+    doc = Document()
+    doc.add_paragraph(text)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+class FakeFiles:
+    def __init__(self, drive):
+        self.drive = drive
+
+    def get(self, fileId, fields):
+        drive = self.drive
+
+        class Request:
+            def execute(self):
+                drive.metadata_calls += 1
+                return {'name': 'Petição', 'md5Checksum': hashlib.md5(drive.content).hexdigest(),
+                        'modifiedTime': drive.modified}
+        return Request()
+
+
+class FakeDrive:
+    def __init__(self, content):
+        self.content = content
+        self.modified = '2024-01-01T00:00:00.000Z'
+        self.metadata_calls = 0
+        self.downloads = 0
+
+    def files(self):
+        return FakeFiles(self)
+
+
+def _cache(tmp_path, monkeypatch):
+    def download(drive_service, file_id):
+        drive_service.downloads += 1
+        return drive_service.content
+    monkeypatch.setattr(TemplateCache, '_download', staticmethod(download))
+    return TemplateCache(str(tmp_path))
+
+
+def test_drive_template_downloaded_only_when_it_changes(tmp_path, monkeypatch):
+    drive = FakeDrive(_docx('Autor: {{nome_completo}}'))
+    cache = _cache(tmp_path, monkeypatch)
+
+    first = cache.drive(drive, 'abc')
+    assert cache.drive(drive, 'abc') is first
+    assert (drive.metadata_calls, drive.downloads) == (2, 1)
+    assert first.placeholder_keys == {'nome_completo'}
+
+    drive.content = _docx('Réu: {{nome_empresa_re}}')
+    drive.modified = '2024-02-01T00:00:00.000Z'
+    assert cache.drive(drive, 'abc').placeholder_keys == {'nome_empresa_re'}
+    assert drive.downloads == 2
+
+
+def test_drive_template_reused_from_disk_after_restart(tmp_path, monkeypatch):
+    drive = FakeDrive(_docx('{{cpf}}'))
+    _cache(tmp_path, monkeypatch).drive(drive, 'abc')
+
+    restarted = TemplateCache(str(tmp_path))
+    assert restarted.drive(drive, 'abc').placeholder_keys == {'cpf'}
+    assert drive.downloads == 1
+
+
+def test_local_template_recompiled_when_file_changes(tmp_path):
+    path = tmp_path / 'modelo.docx'
+    path.write_bytes(_docx('{{rg}}'))
+    cache = TemplateCache()
+
+    first = cache.local(str(path))
+    assert cache.local(str(path)) is first
+
+    path.write_bytes(_docx('{{rg}} {{cpf}}'))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000_000))
+    assert cache.local(str(path)).placeholder_keys == {'rg', 'cpf'}
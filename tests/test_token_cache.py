@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+
+from utils.token_cache import SharedTokenCache
+
+
+class Exchanger:
+    def __init__(self, lifetime=3600):
+        self.calls = 0
+        self.lifetime = lifetime
+
+    def __call__(self):
+        self.calls += 1
+        return f"token-{self.calls}", datetime.utcnow() + timedelta(seconds=self.lifetime)
+
+
+def test_token_is_shared_between_cache_instances(tmp_path):
+    path = str(tmp_path / 'token.json')
+    exchange = Exchanger()
+    first = SharedTokenCache(path).get_or_refresh('sa|drive', exchange)
+    # Outro processo (outra instância sobre o mesmo arquivo) reaproveita o token
+    second = SharedTokenCache(path).get_or_refresh('sa|drive', exchange)
+    assert first == second and exchange.calls == 1
+    assert SharedTokenCache(path).get_or_refresh('sa|sheets', exchange)['token'] == 'token-2'
+
+
+def test_refreshes_near_expiry_and_after_rejection(tmp_path):
+    cache = SharedTokenCache(str(tmp_path / 'token.json'))
+    exchange = Exchanger(lifetime=200)
+    assert cache.get_or_refresh('k', exchange, min_ttl=60)['token'] == 'token-1'
+    assert cache.get_or_refresh('k', exchange, min_ttl=60)['token'] == 'token-1'
+    # Renovação antecipada: pede mais validade do que resta
+    assert cache.get_or_refresh('k', exchange, min_ttl=300)['token'] == 'token-2'
+    # Token recusado pela API: troca mesmo ainda válido
+    assert cache.get_or_refresh('k', exchange, stale_token='token-2')['token'] == 'token-3'
+    assert exchange.calls == 3
@@ -0,0 +1,64 @@
+import gzip
+import json
+
+import pytest
+
+from utils.training_export import FORMAT_CHAT, TrainingExporter
+
+class FakeManager:
+    def __init__(self, rows, fail_after_pages=None):
+        self.rows = rows
+        self.pages = 0
+        self.fail_after_pages = fail_after_pages
+
+    def get_training_facts_page(self, after_id=None, limit=1000, caso=None, start=None, end=None):
+        if self.fail_after_pages is not None and self.pages >= self.fail_after_pages:
+            raise ConnectionError("conexão perdida")
+        self.pages += 1
+        rows = [r for r in self.rows
+                if (after_id is None or r['id'] > after_id)
+                and (caso is None or r['caso'] == caso)
+                and (start is None or r['created_at'] >= start)
+                and (end is None or r['created_at'] < end)]
+        return rows[:limit]
+
+ROWS = [
+    {'id': i, 'caso': 'Atraso' if i % 2 else 'Extravio', 'created_at': f'2024-01-{i:02d}T10:00:00',
+     'input': f'fatos {i}', 'output': f'texto {i}'}
+    for i in range(1, 21)
+]
+
+def read_ids(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line)['id'] for line in f]
+
+def test_export_filters(tmp_path):
+    path = str(tmp_path / 'fatos.jsonl')
+    result = TrainingExporter(FakeManager(ROWS), page_size=3).export(
+        path, caso='Atraso', start='2024-01-05', end='2024-01-15'
+    )
+    assert read_ids(path) == [5, 7, 9, 11, 13]
+    assert result['records'] == 5 and result['done']
+
+def test_gzip_export_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / 'fatos.jsonl.gz')
+    with pytest.raises(ConnectionError):
+        TrainingExporter(FakeManager(ROWS, fail_after_pages=2), page_size=4).export(path)
+    assert read_ids(path) == list(range(1, 9))
+
+    manager = FakeManager(ROWS)
+    result = TrainingExporter(manager, page_size=4).export(path)
+    assert read_ids(path) == list(range(1, 21))
+    assert result['records'] == 20
+    assert manager.pages == 4  # 3 páginas completas + a consulta vazia do fim
+
+def test_chat_format(tmp_path):
+    path = str(tmp_path / 'chat.jsonl')
+    TrainingExporter(FakeManager(ROWS[:1])).export(path, record_format=FORMAT_CHAT)
+    with open(path, encoding='utf-8') as f:
+        record = json.loads(f.readline())
+    assert record == {'messages': [
+        {'role': 'user', 'content': 'fatos 1'},
+        {'role': 'assistant', 'content': 'texto 1'}
+    ]}
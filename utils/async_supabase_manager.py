@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from postgrest import AsyncPostgrestClient
+
+from utils.database_backend import create_async_database_client
+from utils.metrics import instrument_methods
+from utils.resilience import call_with_resilience_async
+from utils.supabase_manager import (
+    _MISSING,
+    _circuit_breaker,
+    _metrics,
+    _reference_cache,
+    _retry_policy,
+    _client_cases_page_query,
+    _cases_page_result,
+    CLIENT_DETAIL_COLUMNS,
+    COMPANY_COLUMNS,
+    JURISPRUDENCIA_LIST_COLUMNS,
+    CASE_COLUMNS,
+    CASE_SUMMARY_COLUMNS,
+    CASES_PAGE_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+# Loop de eventos e cliente assíncrono compartilhados pelo processo: o loop
+# roda numa thread própria, e o cliente (com suas conexões keep-alive) fica
+# preso a ele, então cada rerun do Streamlit só envia as corrotinas
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client: Optional[AsyncPostgrestClient] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='async-supabase', daemon=True).start()
+            logger.info("Loop de eventos assíncrono do Supabase iniciado")
+        return _loop
+
+
+@instrument_methods(_metrics)
+class AsyncSupabaseManager:
+    """
+    Variante assíncrona (somente leitura) do SupabaseManager
+
+    Serve para carregar em paralelo os dados independentes de uma página:
+    o tempo de carga passa a ser o da consulta mais lenta, não a soma de
+    todas. As leituras das tabelas de referência usam o mesmo cache do
+    SupabaseManager, então o que for carregado aqui já fica disponível
+    para as chamadas síncronas da página; as consultas passam pelas mesmas
+    novas tentativas, disjuntor e métricas.
+
+    Uso (só para o que ainda não está na sessão ou no cache):
+        queries = {'cases': lambda db: db.get_client_cases(client_id)}
+        if not AsyncSupabaseManager.reference_cached('companhiasAereas'):
+            queries['companies'] = lambda db: db.get_all_companies()
+        results = AsyncSupabaseManager.run(queries)
+    """
+
+    def __init__(self, client: AsyncPostgrestClient):
+        self.postgrest = client
+
+    @staticmethod
+    def _create_client() -> AsyncPostgrestClient:
+        """Cliente assíncrono com a mesma URL e credenciais do cliente compartilhado"""
+        return create_async_database_client()
+
+    @classmethod
+    def _shared_client(cls) -> AsyncPostgrestClient:
+        """Cliente do processo (criado na primeira consulta, dentro do loop compartilhado)"""
+        global _client
+        if _client is None:
+            _client = cls._create_client()
+        return _client
+
+    @staticmethod
+    async def _execute(query, idempotent: bool = True):
+        """Executa a consulta com novas tentativas e disjuntor, como SupabaseManager._execute"""
+        return await call_with_resilience_async(query.execute, _retry_policy, _circuit_breaker,
+                                                idempotent=idempotent)
+
+    @staticmethod
+    def reference_cached(table: str, columns: str = None) -> bool:
+        """Se a leitura completa da tabela de referência já está no cache compartilhado"""
+        default_columns = {
+            'companhiasAereas': COMPANY_COLUMNS,
+            'jurisprudenciaAereo': JURISPRUDENCIA_LIST_COLUMNS
+        }
+        return _reference_cache.contains((table, 'all', columns or default_columns[table]))
+
+    @classmethod
+    async def _gather(cls, queries: Dict[str, Callable[['AsyncSupabaseManager'], Awaitable[Any]]],
+                      return_exceptions: bool = False) -> Dict[str, Any]:
+        """
+        Executa as consultas concorrentemente e espera todas terminarem
+
+        Roda no loop compartilhado (ver run), onde vive o cliente do processo.
+
+        Args:
+            queries: Nome -> função que recebe o manager e retorna a corrotina
+            return_exceptions: Se True, uma consulta com erro devolve a exceção
+                no lugar do resultado em vez de interromper as demais
+
+        Returns:
+            Nome -> resultado de cada consulta
+        """
+        manager = cls(cls._shared_client())
+        names = list(queries)
+        results = await asyncio.gather(
+            *(queries[name](manager) for name in names),
+            return_exceptions=return_exceptions
+        )
+        return dict(zip(names, results))
+
+    @classmethod
+    def run(cls, queries: Dict[str, Callable[['AsyncSupabaseManager'], Awaitable[Any]]],
+            return_exceptions: bool = False) -> Dict[str, Any]:
+        """Executa _gather no loop compartilhado e espera o resultado (para as páginas do Streamlit)"""
+        if not queries:
+            return {}
+        future = asyncio.run_coroutine_threadsafe(
+            cls._gather(queries, return_exceptions=return_exceptions), _get_loop()
+        )
+        return future.result()
+
+    @classmethod
+    def shutdown(cls):
+        """Fecha o cliente e para o loop compartilhados (o próximo run cria outros)"""
+        global _loop, _client
+        with _loop_lock:
+            loop, client = _loop, _client
+            _loop = _client = None
+        if loop is None:
+            return
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    async def _cached_select(self, key: tuple, fetch: Callable[[], Awaitable[List[Dict[str, Any]]]]):
+        """Leitura via cache compartilhado com o SupabaseManager"""
+        data = _reference_cache.get(key, _MISSING)
+        if data is _MISSING:
+            data = await fetch()
+            _reference_cache.set(key, data)
+        return list(data)
+
+    async def get_client_by_id(self, client_id, columns: str = CLIENT_DETAIL_COLUMNS) -> Optional[Dict[str, Any]]:
+        """Busca os dados completos de um cliente pelo ID"""
+        try:
+            response = await self._execute(self.postgrest.table('clientes')\
+                .select(columns)\
+                .eq('id', client_id))
+            return response.data[0] if response.data else None
+        except Exception as e:
+            raise Exception(f"Erro ao buscar cliente por ID: {str(e)}")
+
+    async def get_client_cases(self, client_id) -> List[Dict[str, Any]]:
+        """Busca todos os casos de um cliente específico"""
+        try:
+            response = await self._execute(self.postgrest.table('casos')\
+                .select(CASE_COLUMNS)\
+                .eq('cliente_id', client_id)\
+                .order('chave_caso', desc=True))
+            return response.data
+        except Exception as e:
+            logger.error("Erro ao buscar casos do cliente: %s", e)
+            return []
+
+    async def get_client_cases_page(self, client_id, cursor: Optional[tuple] = None,
+                                    page_size: int = CASES_PAGE_SIZE,
+                                    columns: str = CASE_SUMMARY_COLUMNS) -> Dict[str, Any]:
+        """Busca uma página dos casos de um cliente (ver SupabaseManager.get_client_cases_page)"""
+        try:
+            query = self.postgrest.table('casos').select(columns)
+            response = await self._execute(_client_cases_page_query(query, client_id, cursor, page_size))
+            return _cases_page_result(response.data, page_size)
+        except Exception as e:
+            logger.error("Erro ao buscar casos do cliente: %s", e)
+            raise Exception(f"Erro ao buscar casos do cliente: {str(e)}")
+
+    async def get_all_companies(self, columns: str = COMPANY_COLUMNS) -> List[Dict[str, Any]]:
+        """Busca todas as companhias aéreas"""
+        async def fetch():
+            response = await self._execute(self.postgrest.table('companhiasAereas').select(columns))
+            return response.data
+
+        try:
+            return await self._cached_select(('companhiasAereas', 'all', columns), fetch)
+        except Exception as e:
+            logger.error("Erro ao buscar companhias: %s", e)
+            raise Exception(f"Erro ao buscar companhias: {str(e)}")
+
+    async def get_jurisprudencias_aereo(self, columns: str = JURISPRUDENCIA_LIST_COLUMNS) -> List[Dict[str, Any]]:
+        """Busca a lista de jurisprudências (sem o texto)"""
+        async def fetch():
+            response = await self._execute(self.postgrest.table('jurisprudenciaAereo').select(columns))
+            return response.data
+
+        try:
+            return await self._cached_select(('jurisprudenciaAereo', 'all', columns), fetch)
+        except Exception as e:
+            logger.error("Erro ao buscar jurisprudências: %s", e)
+            raise Exception(f"Erro ao buscar jurisprudências: {str(e)}")
@@ -26,7 +26,7 @@ class AudioManager:
             return temp_path
             
         except Exception as e:
-            logger.error(f"Erro ao salvar áudio: {str(e)}")
+            logger.error("Erro ao salvar áudio: %s", e)
             raise e
     
     def transcribe_audio(self, audio_path):
@@ -58,5 +58,5 @@ class AudioManager:
         except sr.RequestError as e:
             raise Exception(f"Erro na requisição ao serviço de reconhecimento: {str(e)}")
         except Exception as e:
-            logger.error(f"Erro na transcrição: {str(e)}")
+            logger.error("Erro na transcrição: %s", e)
             raise e 
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+Busca textual (BM25) em português para as jurisprudências
+
+Índice invertido em memória: cada termo aponta para os documentos que o
+contêm e sua frequência. Os textos passam por remoção de acentos, de
+stop-words e por um stemmer leve de português, para que "atrasos",
+"atrasado" e "atraso" casem entre si. Os campos têm pesos diferentes
+(o nome vale mais que o texto), no estilo BM25F.
+"""
+import heapq
+import math
+import re
+import threading
+from functools import lru_cache
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from unidecode import unidecode
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_WORD = re.compile(r'[^\W_]+')
+
+# Stop-words do português (já sem acentos)
+STOPWORDS = frozenset("""
+a ao aos aquela aquelas aquele aqueles aquilo as ate com como da das de dela delas dele deles
+depois do dos e ela elas ele eles em entre era eram essa essas esse esses esta estas este estes
+eu foi foram ha isso isto ja lhe lhes mais mas me mesmo meu meus minha minhas muito na nas nem
+no nos nossa nossas nosso nossos num numa o os ou para pela pelas pelo pelos por qual quando que
+quem se sem ser seu seus si so sua suas tambem te tem tu tua tuas um uma umas uns voce voces vos
+art arts fls
+""".split())
+
+# Sufixos removidos pelo stemmer, do mais longo para o mais curto, com o
+# tamanho mínimo do radical que deve sobrar (inspirado no RSLP)
+_PLURAL_RULES = [
+    ('oes', 'ao', 1), ('aes', 'ao', 1), ('ais', 'al', 1), ('eis', 'el', 2), ('ois', 'ol', 1),
+    ('res', 'r', 2), ('les', 'l', 2), ('ns', 'm', 1), ('is', 'il', 2), ('s', '', 2),
+]
+_SUFFIX_RULES = [
+    ('amentos', 3), ('imentos', 3), ('amento', 3), ('imento', 3), ('idades', 3), ('idade', 3),
+    ('mente', 4), ('acoes', 3), ('icoes', 3), ('acao', 3), ('icao', 3), ('ancia', 3), ('encia', 3),
+    ('adora', 3), ('ador', 3), ('avel', 3), ('ivel', 3), ('ismo', 3), ('ista', 3), ('ante', 3),
+    ('aram', 3), ('eram', 3), ('iram', 3), ('ando', 3), ('endo', 3), ('indo', 3), ('ava', 3),
+    ('ado', 3), ('ada', 3), ('ido', 3), ('ida', 3), ('oso', 3), ('osa', 3), ('ivo', 3), ('iva', 3),
+    ('eza', 3), ('ar', 3), ('er', 3), ('ir', 3), ('ou', 3),
+]
+_FINAL_VOWELS = 'aeo'
+
+
+@lru_cache(maxsize=200_000)
+def stem(word: str) -> str:
+    """Stemmer leve de português (entrada já em minúsculas e sem acentos)"""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    for suffix, replacement, min_stem in _PLURAL_RULES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+            word = word[:-len(suffix)] + replacement
+            break
+    for suffix, min_stem in _SUFFIX_RULES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+            word = word[:-len(suffix)]
+            break
+    if len(word) > 3 and word[-1] in _FINAL_VOWELS:
+        word = word[:-1]
+    return word
+
+
+# Cache palavra -> termo ('' para palavras ignoradas); o vocabulário de
+# decisões é pequeno perto do número de palavras indexadas
+_TERM_CACHE: Dict[str, str] = {}
+_TERM_CACHE_MAXSIZE = 500_000
+
+
+def _term(word: str) -> str:
+    """Termo indexado de uma palavra ('' para stop-words e letras soltas)"""
+    folded = ''.join(_TOKEN.findall(unidecode(word).lower()))
+    term = '' if folded in STOPWORDS or len(folded) <= 1 else stem(folded)
+    if len(_TERM_CACHE) < _TERM_CACHE_MAXSIZE:
+        _TERM_CACHE[word] = term
+    return term
+
+
+def tokenize(text: Any) -> List[str]:
+    """Palavras normalizadas (sem acento, minúsculas, sem stop-words), com stemming"""
+    if text is None:
+        return []
+    cache = _TERM_CACHE
+    terms = []
+    for word in _WORD.findall(str(text).lower()):
+        term = cache.get(word)
+        if term is None:
+            term = _term(word)
+        if term:
+            terms.append(term)
+    return terms
+
+
+class BM25Index:
+    """
+    Índice BM25 em memória, atualizado registro a registro
+
+    Args:
+        fields: Campo -> peso (ex.: {'nome': 3.0, 'texto': 1.0})
+        id_field: Campo com o identificador do registro
+        k1, b: Parâmetros do BM25
+    """
+
+    def __init__(self, fields: Dict[str, float], id_field: str = 'id', k1: float = 1.2, b: float = 0.75):
+        self.fields = fields
+        self.id_field = id_field
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[Any, float]] = {}
+        self._doc_terms: Dict[Any, Dict[str, float]] = {}
+        self._doc_length: Dict[Any, float] = {}
+        self._docs: Dict[Any, Dict[str, Any]] = {}
+        self._total_length = 0.0
+        self._vocabulary: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: Any) -> bool:
+        return doc_id in self._docs
+
+    def get(self, doc_id: Any) -> Optional[Dict[str, Any]]:
+        """Registro indexado com esse ID (ou None)"""
+        doc = self._docs.get(doc_id)
+        return dict(doc) if doc is not None else None
+
+    def add(self, doc: Dict[str, Any]):
+        """Indexa (ou reindexa) um registro"""
+        doc_id = doc.get(self.id_field)
+        if doc_id is None:
+            return
+        terms: Dict[str, float] = {}
+        for field, weight in self.fields.items():
+            for term, count in Counter(tokenize(doc.get(field))).items():
+                terms[term] = terms.get(term, 0.0) + count * weight
+        with self._lock:
+            self._remove(doc_id)
+            self._docs[doc_id] = dict(doc)
+            self._doc_terms[doc_id] = terms
+            length = float(sum(terms.values()))
+            self._doc_length[doc_id] = length
+            self._total_length += length
+            for term, frequency in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    self._vocabulary = None
+                postings[doc_id] = frequency
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]):
+        """Indexa vários registros"""
+        with self._lock:
+            for doc in docs:
+                self.add(doc)
+
+    def remove(self, doc_id: Any):
+        """Remove um registro do índice (sem erro se não existir)"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: Any):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                self._vocabulary = None
+        self._total_length -= self._doc_length.pop(doc_id)
+        del self._docs[doc_id]
+
+    def replace_with(self, other: 'BM25Index'):
+        """Troca o conteúdo pelo de outro índice (reconstrução sem bloquear buscas)"""
+        with self._lock, other._lock:
+            self._postings = other._postings
+            self._doc_terms = other._doc_terms
+            self._doc_length = other._doc_length
+            self._docs = other._docs
+            self._total_length = other._total_length
+            self._vocabulary = None
+
+    def clear(self):
+        """Esvazia o índice"""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_length.clear()
+            self._docs.clear()
+            self._total_length = 0.0
+            self._vocabulary = None
+
+    def _expand_prefix(self, prefix: str, max_terms: int = 20) -> List[str]:
+        """Termos do vocabulário que começam com prefix (busca enquanto digita)"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + max_terms]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query: str, limit: int = 20, prefix: bool = True) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Busca os registros mais relevantes para a consulta
+
+        Args:
+            query: Texto digitado
+            limit: Número máximo de resultados
+            prefix: A última palavra também casa com termos que começam com ela
+
+        Returns:
+            Lista de (registro, pontuação), da maior para a menor pontuação
+        """
+        words = [w for w in _TOKEN.findall(unidecode(str(query or '')).lower()) if w not in STOPWORDS]
+        if not words:
+            return []
+
+        with self._lock:
+            if not self._docs:
+                return []
+            # (termos, peso): o termo exato vale 1; as expansões do prefixo, um pouco menos
+            query_terms: Dict[str, float] = {}
+            for word in words:
+                query_terms[stem(word)] = 1.0
+            if prefix and len(words[-1]) >= 3:
+                for term in self._expand_prefix(words[-1]):
+                    query_terms.setdefault(term, 0.8)
+
+            total_docs = len(self._docs)
+            avg_length = self._total_length / total_docs or 1.0
+            scores: Dict[Any, float] = {}
+            for term, query_weight in query_terms.items():
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_length[doc_id] / avg_length)
+                    score = query_weight * idf * frequency * (self.k1 + 1) / (frequency + norm)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(dict(self._docs[doc_id]), score) for doc_id, score in best]
+
+
+def snippet(text: Any, query: str, width: int = 240) -> str:
+    """Trecho do texto em torno da primeira palavra da consulta encontrada"""
+    if not text:
+        return ''
+    text = str(text)
+    folded = unidecode(text).lower()
+    if len(folded) != len(text):
+        folded = text.lower()
+    stems = {stem(w) for w in _TOKEN.findall(unidecode(str(query or '')).lower()) if w not in STOPWORDS}
+    position = 0
+    for match in _TOKEN.finditer(folded):
+        if stem(match.group()) in stems or any(match.group().startswith(s) for s in stems if len(s) >= 3):
+            position = match.start()
+            break
+    start = max(0, position - width // 3)
+    end = min(len(text), start + width)
+    return ('...' if start > 0 else '') + text[start:end].strip() + ('...' if end < len(text) else '')
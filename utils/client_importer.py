@@ -0,0 +1,328 @@
+"""
+Importação em lote de clientes a partir de CSV ou XLSX
+
+O arquivo é lido em blocos (sem carregar tudo na memória). Cada bloco é
+validado com operações vetorizadas do pandas/numpy, deduplicado contra os
+CPFs/emails já cadastrados (e contra as linhas anteriores do arquivo) e
+inserido em lote via SupabaseManager.insert_many. O resultado é um relatório
+com uma linha por registro do arquivo.
+"""
+import io
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+from utils.form_validator import FormValidator
+
+logger = logging.getLogger(__name__)
+
+# Linhas por bloco (leitura, validação e inserção)
+IMPORT_CHUNK_SIZE = 500
+
+CLIENT_IMPORT_COLUMNS = [
+    'nome_completo', 'nacionalidade', 'estado_civil', 'profissao', 'email', 'celular',
+    'data_nascimento', 'rg', 'cpf', 'endereco', 'bairro', 'cidade', 'estado', 'cep'
+]
+REQUIRED_IMPORT_COLUMNS = ['nome_completo', 'email', 'cpf']
+
+# Nomes de coluna alternativos aceitos no cabeçalho (já normalizados)
+COLUMN_ALIASES = {
+    'nome': 'nome_completo',
+    'cliente': 'nome_completo',
+    'e_mail': 'email',
+    'telefone': 'celular',
+    'fone': 'celular',
+    'data_de_nascimento': 'data_nascimento',
+    'nascimento': 'data_nascimento',
+    'uf': 'estado',
+    'logradouro': 'endereco',
+    'municipio': 'cidade',
+}
+
+# Status das linhas no relatório
+STATUS_IMPORTED = 'importado'
+STATUS_VALID = 'válido'
+STATUS_DUPLICATE = 'duplicado'
+STATUS_INVALID = 'inválido'
+STATUS_ERROR = 'erro'
+
+# Colunas que o Excel costuma guardar como número, perdendo os zeros à
+# esquerda (CPF 012.345.678-90 vira 1234567890): largura para completá-los
+NUMERIC_CELL_WIDTHS = {'cpf': 11, 'cep': 8}
+
+_CPF_WEIGHTS_1 = np.arange(10, 1, -1)
+_CPF_WEIGHTS_2 = np.arange(11, 1, -1)
+
+
+def normalize_header(name: Any) -> str:
+    """'Data de Nascimento' -> 'data_de_nascimento' -> 'data_nascimento'"""
+    key = unidecode(str(name)).strip().lower()
+    key = '_'.join(part for part in ''.join(c if c.isalnum() else ' ' for c in key).split())
+    return COLUMN_ALIASES.get(key, key)
+
+
+def _digits(series: pd.Series) -> pd.Series:
+    return series.str.replace(r'[^0-9]', '', regex=True)
+
+
+def cpf_check_digits_valid(digits: pd.Series) -> pd.Series:
+    """
+    Valida os dígitos verificadores de vários CPFs de uma vez
+
+    Mesma regra de FormValidator.validate_cpf_digits, calculada como produto
+    de matrizes sobre todos os CPFs com 11 dígitos.
+
+    Args:
+        digits: CPFs só com dígitos
+    """
+    valid = pd.Series(False, index=digits.index)
+    mask = (digits.str.len() == 11).to_numpy()
+    if mask.any():
+        matrix = np.frombuffer(''.join(digits[mask]).encode('ascii'), dtype=np.uint8)
+        matrix = matrix.reshape(-1, 11).astype(np.int64) - 48
+        dv1 = matrix[:, :9] @ _CPF_WEIGHTS_1 * 10 % 11 % 10
+        dv2 = matrix[:, :10] @ _CPF_WEIGHTS_2 * 10 % 11 % 10
+        repeated = (matrix == matrix[:, :1]).all(axis=1)
+        valid[mask] = (dv1 == matrix[:, 9]) & (dv2 == matrix[:, 10]) & ~repeated
+    return valid
+
+
+def prepare_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza um bloco lido do arquivo e marca os erros de validação
+
+    Returns:
+        DataFrame com as colunas de cliente normalizadas (CPF 000.000.000-00,
+        celular (00) 00000-0000, CEP 00000-000, data ISO, UF maiúscula) e a
+        coluna 'erro' (texto vazio quando a linha é válida)
+    """
+    df = df.rename(columns=normalize_header)
+    df = df.loc[:, ~df.columns.duplicated()]
+    out = pd.DataFrame(index=df.index)
+    for column in CLIENT_IMPORT_COLUMNS:
+        values = df[column] if column in df.columns else pd.Series('', index=df.index)
+        out[column] = values.fillna('').astype(str).str.strip()
+
+    errors = pd.Series('', index=df.index)
+
+    def flag(mask: pd.Series, message: str):
+        nonlocal errors
+        errors = errors.where(~mask, errors + np.where(errors == '', '', '; ') + message)
+
+    for column in REQUIRED_IMPORT_COLUMNS:
+        flag(out[column] == '', f"{column} obrigatório")
+
+    # CPF: 11 dígitos com verificadores válidos
+    cpf = _digits(out['cpf'])
+    flag((out['cpf'] != '') & ~cpf_check_digits_valid(cpf), "CPF inválido")
+    out['cpf'] = cpf.str.replace(r'^(\d{3})(\d{3})(\d{3})(\d{2})$', r'\1.\2.\3-\4', regex=True)
+
+    # Email
+    out['email'] = out['email'].str.lower()
+    flag((out['email'] != '') & ~out['email'].str.match(FormValidator.EMAIL_PATTERN), "Email inválido")
+
+    # Celular (opcional): DDD + 8 ou 9 dígitos, com ou sem +55
+    phone = _digits(out['celular']).str.replace(r'^55(\d{10,11})$', r'\1', regex=True)
+    flag((phone != '') & ~phone.str.len().isin([10, 11]), "Celular inválido")
+    out['celular'] = phone.str.replace(r'^(\d{2})(\d{4,5})(\d{4})$', r'(\1) \2-\3', regex=True)
+
+    # CEP (opcional)
+    cep = _digits(out['cep'])
+    flag((cep != '') & (cep.str.len() != 8), "CEP inválido")
+    out['cep'] = cep.str.replace(r'^(\d{5})(\d{3})$', r'\1-\2', regex=True)
+
+    # Data de nascimento (opcional): ISO (AAAA-MM-DD) ou DD/MM/AAAA
+    raw_date = out['data_nascimento']
+    iso = raw_date.str.match(r'^\d{4}-\d{2}-\d{2}')
+    parsed = pd.to_datetime(raw_date.where(iso), format='%Y-%m-%d', exact=False, errors='coerce')
+    parsed = parsed.fillna(pd.to_datetime(raw_date.where(~iso), format='%d/%m/%Y', errors='coerce'))
+    flag((raw_date != '') & parsed.isna(), "Data de nascimento inválida")
+    out['data_nascimento'] = parsed.dt.strftime('%Y-%m-%d').fillna('')
+
+    out['estado'] = out['estado'].str.upper()
+    flag((out['estado'] != '') & ~out['estado'].str.match(r'^[A-Z]{2}$'), "UF inválida")
+
+    out['erro'] = errors
+    return out
+
+
+def _sniff_csv(sample: bytes) -> Dict[str, str]:
+    """Detecta codificação (UTF-8 ou Latin-1) e separador (';' ou ',') pela amostra"""
+    try:
+        text = sample.decode('utf-8-sig')
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        text = sample.decode('latin-1')
+        encoding = 'latin-1'
+    first_line = text.splitlines()[0] if text else ''
+    separator = ';' if first_line.count(';') > first_line.count(',') else ','
+    return {'encoding': encoding, 'sep': separator}
+
+
+def read_client_file(file: Any, filename: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Lê um CSV ou XLSX em blocos de até chunk_size linhas (todas as colunas como texto)
+
+    O índice de cada bloco é o número da linha no arquivo (o cabeçalho é a linha 1).
+    """
+    file.seek(0)
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        yield from _read_xlsx(file, chunk_size)
+        return
+
+    sample = file.read(64 * 1024)
+    file.seek(0)
+    options = _sniff_csv(sample)
+    reader = pd.read_csv(
+        file, dtype=str, keep_default_na=False, chunksize=chunk_size,
+        encoding=options['encoding'], sep=options['sep']
+    )
+    first_line = 2
+    for chunk in reader:
+        chunk.index = range(first_line, first_line + len(chunk))
+        first_line += len(chunk)
+        yield chunk
+
+
+def _read_xlsx(file: Any, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Lê a primeira planilha em modo streaming (openpyxl read_only)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) if name is not None else f'coluna_{i}' for i, name in enumerate(header)]
+        widths = [NUMERIC_CELL_WIDTHS.get(normalize_header(name)) for name in columns]
+        buffer, line_numbers, line = [], [], 1
+        for values in rows:
+            line += 1
+            if all(value is None or str(value).strip() == '' for value in values):
+                continue
+            buffer.append([_cell_text(value, width) for value, width in zip(values, widths)])
+            line_numbers.append(line)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=columns[:len(buffer[0])], index=line_numbers)
+                buffer, line_numbers = [], []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns[:len(buffer[0])], index=line_numbers)
+    finally:
+        workbook.close()
+
+
+def _cell_text(value: Any, width: Optional[int] = None) -> str:
+    """Texto da célula; números inteiros são completados com zeros até width"""
+    if value is None:
+        return ''
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value).zfill(width) if width and value >= 0 else str(value)
+    return str(value)
+
+
+class ClientImporter:
+    """
+    Importa clientes em lote
+
+    Args:
+        manager: SupabaseManager (usa get_client_keys e insert_many)
+        chunk_size: Linhas por bloco de leitura e de inserção
+    """
+
+    def __init__(self, manager, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.manager = manager
+        self.chunk_size = chunk_size
+
+    def run(self, file: Any, filename: str, dry_run: bool = False,
+            on_progress: Optional[Callable[[int], None]] = None) -> pd.DataFrame:
+        """
+        Valida e (se dry_run=False) insere os clientes do arquivo
+
+        Args:
+            file: Arquivo binário (ex.: st.file_uploader)
+            filename: Nome do arquivo, para identificar CSV ou XLSX
+            dry_run: Só valida e deduplica, sem inserir
+            on_progress: Chamada após cada bloco com o total de linhas processadas
+
+        Returns:
+            Relatório com colunas linha, nome_completo, cpf, status, mensagem e id
+        """
+        keys = self.manager.get_client_keys()
+        seen_cpfs, seen_emails = set(keys['cpfs']), set(keys['emails'])
+        reports = []
+        processed = 0
+
+        for raw in read_client_file(file, filename, self.chunk_size):
+            chunk = prepare_chunk(raw)
+            report = pd.DataFrame({
+                'linha': chunk.index,
+                'nome_completo': chunk['nome_completo'],
+                'cpf': chunk['cpf'],
+                'status': np.where(chunk['erro'] == '', STATUS_VALID, STATUS_INVALID),
+                'mensagem': chunk['erro'],
+                'id': None
+            }, index=chunk.index)
+
+            # Duplicados: já cadastrados, ou repetidos no próprio arquivo
+            valid = report['status'] == STATUS_VALID
+            cpf_digits = _digits(chunk['cpf'])
+            duplicate_cpf = valid & (
+                cpf_digits.isin(seen_cpfs)
+                | cpf_digits[valid].duplicated().reindex(chunk.index, fill_value=False)
+            )
+            candidates = valid & ~duplicate_cpf
+            duplicate_email = candidates & (
+                chunk['email'].isin(seen_emails)
+                | chunk['email'][candidates].duplicated().reindex(chunk.index, fill_value=False)
+            )
+            report.loc[duplicate_cpf, ['status', 'mensagem']] = [STATUS_DUPLICATE, "CPF já cadastrado"]
+            report.loc[duplicate_email, ['status', 'mensagem']] = [STATUS_DUPLICATE, "Email já cadastrado"]
+
+            to_insert = report.index[report['status'] == STATUS_VALID]
+            seen_cpfs.update(cpf_digits[to_insert])
+            seen_emails.update(chunk.loc[to_insert, 'email'])
+
+            if not dry_run and len(to_insert):
+                self._insert(chunk.loc[to_insert], report)
+
+            reports.append(report)
+            processed += len(chunk)
+            if on_progress:
+                on_progress(processed)
+
+        if not reports:
+            return pd.DataFrame(columns=['linha', 'nome_completo', 'cpf', 'status', 'mensagem', 'id'])
+        result = pd.concat(reports, ignore_index=True)
+        logger.info(
+            f"Importação de {filename}: {processed} linhas, "
+            f"{result['status'].value_counts().to_dict()}"
+        )
+        return result
+
+    def _insert(self, rows: pd.DataFrame, report: pd.DataFrame):
+        """Insere as linhas válidas e anota o resultado de cada uma no relatório"""
+        # Campos vazios vão como null (todas as linhas com as mesmas colunas, num só lote)
+        records = rows[CLIENT_IMPORT_COLUMNS].replace('', None).to_dict('records')
+        results = self.manager.insert_many('clientes', records, chunk_size=self.chunk_size)
+        for line, result in zip(rows.index, results):
+            if result['ok']:
+                report.at[line, 'status'] = STATUS_IMPORTED
+                report.at[line, 'id'] = (result['data'] or {}).get('id')
+            else:
+                report.at[line, 'status'] = STATUS_ERROR
+                report.at[line, 'mensagem'] = result['error']
+
+
+def report_to_csv(report: pd.DataFrame) -> bytes:
+    """Relatório em CSV (UTF-8 com BOM, separador ';', para abrir direto no Excel)"""
+    buffer = io.StringIO()
+    report.to_csv(buffer, index=False, sep=';')
+    return buffer.getvalue().encode('utf-8-sig')
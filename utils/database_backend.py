@@ -0,0 +1,60 @@
+"""
+Seleção do backend do banco de dados
+
+O SupabaseManager depende apenas da interface table()/rpc() dos clientes
+PostgREST; este módulo escolhe a implementação conforme DATABASE_BACKEND:
+"supabase" (cliente HTTP compartilhado) ou "sqlite" (banco local, ver
+utils/sqlite_backend.py).
+"""
+import logging
+from typing import Any, Dict, Optional, Protocol
+
+from postgrest import AsyncPostgrestClient
+
+from config.settings import DATABASE_BACKEND, SQLITE_DATABASE_PATH
+
+logger = logging.getLogger(__name__)
+
+_sqlite_client = None
+
+
+class DatabaseClient(Protocol):
+    """Interface mínima usada pelo SupabaseManager"""
+
+    def table(self, table_name: str) -> Any:
+        ...
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        ...
+
+
+def is_sqlite_backend() -> bool:
+    return DATABASE_BACKEND.lower() == 'sqlite'
+
+
+def get_database_client() -> DatabaseClient:
+    """Cliente síncrono do backend configurado"""
+    global _sqlite_client
+    if is_sqlite_backend():
+        if _sqlite_client is None:
+            from utils.sqlite_backend import create_sqlite_client, get_sqlite_database
+            _sqlite_client = create_sqlite_client(get_sqlite_database(SQLITE_DATABASE_PATH))
+        return _sqlite_client
+
+    from utils.supabase_pool import get_supabase_client
+    return get_supabase_client()
+
+
+def create_async_database_client() -> AsyncPostgrestClient:
+    """Novo cliente assíncrono do backend configurado (deve ser fechado pelo chamador)"""
+    if is_sqlite_backend():
+        from utils.sqlite_backend import create_async_sqlite_client, get_sqlite_database
+        return create_async_sqlite_client(get_sqlite_database(SQLITE_DATABASE_PATH))
+
+    from utils.supabase_pool import get_supabase_client
+    session = get_supabase_client().postgrest.session
+    return AsyncPostgrestClient(
+        str(session.base_url),
+        headers=dict(session.headers),
+        timeout=session.timeout
+    )
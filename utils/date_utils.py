@@ -1,7 +1,30 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
 import locale
 
 def data_por_extenso(data: datetime) -> str:
     """Converte data para formato por extenso"""
     locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-    return data.strftime("%d de %B de %Y").lower() 
\ No newline at end of file
+    return data.strftime("%d de %B de %Y").lower()
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Converte um timestamp ISO 8601 do banco (com ou sem fuso, ou 'Z')"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def latest_timestamp(current: Optional[str], candidates: Iterable[Optional[str]]) -> Optional[str]:
+    """Maior timestamp entre current e candidates (mantém o texto original)"""
+    latest, latest_dt = current, parse_timestamp(current) if current else None
+    for value in candidates:
+        if not value:
+            continue
+        value_dt = parse_timestamp(value)
+        if latest_dt is None or value_dt > latest_dt:
+            latest, latest_dt = value, value_dt
+    return latest
+
+
+def rewind_timestamp(value: str, seconds: float) -> str:
+    """Volta o timestamp alguns segundos (margem para transações concluídas fora de ordem)"""
+    return (parse_timestamp(value) - timedelta(seconds=seconds)).isoformat()
@@ -0,0 +1,272 @@
+"""
+Preenchimento dos placeholders {{chave}} dos templates .docx
+
+Cada parágrafo é lido uma vez só e comparado com uma única expressão
+regular (alternância com todas as chaves), em vez de um laço chave a chave
+que reescreve paragraph.text. A substituição é feita nos runs: o Word
+costuma quebrar um placeholder em vários runs (ex.: '{{nome_' + 'completo}}'),
+então o valor vai para o run onde o placeholder começa, os runs seguintes
+perdem só o trecho do placeholder, e a formatação de cada run é mantida.
+
+Cobre o corpo, as tabelas (inclusive aninhadas), cabeçalhos e rodapés.
+Placeholders sem valor nos dados ficam como estão.
+
+Para templates usados muitas vezes, CompiledTemplate faz essa varredura uma
+vez só: cada placeholder é juntado num único run e a posição desse run fica
+indexada. Preencher vira uma cópia do documento mais a escrita direta nos
+runs indexados, e as chaves sem valor são conhecidas antes de qualquer I/O.
+"""
+import copy
+import io
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from docx import Document
+from docx.oxml.ns import qn
+from docx.parts.document import DocumentPart
+from docx.parts.hdrftr import FooterPart, HeaderPart
+
+from utils.error_handler import TemplateError
+
+logger = logging.getLogger(__name__)
+
+# Qualquer {{chave}} (usado para indexar os templates)
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*([^{}]+?)\s*\}\}')
+
+# Filhos de um run que o setter de Run.text recria; runs com outros filhos
+# (imagens, caixas de texto) não são reescritos
+_TEXT_RUN_CHILDREN = frozenset(qn(tag) for tag in (
+    'w:rPr', 'w:t', 'w:tab', 'w:br', 'w:cr', 'w:noBreakHyphen', 'w:softHyphen'
+))
+
+
+@lru_cache(maxsize=64)
+def _compile(keys: frozenset) -> re.Pattern:
+    # Chaves mais longas primeiro, para a alternância não parar num prefixo
+    alternatives = '|'.join(re.escape(key) for key in sorted(keys, key=len, reverse=True))
+    return re.compile(r'\{\{\s*(' + alternatives + r')\s*\}\}')
+
+
+def compile_placeholders(keys: Iterable[str]) -> re.Pattern:
+    """Expressão que encontra {{chave}} (espaços internos tolerados) para as chaves informadas"""
+    return _compile(frozenset(key.strip() for key in keys if key and key.strip()))
+
+
+def iter_paragraphs(doc) -> Iterator:
+    """Parágrafos do corpo, das tabelas, dos cabeçalhos e dos rodapés, cada um uma vez"""
+    # Guarda os próprios elementos (não id()): os proxies do lxml são recriados
+    # a cada acesso e um id() liberado pode ser reaproveitado
+    seen = set()
+
+    def from_container(container):
+        for paragraph in container.paragraphs:
+            if paragraph._p not in seen:
+                seen.add(paragraph._p)
+                yield paragraph
+        for table in container.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    # Células mescladas aparecem repetidas em row.cells
+                    if cell._tc in seen:
+                        continue
+                    seen.add(cell._tc)
+                    yield from from_container(cell)
+
+    yield from from_container(doc)
+    for section in doc.sections:
+        for part in (section.header, section.footer,
+                     section.first_page_header, section.first_page_footer,
+                     section.even_page_header, section.even_page_footer):
+            # Cabeçalho "vinculado ao anterior" não tem conteúdo próprio
+            if part.is_linked_to_previous:
+                continue
+            yield from from_container(part)
+
+
+def replace_in_paragraph(paragraph, pattern: re.Pattern, values: Dict[str, str]) -> int:
+    """
+    Substitui os placeholders do parágrafo direto nos runs
+
+    Returns:
+        Número de placeholders substituídos
+    """
+    return _rewrite_runs(paragraph, pattern, lambda match: values[match.group(1)])
+
+
+def _rewrite_runs(paragraph, pattern: re.Pattern, replacement: Callable[[re.Match], str]) -> int:
+    """Troca cada ocorrência de pattern pelo texto de replacement, no run onde ela começa"""
+    runs = paragraph.runs
+    texts: List[str] = [run.text for run in runs]
+    full_text = ''.join(texts)
+    if '{{' not in full_text:
+        return 0
+    matches = list(pattern.finditer(full_text))
+    if not matches:
+        return 0
+
+    # Início de cada run no texto do parágrafo
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text)
+
+    def locate(position: int) -> int:
+        # Índice do run que contém o caractere em `position`
+        index = 0
+        for i, start in enumerate(starts):
+            if start <= position and len(texts[i]) > 0:
+                index = i
+            elif start > position:
+                break
+        return index
+
+    changed = set()
+    # De trás para frente: editar um placeholder não muda os offsets dos anteriores
+    for match in reversed(matches):
+        first = locate(match.start())
+        last = locate(match.end() - 1)
+        local_start = match.start() - starts[first]
+        local_end = match.end() - starts[last]
+        value = replacement(match)
+        if first == last:
+            texts[first] = texts[first][:local_start] + value + texts[first][local_end:]
+        else:
+            texts[first] = texts[first][:local_start] + value
+            for i in range(first + 1, last):
+                texts[i] = ''
+            texts[last] = texts[last][local_end:]
+        changed.update(range(first, last + 1))
+
+    for i in changed:
+        runs[i].text = texts[i]
+    return len(matches)
+
+
+def render_document(doc, data: Dict[str, Any]) -> int:
+    """
+    Preenche os placeholders {{chave}} do documento com os valores de data
+
+    Args:
+        doc: Documento python-docx (alterado no lugar)
+        data: Valores por chave (convertidos com str)
+
+    Returns:
+        Número de placeholders substituídos
+    """
+    values = {key.strip(): str(value) for key, value in data.items() if key and key.strip()}
+    if not values:
+        return 0
+    pattern = compile_placeholders(values)
+    total = 0
+    for paragraph in iter_paragraphs(doc):
+        total += replace_in_paragraph(paragraph, pattern, values)
+    return total
+
+
+class CompiledTemplate:
+    """
+    Template .docx com os placeholders indexados
+
+    Args:
+        doc: Documento python-docx do template (passa a pertencer ao objeto)
+        name: Nome do template (para logs e mensagens de erro)
+    """
+
+    def __init__(self, doc, name: str = ''):
+        self.name = name
+        self._doc = doc
+        # Por parte (documento, cabeçalhos, rodapés): [(índice do w:r na parte, texto do run)]
+        self._slots: Dict[str, List[Tuple[int, str]]] = {}
+        self.placeholder_keys: FrozenSet[str] = frozenset()
+        self._compile()
+
+    @classmethod
+    def from_bytes(cls, content: bytes, name: str = '') -> 'CompiledTemplate':
+        return cls(Document(io.BytesIO(content)), name)
+
+    @classmethod
+    def from_path(cls, path: str) -> 'CompiledTemplate':
+        return cls(Document(path), os.path.basename(path))
+
+    @staticmethod
+    def _parts(doc) -> Dict[str, Any]:
+        return {
+            str(part.partname): part
+            for part in doc.part.package.iter_parts()
+            if isinstance(part, (DocumentPart, HeaderPart, FooterPart))
+        }
+
+    def _compile(self):
+        # Junta cada placeholder num run só (o Word costuma quebrá-los)
+        for paragraph in iter_paragraphs(self._doc):
+            _rewrite_runs(paragraph, PLACEHOLDER_PATTERN, lambda match: '{{%s}}' % match.group(1))
+
+        keys = set()
+        for partname, part in self._parts(self._doc).items():
+            slots = []
+            for index, run in enumerate(part.element.iter(qn('w:r'))):
+                text = run.text
+                if not PLACEHOLDER_PATTERN.search(text):
+                    continue
+                if any(child.tag not in _TEXT_RUN_CHILDREN for child in run):
+                    logger.warning("Placeholder fora de um run de texto ignorado em %s: %s", self.name, text)
+                    continue
+                slots.append((index, text))
+                keys.update(match.group(1) for match in PLACEHOLDER_PATTERN.finditer(text))
+            if slots:
+                self._slots[partname] = slots
+        self.placeholder_keys = frozenset(keys)
+
+        # Recarrega o template já normalizado: o Document guarda objetos (ex.:
+        # o corpo) que o deepcopy de render() duplicaria fora da árvore copiada
+        buffer = io.BytesIO()
+        self._doc.save(buffer)
+        self._doc = Document(buffer)
+        logger.debug("Template %s compilado: %s placeholders em %s partes",
+                     self.name, sum(len(slots) for slots in self._slots.values()), len(self._slots))
+
+    def missing_keys(self, data: Dict[str, Any]) -> List[str]:
+        """Chaves usadas no template que não estão em data"""
+        provided = {key.strip() for key in data if key}
+        return sorted(self.placeholder_keys - provided)
+
+    def render(self, data: Dict[str, Any], required: Optional[Iterable[str]] = None):
+        """
+        Cópia do template preenchida com os valores de data
+
+        Placeholders sem valor em data ficam como estão (e são registrados no
+        log), como em render_document.
+
+        Args:
+            data: Valores por chave (convertidos com str)
+            required: Chaves que precisam ter valor
+
+        Raises:
+            TemplateError: se faltar valor para alguma chave de required (nada é gerado)
+        """
+        missing = self.missing_keys(data)
+        if missing:
+            absent_required = sorted(set(missing).intersection(required or ()))
+            if absent_required:
+                raise TemplateError(f"Campos sem valor no template {self.name}: {', '.join(absent_required)}")
+            logger.warning("Placeholders sem valor no template %s mantidos: %s", self.name, ', '.join(missing))
+        values = {key.strip(): str(value) for key, value in data.items() if key}
+
+        doc = copy.deepcopy(self._doc)
+        parts = self._parts(doc)
+        for partname, slots in self._slots.items():
+            wanted = dict(slots)
+            last = slots[-1][0]
+            for index, run in enumerate(parts[partname].element.iter(qn('w:r'))):
+                if index in wanted:
+                    run.text = PLACEHOLDER_PATTERN.sub(
+                        lambda match: values.get(match.group(1), match.group(0)), wanted[index]
+                    )
+                if index >= last:
+                    break
+        return doc
+
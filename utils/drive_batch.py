@@ -0,0 +1,118 @@
+"""
+Requisições da API do Drive agrupadas em lotes (BatchHttpRequest)
+
+Cada operação adicionada devolve um DriveFuture; o lote inteiro vai numa
+única requisição HTTP quando execute() é chamado (ou quando o resultado de
+alguma operação é pedido). Uma operação com erro não derruba as outras:
+o erro fica no futuro dela.
+
+O Drive pode executar as operações de um lote em qualquer ordem, então só
+operações independentes devem ir juntas (ex.: não criar uma pasta e uma
+subpasta dela no mesmo lote).
+"""
+import logging
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Limite de operações por lote da API do Drive
+DRIVE_BATCH_LIMIT = 100
+
+_PENDING = object()
+
+
+class DriveFuture:
+    """Resultado de uma operação de um DriveBatch"""
+
+    def __init__(self, batch: 'DriveBatch'):
+        self._batch = batch
+        self._result: Any = _PENDING
+        self._exception: Optional[BaseException] = None
+
+    def done(self) -> bool:
+        return self._result is not _PENDING or self._exception is not None
+
+    def _set(self, result: Any, exception: Optional[BaseException]):
+        if exception is not None:
+            self._exception = exception
+        else:
+            self._result = result
+
+    def exception(self) -> Optional[BaseException]:
+        """Erro da operação (envia o lote se ainda não foi enviado)"""
+        if not self.done():
+            self._batch.execute()
+        return self._exception
+
+    def result(self) -> Any:
+        """Resposta da operação (envia o lote se ainda não foi enviado); levanta o erro dela"""
+        if self.exception() is not None:
+            raise self._exception
+        return self._result
+
+
+class DriveBatch:
+    """
+    Agrupa operações do Drive para enviá-las juntas
+
+    Uso:
+        batch = DriveBatch(drive_service)
+        folder = batch.add(drive_service.files().get(fileId=folder_id, fields='id'))
+        created = batch.add(drive_service.files().create(body=metadata, fields='id'))
+        batch.execute()  # uma requisição HTTP
+        created.result()['id']
+
+    Args:
+        service: Serviço do Drive (googleapiclient)
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self._pending: List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __enter__(self) -> 'DriveBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.execute()
+
+    def add(self, request) -> DriveFuture:
+        """Adiciona uma operação (HttpRequest ainda não executada)"""
+        future = DriveFuture(self)
+        self._pending.append((request, future))
+        return future
+
+    def execute(self):
+        """Envia as operações pendentes, até DRIVE_BATCH_LIMIT por requisição HTTP"""
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), DRIVE_BATCH_LIMIT):
+            chunk = pending[start:start + DRIVE_BATCH_LIMIT]
+            if len(chunk) == 1:
+                # Uma operação só: sem o envelope multipart do lote
+                request, future = chunk[0]
+                try:
+                    future._set(request.execute(), None)
+                except Exception as e:
+                    future._set(None, e)
+                continue
+
+            futures = {str(i): future for i, (_, future) in enumerate(chunk)}
+
+            def callback(request_id, response, exception):
+                futures[request_id]._set(response, exception)
+
+            batch = self.service.new_batch_http_request(callback=callback)
+            for i, (request, _) in enumerate(chunk):
+                batch.add(request, request_id=str(i))
+            try:
+                batch.execute()
+            except Exception as e:
+                # Falha do lote inteiro (rede, autenticação): vale para todas as operações
+                logger.error("Erro ao enviar lote de %s operações do Drive: %s", len(chunk), e)
+                for future in futures.values():
+                    if not future.done():
+                        future._set(None, e)
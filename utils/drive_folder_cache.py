@@ -0,0 +1,180 @@
+"""
+Cache local (SQLite) dos IDs das pastas do Drive
+
+Guarda a pasta de cada cliente pelo nome NOME_CPF e as pastas de caso
+conhecidas, para que um novo caso de um cliente já cadastrado não precise
+procurar a pasta no Drive. É semeado a partir do Supabase (pasta_drive_id e
+pasta_caso_id) e conferido com o Drive só quando a pasta é usada: a
+verificação vai no mesmo lote da criação da pasta do caso
+(GoogleManager.create_onboarding_folders).
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS client_folders (
+    folder_name TEXT PRIMARY KEY,
+    folder_id TEXT NOT NULL,
+    verified_at REAL
+);
+CREATE INDEX IF NOT EXISTS client_folders_folder_id_idx ON client_folders (folder_id);
+
+CREATE TABLE IF NOT EXISTS case_folders (
+    folder_id TEXT PRIMARY KEY,
+    client_folder_id TEXT NOT NULL,
+    name TEXT,
+    verified_at REAL
+);
+CREATE INDEX IF NOT EXISTS case_folders_client_idx ON case_folders (client_folder_id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class DriveFolderCache:
+    """
+    IDs de pastas do Drive em SQLite
+
+    Args:
+        path: Arquivo do banco (':memory:' para um cache só em memória)
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._lock = threading.RLock()
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.executescript(SCHEMA)
+        self._seeded = self._get_meta('seeded_at') is not None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else None
+
+    @property
+    def seeded(self) -> bool:
+        return self._seeded
+
+    def client_folder(self, folder_name: str) -> Optional[Dict[str, Any]]:
+        """{'folder_id', 'verified_at'} da pasta do cliente NOME_CPF, ou None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT folder_id, verified_at FROM client_folders WHERE folder_name = ?', (folder_name,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def set_client_folder(self, folder_name: str, folder_id: str, verified: bool = True):
+        """Registra (ou substitui) a pasta do cliente"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO client_folders (folder_name, folder_id, verified_at) VALUES (?, ?, ?)',
+                (folder_name, folder_id, time.time() if verified else None)
+            )
+
+    def add_case_folder(self, folder_id: str, client_folder_id: str, name: Optional[str] = None,
+                        verified: bool = True):
+        """Registra uma pasta de caso"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO case_folders (folder_id, client_folder_id, name, verified_at) '
+                'VALUES (?, ?, ?, ?)',
+                (folder_id, client_folder_id, name, time.time() if verified else None)
+            )
+
+    def case_folders(self, client_folder_id: str) -> List[Dict[str, Any]]:
+        """Pastas de caso conhecidas de um cliente"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT folder_id, name, verified_at FROM case_folders WHERE client_folder_id = ? ORDER BY name',
+                (client_folder_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def verified_at(self, folder_id: str) -> Optional[float]:
+        """Quando a pasta (de cliente ou de caso) foi confirmada no Drive; None se nunca"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT MAX(verified_at) AS verified_at FROM ('
+                ' SELECT verified_at FROM client_folders WHERE folder_id = ?'
+                ' UNION ALL SELECT verified_at FROM case_folders WHERE folder_id = ?)',
+                (folder_id, folder_id)
+            ).fetchone()
+        return row['verified_at']
+
+    def mark_verified(self, folder_id: str):
+        """Marca a pasta como confirmada no Drive agora"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE client_folders SET verified_at = ? WHERE folder_id = ?', (now, folder_id))
+            self._conn.execute('UPDATE case_folders SET verified_at = ? WHERE folder_id = ?', (now, folder_id))
+
+    def forget(self, folder_id: str):
+        """Remove uma pasta que não existe mais no Drive (e as pastas de caso dentro dela)"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM client_folders WHERE folder_id = ?', (folder_id,))
+            self._conn.execute('DELETE FROM case_folders WHERE folder_id = ? OR client_folder_id = ?',
+                               (folder_id, folder_id))
+
+    def seed(self, client_folders: Iterable[Tuple[str, str]],
+             case_folders: Iterable[Tuple[str, str, Optional[str]]]) -> Dict[str, int]:
+        """
+        Carrega pastas conhecidas (ex.: do Supabase) sem sobrescrever as já registradas
+
+        Args:
+            client_folders: (NOME_CPF, ID da pasta)
+            case_folders: (ID da pasta do caso, ID da pasta do cliente, nome)
+
+        Returns:
+            {'clients': ..., 'cases': ...} com o número de pastas novas
+        """
+        with self._lock, self._conn:
+            before_clients = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO client_folders (folder_name, folder_id, verified_at) VALUES (?, ?, NULL)',
+                ((name, folder_id) for name, folder_id in client_folders if name and folder_id)
+            )
+            before_cases = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO case_folders (folder_id, client_folder_id, name, verified_at) '
+                'VALUES (?, ?, ?, NULL)',
+                (row for row in case_folders if row[0] and row[1])
+            )
+            after = self._conn.total_changes
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seeded_at', ?)",
+                               (str(time.time()),))
+        self._seeded = True
+        result = {'clients': before_cases - before_clients, 'cases': after - before_cases}
+        logger.info("Cache de pastas do Drive semeado: %s pastas de cliente e %s de caso",
+                    result['clients'], result['cases'])
+        return result
+
+
+_caches: Dict[str, DriveFolderCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_drive_folder_cache(path: str) -> DriveFolderCache:
+    """Cache compartilhado pelo processo para o arquivo informado"""
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = DriveFolderCache(path)
+        return cache
@@ -10,6 +10,10 @@ class DatabaseError(SmartLegalError):
     """Erros relacionados ao Supabase"""
     pass
 
+class TemplateError(SmartLegalError):
+    """Erros ao preencher templates de documentos"""
+    pass
+
 def handle_error(error: Exception, show_user: bool = True):
     """Tratamento centralizado de erros"""
     import streamlit as st
@@ -2,21 +2,34 @@ from typing import Dict, Any
 import re
 
 class FormValidator:
+    EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    PHONE_PATTERN = r'^\([0-9]{2}\) [0-9]{5}-[0-9]{4}$'
+
     @staticmethod
     def validate_email(email: str) -> bool:
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return bool(re.match(FormValidator.EMAIL_PATTERN, email))
     
     @staticmethod
     def validate_cpf(cpf: str) -> bool:
         # Implementar validação real de CPF
         return len(cpf.replace('.','').replace('-','')) == 11
     
+    @staticmethod
+    def validate_cpf_digits(cpf: str) -> bool:
+        """Valida os dígitos verificadores do CPF (rejeita também 000.000.000-00 e afins)"""
+        digits = [int(c) for c in str(cpf) if c in '0123456789']
+        if len(digits) != 11 or len(set(digits)) == 1:
+            return False
+        for size in (9, 10):
+            total = sum(d * w for d, w in zip(digits[:size], range(size + 1, 1, -1)))
+            if total * 10 % 11 % 10 != digits[size]:
+                return False
+        return True
+    
     @staticmethod
     def validate_phone(phone: str) -> bool:
         # Validar formato (XX) XXXXX-XXXX
-        pattern = r'^\([0-9]{2}\) [0-9]{5}-[0-9]{4}$'
-        return bool(re.match(pattern, phone))
+        return bool(re.match(FormValidator.PHONE_PATTERN, phone))
     
     @staticmethod
     def validate_onboarding_form(data: Dict[str, Any]) -> Dict[str, str]:
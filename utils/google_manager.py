@@ -1,22 +1,21 @@
-import json
 from typing import List, Dict, Any, Tuple
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseUpload, MediaFileUpload
 from io import BytesIO
 from config.settings import (
-    GOOGLE_CREDENTIALS,
-    SHEETS_SCOPE,
-    DRIVE_SCOPE,
-    DOCS_SCOPE,
+    DRIVE_FOLDER_CACHE_PATH,
+    DRIVE_FOLDER_VERIFY_INTERVAL,
+    TEMPLATE_CACHE_DIR,
     SHEET_ID_1,
     SHEET_ID_2,
     ROOT_FOLDER_ID
 )
 from utils.date_utils import data_por_extenso
 from utils.error_handler import DriveError
+from utils.google_services import get_credentials, get_service
+from utils.drive_batch import DriveBatch
+from utils.drive_folder_cache import get_drive_folder_cache
+from utils.template_cache import get_template_cache
 from datetime import datetime
-from docx import Document
 import re
 import os
 from pathlib import Path
@@ -31,34 +30,20 @@ SP_TZ = pytz.timezone('America/Sao_Paulo')
 
 logger = logging.getLogger(__name__)
 
-logger.info(f"Diretório atual: {os.getcwd()}")
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+logger.info("Diretório atual: %s", os.getcwd())
 
 class GoogleManager:
     def __init__(self):
-        self.credentials = self._get_credentials()
-        self.sheets_service = self._build_sheets_service()
-        self.drive_service = self._build_drive_service()
-        self.docs_service = self._build_docs_service()
-
-    def _get_credentials(self):
-        """Cria credenciais do Google a partir do JSON armazenado"""
-        creds_dict = json.loads(GOOGLE_CREDENTIALS)
-        scopes = SHEETS_SCOPE + DRIVE_SCOPE + DOCS_SCOPE
-        return service_account.Credentials.from_service_account_info(
-            creds_dict, scopes=scopes
-        )
-
-    def _build_sheets_service(self):
-        """Cria serviço do Google Sheets"""
-        return build('sheets', 'v4', credentials=self.credentials)
-
-    def _build_drive_service(self):
-        """Cria serviço do Google Drive"""
-        return build('drive', 'v3', credentials=self.credentials)
-
-    def _build_docs_service(self):
-        """Cria serviço do Google Docs"""
-        return build('docs', 'v1', credentials=self.credentials)
+        # Credenciais e serviços compartilhados pelo processo (utils/google_services):
+        # criar um GoogleManager a cada rerun não monta nem autentica nada de novo
+        self.credentials = get_credentials()
+        self.sheets_service = get_service('sheets')
+        self.drive_service = get_service('drive')
+        self.docs_service = get_service('docs')
+        # IDs das pastas já conhecidas (SQLite local, compartilhado pelo processo)
+        self.folder_cache = get_drive_folder_cache(DRIVE_FOLDER_CACHE_PATH)
 
     def update_sheet(self, sheet_id: str, range_name: str, values: List[List[Any]]):
         """Adiciona dados na última linha da planilha do Google Sheets"""
@@ -86,10 +71,10 @@ class GoogleManager:
                 body=body
             ).execute()
             
-            logger.info(f"Dados adicionados na linha {last_row} da planilha {sheet_id}")
+            logger.info("Dados adicionados na linha %s da planilha %s", last_row, sheet_id)
             
         except Exception as e:
-            logger.error(f"Erro ao atualizar planilha: {str(e)}")
+            logger.error("Erro ao atualizar planilha: %s", e)
             raise Exception(f"Erro ao atualizar planilha: {str(e)}")
 
     def create_folder(self, folder_name: str, parent_id: str = ROOT_FOLDER_ID) -> str:
@@ -97,7 +82,7 @@ class GoogleManager:
         try:
             file_metadata = {
                 'name': folder_name,
-                'mimeType': 'application/vnd.google-apps.folder',
+                'mimeType': FOLDER_MIME_TYPE,
                 'parents': [parent_id]
             }
             file = self.drive_service.files().create(
@@ -108,6 +93,15 @@ class GoogleManager:
         except Exception as e:
             raise Exception(f"Erro ao criar pasta: {str(e)}")
 
+    def trash_folder(self, folder_id: str):
+        """Move para a lixeira uma pasta criada por uma operação que não foi concluída"""
+        try:
+            self.drive_service.files().update(fileId=folder_id, body={'trashed': True}, fields='id').execute()
+            self.folder_cache.forget(folder_id)
+            logger.info("Pasta %s movida para a lixeira", folder_id)
+        except Exception as e:
+            raise DriveError(f"Erro ao mover pasta para a lixeira: {str(e)}")
+
     def upload_file(self, file_name: str, file_content: bytes, mime_type: str, folder_id: str) -> str:
         """Faz upload de um arquivo para o Google Drive"""
         try:
@@ -147,48 +141,26 @@ class GoogleManager:
             if not os.path.exists(template_full_path):
                 raise DriveError(f"Template não encontrado: {template_full_path}")
             
-            logger.info(f"Usando template em: {template_full_path}")
+            logger.info("Usando template em: %s", template_full_path)
 
-            # Carrega o template
+            # Carrega o template (compilado de novo só se o arquivo mudou)
             try:
-                doc = Document(template_full_path)
+                template = get_template_cache(TEMPLATE_CACHE_DIR).local(template_full_path)
             except Exception as e:
                 raise DriveError(f"Erro ao carregar template: {str(e)}")
             
             # Log dos dados
-            logger.info(f"Dados para substituição: {data}")
-            
-            # Substitui os placeholders em todo o documento
-            for paragraph in doc.paragraphs:
-                original_text = paragraph.text
-                for key, value in data.items():
-                    if f"{{{{{key}}}}}" in paragraph.text:
-                        paragraph.text = paragraph.text.replace(f"{{{{{key}}}}}", str(value))
-                
-                # Log se houve substituição
-                if original_text != paragraph.text:
-                    logger.debug(f"Substituído: '{original_text}' -> '{paragraph.text}'")
-            
-            # Substitui os placeholders nas tabelas
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            original_text = paragraph.text
-                            for key, value in data.items():
-                                if f"{{{{{key}}}}}" in paragraph.text:
-                                    paragraph.text = paragraph.text.replace(f"{{{{{key}}}}}", str(value))
-                            
-                            # Log se houve substituição
-                            if original_text != paragraph.text:
-                                logger.debug(f"Substituído em tabela: '{original_text}' -> '{paragraph.text}'")
+            logger.debug("Campos para substituição: %s", sorted(data))
+            
+            # Preenche uma cópia do template; placeholders sem valor em data ficam como estão
+            doc = template.render(data)
             
             # Define o nome do arquivo temporário
             temp_docx_path = os.path.join(tempfile.gettempdir(), f"temp_{int(time.time())}.docx")
             
             # Salva o documento temporário
             doc.save(temp_docx_path)
-            logger.info(f"Documento temporário salvo em: {temp_docx_path}")
+            logger.info("Documento temporário salvo em: %s", temp_docx_path)
             
             # Define o nome do arquivo final
             if output_filename:
@@ -208,7 +180,7 @@ class GoogleManager:
             docx_file = self.drive_service.files().create(body=docx_metadata, media_body=docx_media, fields='id').execute()
             docx_id = docx_file.get('id')
             
-            logger.info(f"DOCX enviado para o Drive. ID: {docx_id}")
+            logger.info("DOCX enviado para o Drive. ID: %s", docx_id)
             
             # Converte para PDF
             pdf_metadata = {
@@ -234,19 +206,19 @@ class GoogleManager:
                 raise DriveError("PDF não encontrado após conversão")
             
             pdf_id = pdf_files[0].get('id')
-            logger.info(f"PDF criado no Drive. ID: {pdf_id}")
+            logger.info("PDF criado no Drive. ID: %s", pdf_id)
             
             # Limpa o arquivo temporário
             try:
                 os.remove(temp_docx_path)
-                logger.info(f"Arquivo temporário removido: {temp_docx_path}")
+                logger.info("Arquivo temporário removido: %s", temp_docx_path)
             except Exception as e:
-                logger.warning(f"Erro ao remover documento temporário: {str(e)}")
+                logger.warning("Erro ao remover documento temporário: %s", e)
             
             return pdf_id, docx_id
             
         except Exception as e:
-            logger.error(f"Erro ao processar template: {str(e)}")
+            logger.error("Erro ao processar template: %s", e)
             raise DriveError(f"Erro ao processar template: {str(e)}")
 
     def export_to_pdf(self, doc_id: str) -> bytes:
@@ -303,7 +275,7 @@ class GoogleManager:
                     insertDataOption='INSERT_ROWS',
                     body={'values': values1}
                 ).execute()
-                logger.info(f"Planilha 1 atualizada com dados de {client_data['nome_completo']}")
+                logger.info("Planilha 1 atualizada com dados de %s", client_data['nome_completo'])
             
             # Sempre atualiza a segunda planilha com o novo caso
             current_date = datetime.now(SP_TZ).strftime('%d/%m/%Y')
@@ -328,10 +300,10 @@ class GoogleManager:
                 insertDataOption='INSERT_ROWS',
                 body={'values': values2}
             ).execute()
-            logger.info(f"Planilha 2 atualizada com caso para {client_data['nome_completo']}")
+            logger.info("Planilha 2 atualizada com caso para %s", client_data['nome_completo'])
             
         except Exception as e:
-            logger.error(f"Erro ao atualizar planilhas: {str(e)}")
+            logger.error("Erro ao atualizar planilhas: %s", e)
             raise Exception(f"Erro ao atualizar planilhas: {str(e)}")
 
     def format_folder_name(self, text: str) -> str:
@@ -341,39 +313,83 @@ class GoogleManager:
         text = text.replace(' ', '_')
         return text
 
+    def drive_batch(self) -> DriveBatch:
+        """Lote de operações do Drive enviadas numa única requisição (utils/drive_batch)"""
+        return DriveBatch(self.drive_service)
+
+    def _folder_request(self, folder_name: str, parent_id: str):
+        """Requisição (ainda não executada) que cria uma pasta"""
+        return self.drive_service.files().create(
+            body={
+                'name': folder_name,
+                'mimeType': FOLDER_MIME_TYPE,
+                'parents': [parent_id]
+            },
+            fields='id'
+        )
+
+    def _client_folder_name(self, nome: str, cpf: str) -> str:
+        nome_formatado = self.format_folder_name(nome)
+        cpf_formatado = cpf.replace('.', '').replace('-', '')
+        return f"{nome_formatado}_{cpf_formatado}"
+
+    def _case_folder_name(self, assunto_caso: str) -> str:
+        assunto_formatado = self.format_folder_name(assunto_caso)
+        data_atual = datetime.now(SP_TZ).strftime('%Y%m%d')
+        return f"{assunto_formatado}_{data_atual}"
+
+    def seed_folder_cache(self, supabase_manager):
+        """
+        Semeia o cache de pastas com as pastas registradas no Supabase (só na primeira vez)
+        
+        O cache é opcional: se o Supabase falhar, as pastas continuam sendo
+        buscadas no Drive.
+        """
+        if self.folder_cache.seeded:
+            return
+        try:
+            clients = supabase_manager.get_client_changes(columns='nome_completo,cpf,pasta_drive_id')['rows']
+            client_folder_ids = {row['id']: row.get('pasta_drive_id') for row in clients}
+            cases = supabase_manager.get_case_folder_ids()
+            self.folder_cache.seed(
+                (
+                    (self._client_folder_name(row['nome_completo'], row['cpf']), row.get('pasta_drive_id'))
+                    for row in clients if row.get('nome_completo') and row.get('cpf')
+                ),
+                (
+                    (row['pasta_caso_id'], client_folder_ids.get(row.get('cliente_id')), row.get('assunto_caso'))
+                    for row in cases
+                )
+            )
+        except Exception as e:
+            logger.warning("Cache de pastas do Drive não semeado: %s", e)
+
     def get_or_create_client_folder(self, nome: str, cpf: str) -> str:
         """
         Busca ou cria pasta do cliente no formato NOME_CPF
         Retorna: ID da pasta do cliente
         """
         try:
-            nome_formatado = self.format_folder_name(nome)
-            cpf_formatado = cpf.replace('.', '').replace('-', '')
-            folder_name = f"{nome_formatado}_{cpf_formatado}"
+            folder_name = self._client_folder_name(nome, cpf)
             
             # Verifica se pasta já existe
             response = self.drive_service.files().list(
-                q=f"name='{folder_name}' and '{ROOT_FOLDER_ID}' in parents and mimeType='application/vnd.google-apps.folder'",
-                spaces='drive'
+                q=f"name='{folder_name}' and '{ROOT_FOLDER_ID}' in parents and mimeType='{FOLDER_MIME_TYPE}' and trashed=false",
+                spaces='drive',
+                fields='files(id)',
+                pageSize=1
             ).execute()
             
             if response.get('files'):
-                logger.info(f"Pasta do cliente encontrada: {folder_name}")
-                return response['files'][0]['id']
-            
-            # Cria nova pasta
-            folder_metadata = {
-                'name': folder_name,
-                'mimeType': 'application/vnd.google-apps.folder',
-                'parents': [ROOT_FOLDER_ID]
-            }
-            folder = self.drive_service.files().create(
-                body=folder_metadata,
-                fields='id'
-            ).execute()
+                logger.info("Pasta do cliente encontrada: %s", folder_name)
+                folder_id = response['files'][0]['id']
+            else:
+                # Cria nova pasta
+                folder_id = self._folder_request(folder_name, ROOT_FOLDER_ID).execute().get('id')
+                logger.info("Pasta do cliente criada: %s", folder_name)
             
-            logger.info(f"Pasta do cliente criada: {folder_name}")
-            return folder.get('id')
+            self.folder_cache.set_client_folder(folder_name, folder_id)
+            return folder_id
             
         except Exception as e:
             raise DriveError(f"Erro ao criar/buscar pasta do cliente: {str(e)}")
@@ -384,32 +400,88 @@ class GoogleManager:
         Retorna: ID da pasta do caso
         """
         try:
-            assunto_formatado = self.format_folder_name(assunto_caso)
-            data_atual = datetime.now(SP_TZ).strftime('%Y%m%d')
-            folder_name = f"{assunto_formatado}_{data_atual}"
-            
-            folder_metadata = {
-                'name': folder_name,
-                'mimeType': 'application/vnd.google-apps.folder',
-                'parents': [client_folder_id]
-            }
-            
-            folder = self.drive_service.files().create(
-                body=folder_metadata,
-                fields='id'
-            ).execute()
+            folder_name = self._case_folder_name(assunto_caso)
+            folder_id = self._folder_request(folder_name, client_folder_id).execute().get('id')
             
-            logger.info(f"Pasta do caso criada: {folder_name}")
-            return folder.get('id')
+            logger.info("Pasta do caso criada: %s", folder_name)
+            self.folder_cache.add_case_folder(folder_id, client_folder_id, folder_name)
+            return folder_id
             
         except Exception as e:
             raise DriveError(f"Erro ao criar pasta do caso: {str(e)}")
 
-    def get_folder_url(self, folder_id: str) -> str:
-        """Retorna URL da pasta do Drive"""
+    def create_onboarding_folders(self, nome: str, cpf: str, assunto_caso: str,
+                                  client_folder_id: str = None) -> Tuple[str, str]:
+        """
+        Garante a pasta do cliente e cria a pasta do caso dentro dela
+        
+        Sem client_folder_id, a pasta do cliente é procurada primeiro no cache
+        local (NOME_CPF). Se o cache confirmou a pasta há menos de
+        DRIVE_FOLDER_VERIFY_INTERVAL segundos, a pasta do caso é criada direto;
+        senão a verificação da pasta do cliente e a criação da pasta do caso
+        vão num único lote (uma requisição). Se a verificação mostrar que a
+        pasta do cliente não existe mais (ou está na lixeira), a pasta do caso
+        criada no lote vai para a lixeira, a pasta do cliente sai do cache e é
+        buscada pelo nome ou recriada no Drive, e só então a pasta do caso é
+        criada (depende dela).
+        
+        Returns:
+            (ID da pasta do cliente, ID da pasta do caso)
+        """
+        folder_name = self._client_folder_name(nome, cpf)
+        if not client_folder_id:
+            cached = self.folder_cache.client_folder(folder_name)
+            client_folder_id = cached['folder_id'] if cached else None
+        
+        if client_folder_id:
+            verified_at = self.folder_cache.verified_at(client_folder_id)
+            if verified_at is not None and time.time() - verified_at <= DRIVE_FOLDER_VERIFY_INTERVAL:
+                return client_folder_id, self.create_case_folder(client_folder_id, assunto_caso)
+            
+            case_folder_name = self._case_folder_name(assunto_caso)
+            with self.drive_batch() as batch:
+                client_folder = batch.add(self.drive_service.files().get(
+                    fileId=client_folder_id, fields='id,trashed'
+                ))
+                case_folder = batch.add(self._folder_request(case_folder_name, client_folder_id))
+            
+            if client_folder.exception() is None and not client_folder.result().get('trashed'):
+                if case_folder.exception() is not None:
+                    raise DriveError(f"Erro ao criar pasta do caso: {str(case_folder.exception())}")
+                case_folder_id = case_folder.result()['id']
+                logger.info("Pasta do caso criada: %s", case_folder_name)
+                # Pasta confirmada: as próximas criações dispensam a verificação
+                self.folder_cache.set_client_folder(folder_name, client_folder_id)
+                self.folder_cache.mark_verified(client_folder_id)
+                self.folder_cache.add_case_folder(case_folder_id, client_folder_id, case_folder_name)
+                return client_folder_id, case_folder_id
+            
+            logger.warning("Pasta do cliente %s não encontrada no Drive; buscando pelo nome", client_folder_id)
+            if case_folder.exception() is None:
+                # Criada dentro da pasta na lixeira: descarta junto
+                try:
+                    self.trash_folder(case_folder.result()['id'])
+                except DriveError as e:
+                    logger.error("Erro ao descartar pasta do caso criada na pasta na lixeira: %s", e)
+            self.folder_cache.forget(client_folder_id)
+        
+        client_folder_id = self.get_or_create_client_folder(nome, cpf)
+        return client_folder_id, self.create_case_folder(client_folder_id, assunto_caso)
+
+    def get_folder_url(self, folder_id: str, verify: bool = False) -> str:
+        """
+        Retorna URL da pasta do Drive
+        
+        A URL é montada a partir do ID; com verify=True, confirma antes (uma
+        requisição) que a pasta existe, a não ser que o cache de pastas já a
+        tenha confirmado há menos de DRIVE_FOLDER_VERIFY_INTERVAL segundos.
+        """
         try:
-            # Verifica se a pasta existe
-            self.drive_service.files().get(fileId=folder_id).execute()
+            if verify:
+                verified_at = self.folder_cache.verified_at(folder_id)
+                if verified_at is None or time.time() - verified_at > DRIVE_FOLDER_VERIFY_INTERVAL:
+                    self.drive_service.files().get(fileId=folder_id, fields='id').execute()
+                    self.folder_cache.mark_verified(folder_id)
             return f"https://drive.google.com/drive/folders/{folder_id}"
         except Exception as e:
             raise DriveError(f"Erro ao gerar URL da pasta: {str(e)}")
@@ -438,5 +510,5 @@ class GoogleManager:
             
             return response.get('files', [])
         except Exception as e:
-            logger.error(f"Erro ao buscar arquivos na pasta: {str(e)}")
+            logger.error("Erro ao buscar arquivos na pasta: %s", e)
             raise Exception(f"Erro ao buscar arquivos na pasta: {str(e)}") 
\ No newline at end of file
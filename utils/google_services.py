@@ -0,0 +1,117 @@
+"""
+Serviços do Google (Sheets, Drive e Docs) compartilhados pelo processo
+
+Os documentos de descoberta vêm da cópia estática que acompanha o
+google-api-python-client (nada é baixado) e são lidos uma vez só; cada
+serviço também é montado uma vez só. As credenciais são as mesmas para
+todos, e o token de acesso vem de um cache em arquivo compartilhado com os
+outros processos e renovado em segundo plano (utils/token_cache).
+
+O httplib2.Http não pode ser usado por duas threads ao mesmo tempo, e o
+Streamlit roda cada sessão numa thread: cada requisição usa a conexão
+(AuthorizedHttp) da thread atual, criada na primeira requisição da thread.
+"""
+import json
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Dict
+
+import google_auth_httplib2
+import httplib2
+from google.oauth2 import service_account
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import HttpRequest
+
+from config.settings import (
+    GOOGLE_CREDENTIALS,
+    GOOGLE_TOKEN_CACHE_PATH,
+    GOOGLE_TOKEN_REFRESH_MARGIN,
+    SHEETS_SCOPE,
+    DRIVE_SCOPE,
+    DOCS_SCOPE
+)
+from utils.token_cache import CachedTokenCredentials, SharedTokenCache
+
+logger = logging.getLogger(__name__)
+
+# Versão usada de cada API
+API_VERSIONS = {'sheets': 'v4', 'drive': 'v3', 'docs': 'v1'}
+
+# Tempo máximo (s) de cada requisição HTTP às APIs do Google
+GOOGLE_HTTP_TIMEOUT = 120
+
+_credentials_lock = threading.Lock()
+_credentials = None
+_services: Dict[str, Any] = {}
+_services_lock = threading.Lock()
+_thread_state = threading.local()
+
+
+@lru_cache(maxsize=None)
+def get_discovery_document(api: str, version: str) -> Dict[str, Any]:
+    """Documento de descoberta da API (cópia estática da biblioteca, lido uma vez)"""
+    document = get_static_doc(api, version)
+    if document is None:
+        raise Exception(f"Documento de descoberta de {api} {version} não encontrado")
+    return json.loads(document)
+
+
+def get_credentials() -> CachedTokenCredentials:
+    """Credenciais da conta de serviço (Sheets, Drive e Docs), únicas no processo"""
+    global _credentials
+    if _credentials is None:
+        with _credentials_lock:
+            if _credentials is None:
+                service_account_credentials = service_account.Credentials.from_service_account_info(
+                    json.loads(GOOGLE_CREDENTIALS), scopes=SHEETS_SCOPE + DRIVE_SCOPE + DOCS_SCOPE
+                )
+                credentials = CachedTokenCredentials(
+                    service_account_credentials,
+                    SharedTokenCache(GOOGLE_TOKEN_CACHE_PATH),
+                    refresh_margin=GOOGLE_TOKEN_REFRESH_MARGIN
+                )
+                credentials.start_background_refresh(
+                    lambda: google_auth_httplib2.Request(httplib2.Http(timeout=GOOGLE_HTTP_TIMEOUT))
+                )
+                _credentials = credentials
+    return _credentials
+
+
+def thread_http() -> google_auth_httplib2.AuthorizedHttp:
+    """Conexão autenticada da thread atual (mantém o keep-alive dentro da thread)"""
+    http = getattr(_thread_state, 'http', None)
+    if http is None:
+        http = google_auth_httplib2.AuthorizedHttp(
+            get_credentials(), http=httplib2.Http(timeout=GOOGLE_HTTP_TIMEOUT)
+        )
+        _thread_state.http = http
+    return http
+
+
+def _build_request(http, *args, **kwargs) -> HttpRequest:
+    """Monta cada requisição com a conexão da thread que vai executá-la"""
+    return HttpRequest(thread_http(), *args, **kwargs)
+
+
+def get_service(api: str):
+    """
+    Serviço da API ('sheets', 'drive' ou 'docs'), montado uma vez por processo
+
+    Pode ser usado por várias threads: cada requisição usa a conexão da
+    thread em que foi criada.
+    """
+    service = _services.get(api)
+    if service is None:
+        with _services_lock:
+            service = _services.get(api)
+            if service is None:
+                service = build_from_document(
+                    get_discovery_document(api, API_VERSIONS[api]),
+                    http=thread_http(),
+                    requestBuilder=_build_request
+                )
+                _services[api] = service
+                logger.info("Serviço %s %s do Google montado", api, API_VERSIONS[api])
+    return service
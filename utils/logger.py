@@ -1,25 +1,116 @@
+import atexit
 import logging
+import logging.handlers
 import os
-from datetime import datetime
-
-def setup_logger():
-    """Configura o sistema de logging"""
-    # Criar diretório de logs se não existir
-    log_dir = 'logs'
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
-    # Nome do arquivo de log com data
-    log_file = f"logs/smartlegal_{datetime.now().strftime('%Y%m%d')}.log"
-    
-    # Configuração do logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
-    
-    return logging.getLogger('smartlegal') 
\ No newline at end of file
+import queue
+import threading
+from typing import Dict, Optional, Tuple
+
+from config.settings import (
+    LOG_LEVEL,
+    LOG_DIR,
+    LOG_FILE_MAX_BYTES,
+    LOG_FILE_BACKUP_COUNT,
+    LOG_DEBUG_SAMPLE_RATE,
+    LOG_DEBUG_SAMPLE_BURST
+)
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Estado do processo: o Streamlit reexecuta o Home.py a cada interação, mas a
+# configuração (e a thread que grava os logs) deve ser feita uma vez só
+_setup_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Amostragem de eventos DEBUG repetitivos
+
+    Cada mensagem DEBUG (por logger e texto do formato, antes de preencher os
+    argumentos) passa inteira nas primeiras `burst` vezes; depois, só 1 a
+    cada `rate`. Os demais níveis nunca são descartados.
+    """
+
+    def __init__(self, rate: int = 10, burst: int = 20):
+        super().__init__()
+        self.rate = max(1, rate)
+        self.burst = burst
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate == 1:
+            return True
+        key = (record.name, str(record.msg))
+        with self._lock:
+            count = self._counts.get(key, 0) + 1
+            if len(self._counts) < 10_000 or key in self._counts:
+                self._counts[key] = count
+        return count <= self.burst or count % self.rate == 0
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enfileira o registro sem formatá-lo
+
+    O QueueHandler padrão monta a mensagem na thread que loga; aqui a
+    formatação (% e traceback) fica para a thread do QueueListener, junto
+    com a escrita em disco.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logger(level: Optional[str] = None, log_dir: Optional[str] = None) -> logging.Logger:
+    """
+    Configura o sistema de logging (uma vez por processo; chamadas seguintes não fazem nada)
+
+    O logger raiz recebe só um QueueHandler: quem loga apenas coloca o
+    registro numa fila, e uma thread (QueueListener) formata e grava no
+    console e em logs/smartlegal.log, com rotação por tamanho.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            log_dir = log_dir or LOG_DIR
+            os.makedirs(log_dir, exist_ok=True)
+
+            formatter = logging.Formatter(LOG_FORMAT)
+            file_handler = logging.handlers.RotatingFileHandler(
+                os.path.join(log_dir, 'smartlegal.log'),
+                maxBytes=LOG_FILE_MAX_BYTES,
+                backupCount=LOG_FILE_BACKUP_COUNT,
+                encoding='utf-8'
+            )
+            stream_handler = logging.StreamHandler()
+            for handler in (file_handler, stream_handler):
+                handler.setFormatter(formatter)
+
+            log_queue = queue.SimpleQueue()
+            queue_handler = LazyQueueHandler(log_queue)
+            queue_handler.addFilter(SamplingFilter(LOG_DEBUG_SAMPLE_RATE, LOG_DEBUG_SAMPLE_BURST))
+
+            root = logging.getLogger()
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+            root.addHandler(queue_handler)
+            root.setLevel((level or LOG_LEVEL).upper())
+
+            _listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+            _listener.start()
+            atexit.register(stop_logger)
+
+    return logging.getLogger('smartlegal')
+
+
+def stop_logger():
+    """Grava o que ainda está na fila e encerra a thread de logging"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
@@ -0,0 +1,208 @@
+import functools
+import inspect
+import json
+import logging
+import math
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Contadores de bytes ativos no contexto atual (um por chamada instrumentada
+# em andamento, para que chamadas aninhadas também somem os bytes das internas)
+_active_byte_counters: ContextVar[tuple] = ContextVar('_active_byte_counters', default=())
+
+
+def add_bytes(count: int):
+    """Soma bytes recebidos às chamadas instrumentadas em andamento"""
+    for counter in _active_byte_counters.get():
+        counter[0] += count
+
+
+def count_rows(result: Any) -> int:
+    """Número de linhas num resultado do manager (lista, página ou linha única)"""
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        rows = result.get('rows')
+        return len(rows) if isinstance(rows, list) else 1
+    return 0
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por posição mais próxima (nearest-rank) de uma lista ordenada"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class MethodMetrics:
+    """Métricas de um método: contagens, latências (amostra limitada), linhas e bytes"""
+
+    def __init__(self, reservoir_size: int):
+        self.reservoir_size = reservoir_size
+        self.calls = 0
+        self.errors = 0
+        self.slow_calls = 0
+        self.rows = 0
+        self.bytes = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self._samples: List[float] = []
+
+    def record(self, elapsed: float, rows: int, byte_count: int, error: bool, slow: bool):
+        self.calls += 1
+        self.errors += int(error)
+        self.slow_calls += int(slow)
+        self.rows += rows
+        self.bytes += byte_count
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+        # Reservoir sampling: memória constante, amostra uniforme de todas as chamadas
+        if len(self._samples) < self.reservoir_size:
+            self._samples.append(elapsed)
+        else:
+            index = random.randrange(self.calls)
+            if index < self.reservoir_size:
+                self._samples[index] = elapsed
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = sorted(self._samples)
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'slow_calls': self.slow_calls,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'total_ms': self.total_time * 1000,
+            'avg_ms': (self.total_time / self.calls * 1000) if self.calls else 0.0,
+            'max_ms': self.max_time * 1000,
+            'p50_ms': percentile(samples, 50) * 1000,
+            'p95_ms': percentile(samples, 95) * 1000,
+            'p99_ms': percentile(samples, 99) * 1000
+        }
+
+
+class MetricsRegistry:
+    """
+    Registro das métricas por método
+
+    Args:
+        slow_threshold_ms: Chamadas acima deste tempo geram um aviso no log
+        reservoir_size: Número máximo de latências guardadas por método
+    """
+
+    def __init__(self, slow_threshold_ms: float = 500.0, reservoir_size: int = 1024):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.reservoir_size = reservoir_size
+        self._lock = threading.Lock()
+        self._methods: Dict[str, MethodMetrics] = {}
+
+    def record(self, name: str, elapsed: float, rows: int = 0, byte_count: int = 0,
+               error: bool = False):
+        """Registra uma chamada; loga como lenta se passar do limite"""
+        slow = elapsed * 1000 >= self.slow_threshold_ms
+        with self._lock:
+            metrics = self._methods.get(name)
+            if metrics is None:
+                metrics = self._methods[name] = MethodMetrics(self.reservoir_size)
+            metrics.record(elapsed, rows, byte_count, error, slow)
+        if slow:
+            logger.warning(
+                "Consulta lenta: %s levou %.0f ms (%d linhas, %d bytes)",
+                name, elapsed * 1000, rows, byte_count
+            )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Cópia das métricas atuais, por método"""
+        with self._lock:
+            return {name: metrics.snapshot() for name, metrics in sorted(self._methods.items())}
+
+    def export(self, path: Optional[str] = None) -> str:
+        """Exporta o snapshot em JSON (e grava em path, se informado)"""
+        data = json.dumps({
+            'generated_at': time.time(),
+            'slow_threshold_ms': self.slow_threshold_ms,
+            'methods': self.snapshot()
+        }, indent=2)
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        return data
+
+    def reset(self):
+        """Zera todas as métricas"""
+        with self._lock:
+            self._methods.clear()
+
+
+def instrument(registry: MetricsRegistry, name: Optional[str] = None) -> Callable:
+    """Decorator que registra tempo, erros, linhas e bytes de cada chamada"""
+    def decorator(func: Callable) -> Callable:
+        metric_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            # Corrotinas: o tempo medido é o do await, não o da criação da corrotina
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                counter = [0]
+                token = _active_byte_counters.set(_active_byte_counters.get() + (counter,))
+                start = time.perf_counter()
+                error = False
+                result = None
+                try:
+                    result = await func(*args, **kwargs)
+                    return result
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - start
+                    _active_byte_counters.reset(token)
+                    registry.record(metric_name, elapsed, count_rows(result), counter[0], error)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            counter = [0]
+            token = _active_byte_counters.set(_active_byte_counters.get() + (counter,))
+            start = time.perf_counter()
+            error = False
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except Exception:
+                error = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                _active_byte_counters.reset(token)
+                registry.record(metric_name, elapsed, count_rows(result), counter[0], error)
+
+        return wrapper
+    return decorator
+
+
+def instrument_methods(registry: MetricsRegistry) -> Callable:
+    """
+    Decorator de classe: instrumenta todos os métodos de instância públicos
+
+    Métodos privados (prefixo _), staticmethods e classmethods não são
+    alterados.
+    """
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith('_') or not inspect.isfunction(value):
+                continue
+            setattr(cls, attr, instrument(registry, f"{cls.__name__}.{attr}")(value))
+        return cls
+    return decorator
@@ -73,7 +73,7 @@ class PDFManager:
             return pdf_buffer.getvalue()
             
         except Exception as e:
-            logger.error(f"Erro ao converter imagem para PDF: {str(e)}")
+            logger.error("Erro ao converter imagem para PDF: %s", e)
             raise Exception(f"Erro ao converter imagem para PDF: {str(e)}")
 
     @staticmethod
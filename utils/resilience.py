@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+from postgrest.exceptions import APIError
+
+from utils.error_handler import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+# Classificação das falhas transitórias
+NOT_SENT = 'not_sent'          # a requisição não chegou ao servidor
+ROLLED_BACK = 'rolled_back'    # chegou, mas a transação foi desfeita
+AMBIGUOUS = 'ambiguous'        # pode ou não ter sido aplicada
+
+# Códigos do PostgREST/Postgres em que a transação com certeza não foi aplicada
+_ROLLED_BACK_CODES = {
+    'PGRST000', 'PGRST001', 'PGRST002', 'PGRST003',  # sem conexão com o banco
+    '40001',  # serialization_failure
+    '40P01',  # deadlock_detected
+    '53300',  # too_many_connections
+    '57P01',  # admin_shutdown
+    '57P03',  # cannot_connect_now
+}
+# Códigos transitórios em que não dá para saber se o comando foi aplicado
+_AMBIGUOUS_CODES = {
+    '57014',  # query_canceled (statement_timeout)
+}
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    """
+    Classifica uma falha do Supabase
+
+    Returns:
+        NOT_SENT, ROLLED_BACK ou AMBIGUOUS para falhas transitórias,
+        None para erros definitivos (validação, constraint, permissão...)
+    """
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return NOT_SENT
+    if isinstance(error, httpx.TransportError):
+        return AMBIGUOUS
+    if isinstance(error, APIError):
+        code = error.code
+        # Resposta sem JSON (ex.: 502/503/504 do gateway): o código é o status HTTP
+        if isinstance(code, int):
+            if code == 503:
+                return NOT_SENT
+            return AMBIGUOUS if code >= 500 else None
+        code = str(code or '')
+        if code in _ROLLED_BACK_CODES or code.startswith('08'):
+            return ROLLED_BACK
+        if code in _AMBIGUOUS_CODES:
+            return AMBIGUOUS
+    return None
+
+
+class RetryPolicy:
+    """
+    Novas tentativas com backoff exponencial e jitter ("full jitter")
+
+    Operações idempotentes (leituras, updates/deletes por ID, upserts) são
+    repetidas em qualquer falha transitória. As não idempotentes (inserts,
+    RPCs que criam registros) só quando é certo que nada foi gravado.
+
+    Args:
+        max_attempts: Número total de tentativas (1 = sem novas tentativas)
+        base_delay: Espera base, em segundos
+        max_delay: Espera máxima entre tentativas, em segundos
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+
+    def delay(self, attempt: int) -> float:
+        """Espera antes da tentativa seguinte à de número attempt (1, 2, ...)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def should_retry(self, error: Exception, attempt: int, idempotent: bool) -> bool:
+        if attempt >= self.max_attempts:
+            return False
+        kind = classify_error(error)
+        if kind is None:
+            return False
+        return idempotent or kind in (NOT_SENT, ROLLED_BACK)
+
+    def wait(self, attempt: int):
+        self._sleep(self.delay(attempt))
+
+
+class CircuitBreaker:
+    """
+    Disjuntor: após failure_threshold falhas transitórias seguidas, passa a
+    falhar imediatamente por recovery_timeout segundos. Depois disso deixa
+    passar uma chamada de teste; se ela funcionar, volta ao normal.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        """Levanta DatabaseError se o disjuntor estiver aberto"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.recovery_timeout:
+                    raise DatabaseError(
+                        "Banco de dados indisponível no momento. Tente novamente em alguns instantes."
+                    )
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    raise DatabaseError(
+                        "Banco de dados indisponível no momento. Tente novamente em alguns instantes."
+                    )
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Conexão com o banco restabelecida; disjuntor fechado")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("Disjuntor do banco aberto após %s falhas seguidas", self._failures)
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def reset(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+
+def call_with_resilience(func: Callable[[], Any], policy: RetryPolicy,
+                         breaker: Optional[CircuitBreaker] = None,
+                         idempotent: bool = True) -> Any:
+    """
+    Executa func aplicando o disjuntor e a política de novas tentativas
+
+    Erros definitivos são repassados na primeira ocorrência, sem contar
+    como falha do banco. Esgotadas as tentativas, a última exceção é
+    repassada sem alteração.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = func()
+        except Exception as e:
+            transient = classify_error(e) is not None
+            if breaker is not None:
+                if transient:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if not policy.should_retry(e, attempt, idempotent):
+                raise
+            logger.warning("Falha transitória no banco (tentativa %s/%s): %s", attempt, policy.max_attempts, e)
+            policy.wait(attempt)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+async def call_with_resilience_async(func: Callable[[], Awaitable[Any]], policy: RetryPolicy,
+                                     breaker: Optional[CircuitBreaker] = None,
+                                     idempotent: bool = True) -> Any:
+    """Versão assíncrona de call_with_resilience (a espera entre tentativas não bloqueia o loop)"""
+    attempt = 0
+    while True:
+        attempt += 1
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = await func()
+        except Exception as e:
+            transient = classify_error(e) is not None
+            if breaker is not None:
+                if transient:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if not policy.should_retry(e, attempt, idempotent):
+                raise
+            logger.warning("Falha transitória no banco (tentativa %s/%s): %s", attempt, policy.max_attempts, e)
+            await asyncio.sleep(policy.delay(attempt))
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
@@ -0,0 +1,188 @@
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Set
+
+from unidecode import unidecode
+
+_NON_ALNUM = re.compile(r'[^a-z0-9@._]+')
+_NON_DIGIT = re.compile(r'\D+')
+
+# Proporção mínima dos trigramas da busca que o registro precisa conter
+MIN_SIMILARITY = 0.6
+
+
+def normalize(text: Any) -> str:
+    """Remove acentos, passa para minúsculas e colapsa separadores"""
+    if text is None:
+        return ''
+    text = unidecode(str(text)).lower()
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def only_digits(text: Any) -> str:
+    """Mantém só os dígitos (usado para CPF)"""
+    if text is None:
+        return ''
+    return _NON_DIGIT.sub('', str(text))
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas de cada palavra, com espaço nas bordas para marcar o início/fim"""
+    grams = set()
+    for word in text.split():
+        padded = f' {word} '
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def query_trigrams(text: str) -> Set[str]:
+    """
+    Trigramas de uma consulta digitada
+
+    Sem espaço nas bordas, para que um trecho do meio da palavra ("ilva")
+    também case; palavras de duas letras viram um trigrama de início
+    (" jo").
+    """
+    grams = set()
+    for word in text.split():
+        if len(word) == 2:
+            grams.add(f' {word}')
+        for i in range(len(word) - 2):
+            grams.add(word[i:i + 3])
+    return grams
+
+
+class TrigramIndex:
+    """
+    Índice de trigramas em memória para a busca de clientes
+
+    Indexa nome, CPF e email normalizados (sem acentos, minúsculas), de modo
+    que "Joao" encontra "João" e "12345678" encontra "123.456.78x-xx". A busca
+    não faz nenhuma chamada de rede; o índice é atualizado incrementalmente
+    com add/remove.
+    """
+
+    def __init__(self, name_field: str = 'nome_completo', cpf_field: str = 'cpf',
+                 email_field: str = 'email', id_field: str = 'id'):
+        self.name_field = name_field
+        self.cpf_field = cpf_field
+        self.email_field = email_field
+        self.id_field = id_field
+        self._lock = threading.RLock()
+        self._rows: Dict[Any, Dict[str, Any]] = {}
+        self._texts: Dict[Any, List[str]] = {}
+        self._grams: Dict[Any, Set[str]] = {}
+        self._postings: Dict[str, Set[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, row_id: Any) -> bool:
+        return row_id in self._rows
+
+    def _searchable_texts(self, row: Dict[str, Any]) -> List[str]:
+        return [
+            normalize(row.get(self.name_field)),
+            only_digits(row.get(self.cpf_field)),
+            normalize(row.get(self.email_field))
+        ]
+
+    def add(self, row: Dict[str, Any]):
+        """Indexa (ou reindexa) um registro"""
+        row_id = row.get(self.id_field)
+        if row_id is None:
+            return
+        with self._lock:
+            if row_id in self._rows:
+                self._unlink(row_id)
+            texts = self._searchable_texts(row)
+            grams = set()
+            for text in texts:
+                grams |= trigrams(text)
+            self._rows[row_id] = dict(row)
+            self._texts[row_id] = texts
+            self._grams[row_id] = grams
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(row_id)
+
+    def add_many(self, rows: Iterable[Dict[str, Any]]):
+        """Indexa vários registros"""
+        with self._lock:
+            for row in rows:
+                self.add(row)
+
+    def remove(self, row_id: Any):
+        """Remove um registro do índice (sem erro se não existir)"""
+        with self._lock:
+            if row_id in self._rows:
+                self._unlink(row_id)
+                del self._rows[row_id]
+                del self._texts[row_id]
+
+    def clear(self):
+        """Esvazia o índice"""
+        with self._lock:
+            self._rows.clear()
+            self._texts.clear()
+            self._grams.clear()
+            self._postings.clear()
+
+    def _unlink(self, row_id: Any):
+        for gram in self._grams.pop(row_id, ()):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(row_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def search(self, query: str, limit: int = 10,
+               min_similarity: float = MIN_SIMILARITY) -> List[Dict[str, Any]]:
+        """
+        Busca registros parecidos com a consulta
+
+        Args:
+            query: Texto digitado (parte do nome, CPF ou email)
+            limit: Número máximo de resultados
+            min_similarity: Fração mínima dos trigramas da consulta presentes
+
+        Returns:
+            Cópias dos registros, do mais para o menos relevante
+        """
+        text = normalize(query)
+        digits = only_digits(query)
+        if not text and not digits:
+            return []
+
+        # Consulta só com dígitos/pontuação é tratada como CPF
+        if digits and not re.search(r'[a-z]', text):
+            text = digits
+
+        with self._lock:
+            if len(text.replace(' ', '')) < 3:
+                # Poucos caracteres para trigramas: varredura direta por substring
+                candidates = {
+                    row_id: 1.0 for row_id, texts in self._texts.items()
+                    if any(text in t for t in texts)
+                }
+            else:
+                query_grams = query_trigrams(text)
+                hits = Counter()
+                for gram in query_grams:
+                    for row_id in self._postings.get(gram, ()):
+                        hits[row_id] += 1
+                total = len(query_grams) or 1
+                candidates = {
+                    row_id: count / total for row_id, count in hits.items()
+                    if count / total >= min_similarity
+                }
+
+            def rank(row_id):
+                texts = self._texts[row_id]
+                contains = any(text in t for t in texts)
+                prefix = texts[0].startswith(text)
+                return (-candidates[row_id], not contains, not prefix, texts[0])
+
+            ranked = sorted(candidates, key=rank)[:limit]
+            return [dict(self._rows[row_id]) for row_id in ranked]
@@ -0,0 +1,124 @@
+"""
+Similaridade entre os fatos do caso e as jurisprudências (TF-IDF com hashing)
+
+Cada jurisprudência vira um vetor TF-IDF de dimensão fixa: as palavras
+(normalizadas como na busca BM25) e os pares de palavras vizinhas são
+espalhados por hashing em `dimensions` posições, sem vocabulário a manter.
+Os vetores normalizados ficam numa matriz NumPy; a similaridade de cosseno
+com um texto é um único produto matriz-vetor.
+"""
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.bm25_index import tokenize
+
+# 4096 posições em float32: 16 KB por documento na matriz
+SIMILARITY_DIMENSIONS = 2 ** 12
+
+# Acréscimo na similaridade quando a seção da jurisprudência é a seção pedida
+SECAO_BOOST = 0.15
+
+
+def _features(text: Any) -> List[str]:
+    """Termos e pares de termos vizinhos do texto"""
+    terms = tokenize(text)
+    return terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+
+
+class HashedTfidfIndex:
+    """
+    Matriz TF-IDF (documentos x dimensions) para ranquear documentos por texto
+
+    Args:
+        docs: Registros a indexar
+        text_fields: Campos cujo texto compõe o documento
+        id_field: Campo com o identificador do registro
+        secao_field: Campo com a seção (para o bônus de rank_for_sections)
+        dimensions: Tamanho dos vetores (colisões de hashing ficam raras
+            enquanto o número de termos distintos for bem menor que isso)
+    """
+
+    def __init__(self, docs: Iterable[Dict[str, Any]], text_fields: Iterable[str] = ('nome', 'texto'),
+                 id_field: str = 'id', secao_field: str = 'secao', dimensions: int = SIMILARITY_DIMENSIONS):
+        self.dimensions = dimensions
+        self.docs = [doc for doc in docs if doc.get(id_field) is not None]
+        self.ids = [doc[id_field] for doc in self.docs]
+        # Seções como conjuntos de termos (mesmo tokenize da busca), para que
+        # 'deveres_transportador' corresponda a 'Deveres do Transportador'
+        self.secoes = [frozenset(tokenize(doc.get(secao_field))) for doc in self.docs]
+
+        counts = np.zeros((len(self.docs), dimensions), dtype=np.float32)
+        for row, doc in enumerate(self.docs):
+            text = ' '.join(str(doc.get(field) or '') for field in text_fields)
+            self._accumulate(counts[row], _features(text))
+
+        # tf sublinear (1 + log tf) e idf suavizado, como no scikit-learn
+        document_frequency = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + len(self.docs)) / (1 + document_frequency)) + 1).astype(np.float32)
+        nonzero = counts > 0
+        counts[nonzero] = 1 + np.log(counts[nonzero])
+        counts *= self.idf
+        self.matrix = self._normalize_rows(counts)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _accumulate(self, vector: np.ndarray, features: List[str]):
+        if not features:
+            return
+        buckets = np.fromiter((zlib.crc32(feature.encode('utf-8')) for feature in features),
+                              dtype=np.int64, count=len(features)) % self.dimensions
+        vector += np.bincount(buckets, minlength=self.dimensions)
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
+
+    def vectorize(self, text: Any) -> np.ndarray:
+        """Vetor TF-IDF normalizado de um texto"""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        self._accumulate(vector, _features(text))
+        nonzero = vector > 0
+        vector[nonzero] = 1 + np.log(vector[nonzero])
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def scores(self, text: Any) -> np.ndarray:
+        """Similaridade de cosseno de cada documento com o texto"""
+        if not self.docs:
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ self.vectorize(text)
+
+    def rank_for_sections(self, text: Any, sections: Iterable[str], boost: float = SECAO_BOOST, limit: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Ordena os documentos por relevância para cada seção da petição
+
+        A similaridade com o texto é calculada uma vez; em cada seção, os
+        documentos cuja seção corresponde ao nome dela (os termos de uma
+        contidos nos da outra) ganham `boost`.
+
+        Returns:
+            Seção -> lista de {'id', 'score'} da mais para a menos relevante
+        """
+        base = self.scores(text)
+        secoes = self.secoes
+        ranking = {}
+        for section in sections:
+            wanted = frozenset(tokenize(section))
+            matches = np.fromiter(
+                (bool(secao) and bool(wanted) and (secao <= wanted or wanted <= secao) for secao in secoes),
+                dtype=bool, count=len(secoes)
+            )
+            section_scores = base + boost * matches
+            order = np.argsort(-section_scores, kind='stable')
+            if limit is not None:
+                order = order[:limit]
+            ranking[section] = [
+                {'id': self.ids[i], 'score': float(section_scores[i])} for i in order
+            ]
+        return ranking
@@ -0,0 +1,668 @@
+"""
+Backend SQLite local, compatível com o subconjunto do PostgREST usado pelo app
+
+Em vez de reimplementar a API fluente do cliente, o backend é um transport
+do httpx: o SyncPostgrestClient/AsyncPostgrestClient monta as requisições
+normalmente (select, eq, ilike, or/and, order, limit, insert, update,
+upsert, delete, rpc) e o transport as executa num banco SQLite, devolvendo
+respostas no mesmo formato do PostgREST (inclusive os erros 23505/23503).
+Assim o SupabaseManager roda sem alteração, totalmente offline.
+
+Uso para benchmarks/testes de carga:
+    python -m utils.sqlite_backend data/benchmark.db --clientes 100000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+import httpx
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+from postgrest.utils import AsyncClient, SyncClient
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = 'http://sqlite.local/rest/v1'
+
+_NOW = "(strftime('%Y-%m-%dT%H:%M:%f', 'now'))"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS clientes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome_completo TEXT NOT NULL,
+    nacionalidade TEXT,
+    estado_civil TEXT,
+    profissao TEXT,
+    email TEXT NOT NULL,
+    celular TEXT,
+    data_nascimento TEXT,
+    rg TEXT,
+    cpf TEXT NOT NULL UNIQUE,
+    endereco TEXT,
+    bairro TEXT,
+    cidade TEXT,
+    estado TEXT,
+    cep TEXT,
+    pasta_drive_id TEXT,
+    created_at TEXT NOT NULL DEFAULT {_NOW},
+    updated_at TEXT NOT NULL DEFAULT {_NOW}
+);
+CREATE INDEX IF NOT EXISTS clientes_nome_completo_idx ON clientes (nome_completo, id);
+CREATE INDEX IF NOT EXISTS clientes_created_at_idx ON clientes (created_at, id);
+CREATE INDEX IF NOT EXISTS clientes_email_idx ON clientes (email);
+
+CREATE TABLE IF NOT EXISTS casos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cliente_id INTEGER NOT NULL REFERENCES clientes (id),
+    nome_cliente TEXT,
+    caso TEXT,
+    assunto_caso TEXT,
+    responsavel_comercial TEXT,
+    pasta_caso_id TEXT,
+    pasta_caso_url TEXT,
+    chave_caso TEXT,
+    created_at TEXT NOT NULL DEFAULT {_NOW}
+);
+CREATE INDEX IF NOT EXISTS casos_cliente_id_idx ON casos (cliente_id);
+
+CREATE TABLE IF NOT EXISTS "companhiasAereas" (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome TEXT NOT NULL,
+    cnpj TEXT,
+    endereco TEXT,
+    created_at TEXT NOT NULL DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS "jurisprudenciaAereo" (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome TEXT NOT NULL,
+    texto TEXT,
+    secao TEXT,
+    "Tribunal" TEXT,
+    created_at TEXT NOT NULL DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS "fatosGPT" (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    caso TEXT,
+    input TEXT,
+    output TEXT,
+    created_at TEXT NOT NULL DEFAULT {_NOW}
+);
+"""
+
+# Equivalente a sql/client_sync.sql (updated_at + registro das exclusões)
+SYNC_SCHEMA = f"""
+CREATE INDEX IF NOT EXISTS clientes_updated_at_id_idx ON clientes (updated_at, id);
+
+CREATE TRIGGER IF NOT EXISTS clientes_touch_updated_at
+AFTER UPDATE ON clientes FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE clientes SET updated_at = {_NOW} WHERE id = NEW.id;
+END;
+
+CREATE TABLE IF NOT EXISTS clientes_excluidos (
+    id INTEGER PRIMARY KEY,
+    deleted_at TEXT NOT NULL DEFAULT {_NOW}
+);
+CREATE INDEX IF NOT EXISTS clientes_excluidos_deleted_at_idx ON clientes_excluidos (deleted_at, id);
+
+CREATE TRIGGER IF NOT EXISTS clientes_record_deletion
+AFTER DELETE ON clientes FOR EACH ROW
+BEGIN
+    INSERT OR REPLACE INTO clientes_excluidos (id, deleted_at) VALUES (OLD.id, {_NOW});
+END;
+"""
+
+_OPERATORS = {'eq': '=', 'neq': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+
+class PostgrestError(Exception):
+    """Erro no formato do PostgREST (status HTTP + corpo JSON)"""
+
+    def __init__(self, status: int, code: str, message: str, details: str = None, hint: str = None):
+        super().__init__(message)
+        self.status = status
+        self.body = {'code': code, 'message': message, 'details': details, 'hint': hint}
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Divide por vírgulas fora de parênteses e aspas"""
+    parts, depth, current, quoted, escaped = [], 0, [], False, False
+    for char in text:
+        if escaped:
+            current.append(char)
+            escaped = False
+            continue
+        if quoted and char == '\\':
+            current.append(char)
+            escaped = True
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(''.join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append(''.join(current))
+    return parts
+
+
+def _unquote_value(value: str) -> str:
+    if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+        return re.sub(r'\\(.)', r'\1', value[1:-1])
+    return value
+
+
+class SQLiteDatabase:
+    """Banco SQLite que executa requisições no formato do PostgREST"""
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._lock = threading.RLock()
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.executescript(SCHEMA)
+        self._columns: Dict[str, List[str]] = {}
+        self._migrate()
+        self._conn.executescript(SYNC_SCHEMA)
+        self._rpcs: Dict[str, Callable[[Dict[str, Any]], List[Dict[str, Any]]]] = {
+            'insert_client': self._rpc_insert_client,
+            'create_client_with_case': self._rpc_create_client_with_case,
+            'delete_client_if_no_cases': self._rpc_delete_client_if_no_cases,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _migrate(self):
+        """Atualiza bancos criados antes da coluna clientes.updated_at"""
+        if 'updated_at' not in self.columns('clientes'):
+            with self._conn:
+                self._conn.execute('ALTER TABLE clientes ADD COLUMN updated_at TEXT')
+                self._conn.execute('UPDATE clientes SET updated_at = created_at')
+            self._columns.pop('clientes', None)
+
+    # ------------------------------------------------------------------
+    # Metadados e validação
+    # ------------------------------------------------------------------
+
+    def columns(self, table: str) -> List[str]:
+        if table not in self._columns:
+            rows = self._conn.execute(f'PRAGMA table_info({_quote_ident(table)})').fetchall()
+            if not rows:
+                raise PostgrestError(404, '42P01', f'relation "public.{table}" does not exist')
+            self._columns[table] = [row['name'] for row in rows]
+        return self._columns[table]
+
+    def _column(self, table: str, name: str) -> str:
+        name = name.strip()
+        if name.startswith('"') and name.endswith('"'):
+            name = name[1:-1]
+        if name not in self.columns(table):
+            raise PostgrestError(400, '42703', f'column {table}.{name} does not exist')
+        return _quote_ident(name)
+
+    # ------------------------------------------------------------------
+    # Tradução dos parâmetros do PostgREST
+    # ------------------------------------------------------------------
+
+    def _condition(self, table: str, column: str, expression: str) -> Tuple[str, List[Any]]:
+        """Traduz col + 'op.valor' (ex.: 'ilike.*joao*', 'not.is.null') para SQL"""
+        negate = False
+        if expression.startswith('not.'):
+            negate = True
+            expression = expression[4:]
+        op, _, value = expression.partition('.')
+        col = self._column(table, column)
+
+        if op in _OPERATORS:
+            sql, args = f'{col} {_OPERATORS[op]} ?', [_unquote_value(value)]
+        elif op in ('like', 'ilike'):
+            pattern = _unquote_value(value).replace('*', '%')
+            if op == 'ilike':
+                sql, args = f'lower({col}) LIKE lower(?)', [pattern]
+            else:
+                sql, args = f'{col} LIKE ?', [pattern]
+        elif op == 'is':
+            literal = {'null': 'NULL', 'true': '1', 'false': '0'}.get(value.lower())
+            if literal is None:
+                raise PostgrestError(400, 'PGRST100', f'invalid value for is: {value}')
+            sql, args = f'{col} IS {literal}', []
+        elif op == 'in':
+            values = [_unquote_value(v) for v in _split_top_level(value.strip()[1:-1])]
+            sql, args = f"{col} IN ({', '.join('?' for _ in values)})", values
+        else:
+            raise PostgrestError(400, 'PGRST100', f'unsupported operator: {op}')
+
+        return (f'NOT ({sql})' if negate else sql), args
+
+    def _logic(self, table: str, operator: str, body: str) -> Tuple[str, List[Any]]:
+        """Traduz or=(...)/and=(...), com grupos aninhados"""
+        negate = operator.startswith('not.')
+        joiner = ' OR ' if operator.endswith('or') else ' AND '
+        parts, args = [], []
+        for item in _split_top_level(body.strip()[1:-1]):
+            item = item.strip()
+            match = re.match(r'^((?:not\.)?(?:or|and))(\(.*\))$', item, re.S)
+            if match:
+                sql, item_args = self._logic(table, match.group(1), match.group(2))
+            else:
+                column, _, expression = item.partition('.')
+                sql, item_args = self._condition(table, column, expression)
+            parts.append(f'({sql})')
+            args.extend(item_args)
+        sql = joiner.join(parts) or '1'
+        return (f'NOT ({sql})' if negate else sql), args
+
+    def _where(self, table: str, params: List[Tuple[str, str]]) -> Tuple[str, List[Any]]:
+        clauses, args = [], []
+        for key, value in params:
+            if key in ('select', 'order', 'limit', 'offset', 'on_conflict', 'columns'):
+                continue
+            if key in ('or', 'and', 'not.or', 'not.and'):
+                sql, item_args = self._logic(table, key, value)
+            else:
+                sql, item_args = self._condition(table, key, value)
+            clauses.append(f'({sql})')
+            args.extend(item_args)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', args
+
+    def _order(self, table: str, params: List[Tuple[str, str]]) -> str:
+        terms = []
+        for key, value in params:
+            if key != 'order':
+                continue
+            for term in _split_top_level(value):
+                pieces = term.split('.')
+                direction, nulls = 'ASC', ''
+                for modifier in pieces[1:]:
+                    if modifier in ('asc', 'desc'):
+                        direction = modifier.upper()
+                    elif modifier == 'nullsfirst':
+                        nulls = ' NULLS FIRST'
+                    elif modifier == 'nullslast':
+                        nulls = ' NULLS LAST'
+                terms.append(f'{self._column(table, pieces[0])} {direction}{nulls}')
+        return (' ORDER BY ' + ', '.join(terms)) if terms else ''
+
+    def _select_list(self, table: str, select: Optional[str]) -> str:
+        if not select or select.strip() == '*':
+            return '*'
+        columns = []
+        for name in _split_top_level(select):
+            if name.strip() == 'count':
+                columns.append('count(*) AS count')
+            else:
+                columns.append(self._column(table, name))
+        return ', '.join(columns)
+
+    @staticmethod
+    def _param(params: List[Tuple[str, str]], key: str) -> Optional[str]:
+        for k, v in params:
+            if k == key:
+                return v
+        return None
+
+    # ------------------------------------------------------------------
+    # Operações
+    # ------------------------------------------------------------------
+
+    def _rows(self, cursor) -> List[Dict[str, Any]]:
+        return [dict(row) for row in cursor.fetchall()]
+
+    def select(self, table: str, params: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        where, args = self._where(table, params)
+        sql = f'SELECT {self._select_list(table, self._param(params, "select"))} FROM {_quote_ident(table)}{where}'
+        sql += self._order(table, params)
+        limit, offset = self._param(params, 'limit'), self._param(params, 'offset')
+        if limit is not None or offset is not None:
+            sql += f' LIMIT {int(limit) if limit is not None else -1} OFFSET {int(offset or 0)}'
+        return self._rows(self._conn.execute(sql, args))
+
+    def _insert_row(self, table: str, row: Dict[str, Any], on_conflict: Optional[str] = None) -> Dict[str, Any]:
+        columns = [self._column(table, name) for name in row]
+        values = [self._db_value(v) for v in row.values()]
+        if columns:
+            sql = (f'INSERT INTO {_quote_ident(table)} ({", ".join(columns)}) '
+                   f'VALUES ({", ".join("?" for _ in columns)})')
+        else:
+            sql = f'INSERT INTO {_quote_ident(table)} DEFAULT VALUES'
+        if on_conflict:
+            conflict = self._column(table, on_conflict)
+            updates = [f'{col} = excluded.{col}' for col in columns if col != conflict]
+            sql += f' ON CONFLICT ({conflict}) DO ' + (f'UPDATE SET {", ".join(updates)}' if updates else 'NOTHING')
+        sql += ' RETURNING *'
+        rows = self._rows(self._conn.execute(sql, values))
+        return rows[0] if rows else None
+
+    def insert(self, table: str, body: Any, on_conflict: Optional[str] = None) -> List[Dict[str, Any]]:
+        rows = body if isinstance(body, list) else [body]
+        inserted = [self._insert_row(table, row, on_conflict) for row in rows]
+        return [row for row in inserted if row is not None]
+
+    def update(self, table: str, params: List[Tuple[str, str]], body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not body:
+            return []
+        sets = [f'{self._column(table, name)} = ?' for name in body]
+        where, args = self._where(table, params)
+        sql = f'UPDATE {_quote_ident(table)} SET {", ".join(sets)}{where} RETURNING *'
+        return self._rows(self._conn.execute(sql, [self._db_value(v) for v in body.values()] + args))
+
+    def delete(self, table: str, params: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        where, args = self._where(table, params)
+        return self._rows(self._conn.execute(f'DELETE FROM {_quote_ident(table)}{where} RETURNING *', args))
+
+    @staticmethod
+    def _db_value(value: Any) -> Any:
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    # ------------------------------------------------------------------
+    # Funções (equivalentes às de sql/functions.sql)
+    # ------------------------------------------------------------------
+
+    def _rpc_insert_client(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        client = params['p_client']
+        email = (client.get('email') or '').strip().lower()
+        exists = self._conn.execute(
+            'SELECT 1 FROM clientes WHERE lower(trim(email)) = ?', [email]
+        ).fetchone()
+        if exists:
+            raise PostgrestError(409, '23505', 'Email já cadastrado no sistema')
+        return [self._insert_row('clientes', client)]
+
+    def _rpc_create_client_with_case(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        client = self._rpc_insert_client({'p_client': params['p_client']})[0]
+        case = dict(params['p_case'])
+        case['cliente_id'] = client['id']
+        case['nome_cliente'] = case.get('nome_cliente') or client['nome_completo']
+        return [{'cliente': client, 'caso': self._insert_row('casos', case)}]
+
+    def _rpc_delete_client_if_no_cases(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        client_id = params['p_client_id']
+        if not self._conn.execute('SELECT 1 FROM clientes WHERE id = ?', [client_id]).fetchone():
+            return [{'deleted': False, 'client_exists': False, 'case_count': 0}]
+        case_count = self._conn.execute(
+            'SELECT count(*) FROM casos WHERE cliente_id = ?', [client_id]
+        ).fetchone()[0]
+        if case_count:
+            return [{'deleted': False, 'client_exists': True, 'case_count': case_count}]
+        self._conn.execute('DELETE FROM clientes WHERE id = ?', [client_id])
+        return [{'deleted': True, 'client_exists': True, 'case_count': 0}]
+
+    def register_rpc(self, name: str, func: Callable[[Dict[str, Any]], List[Dict[str, Any]]]):
+        """Registra uma função chamável via rpc(name, params)"""
+        self._rpcs[name] = func
+
+    # ------------------------------------------------------------------
+    # Entrada: requisição HTTP do PostgREST
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _integrity_error(error: sqlite3.IntegrityError) -> PostgrestError:
+        message = str(error)
+        match = re.match(r'UNIQUE constraint failed: (\w+)\.(\w+)', message)
+        if match:
+            table, column = match.groups()
+            return PostgrestError(
+                409, '23505',
+                f'duplicate key value violates unique constraint "{table}_{column}_key"',
+                f'Key ({column}) already exists.'
+            )
+        match = re.match(r'NOT NULL constraint failed: (\w+)\.(\w+)', message)
+        if match:
+            table, column = match.groups()
+            return PostgrestError(
+                400, '23502',
+                f'null value in column "{column}" of relation "{table}" violates not-null constraint'
+            )
+        if 'FOREIGN KEY' in message:
+            return PostgrestError(409, '23503', 'violates foreign key constraint "casos_cliente_id_fkey"')
+        return PostgrestError(409, '23000', message)
+
+    def handle(self, method: str, path: str, params: List[Tuple[str, str]],
+               headers: Dict[str, str], body: Any) -> Tuple[int, Any]:
+        """Executa uma requisição e retorna (status HTTP, corpo JSON)"""
+        segments = [unquote(s) for s in path.split('/') if s]
+        if segments[:2] == ['rest', 'v1']:
+            segments = segments[2:]
+        prefer = headers.get('prefer', '')
+
+        with self._lock:
+            try:
+                with self._conn:
+                    if segments and segments[0] == 'rpc':
+                        func = self._rpcs.get(segments[1])
+                        if func is None:
+                            raise PostgrestError(404, 'PGRST202', f'Could not find the function public.{segments[1]}')
+                        return 200, func(body or {})
+
+                    table = segments[0]
+                    if method == 'GET':
+                        return 200, self.select(table, params)
+                    if method == 'POST':
+                        on_conflict = None
+                        if 'resolution=merge-duplicates' in prefer:
+                            on_conflict = self._param(params, 'on_conflict') or 'id'
+                        return 201, self.insert(table, body, on_conflict)
+                    if method == 'PATCH':
+                        return 200, self.update(table, params, body)
+                    if method == 'DELETE':
+                        return 200, self.delete(table, params)
+                    raise PostgrestError(405, 'PGRST117', f'Unsupported HTTP method: {method}')
+            except PostgrestError as e:
+                return e.status, e.body
+            except sqlite3.IntegrityError as e:
+                error = self._integrity_error(e)
+                return error.status, error.body
+            except sqlite3.Error as e:
+                return 400, {'code': 'XX000', 'message': str(e), 'details': None, 'hint': None}
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        content = request.read()
+        body = json.loads(content) if content else None
+        headers = {k.lower(): v for k, v in request.headers.items()}
+        status, data = self.handle(
+            request.method,
+            request.url.path,
+            list(request.url.params.multi_items()),
+            headers,
+            body
+        )
+        return httpx.Response(status, json=data, request=request)
+
+
+class SQLiteTransport(httpx.BaseTransport):
+    """Transport do httpx que atende as requisições no SQLiteDatabase"""
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self.database.handle_request(request)
+
+
+class AsyncSQLiteTransport(httpx.AsyncBaseTransport):
+    """Versão assíncrona: cada requisição roda numa thread, sem bloquear o loop"""
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return await asyncio.to_thread(self.database.handle_request, request)
+
+
+def create_sqlite_client(database: SQLiteDatabase) -> SyncPostgrestClient:
+    """Cliente PostgREST (table/rpc) servido pelo banco SQLite"""
+    client = SyncPostgrestClient(BASE_URL)
+    old_session = client.session
+    client.session = SyncClient(
+        base_url=BASE_URL,
+        headers=old_session.headers,
+        transport=SQLiteTransport(database)
+    )
+    old_session.close()
+    return client
+
+
+def create_async_sqlite_client(database: SQLiteDatabase) -> AsyncPostgrestClient:
+    """Cliente PostgREST assíncrono servido pelo banco SQLite"""
+    client = AsyncPostgrestClient(BASE_URL)
+    client.session = AsyncClient(
+        base_url=BASE_URL,
+        headers=client.session.headers,
+        transport=AsyncSQLiteTransport(database)
+    )
+    return client
+
+
+_databases: Dict[str, SQLiteDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def get_sqlite_database(path: str) -> SQLiteDatabase:
+    """Banco SQLite compartilhado pelo processo para o caminho informado"""
+    with _databases_lock:
+        if path not in _databases:
+            _databases[path] = SQLiteDatabase(path)
+            logger.info("Backend SQLite aberto em %s", path)
+        return _databases[path]
+
+
+# ----------------------------------------------------------------------
+# Dados sintéticos para benchmarks e testes de carga
+# ----------------------------------------------------------------------
+
+_NOMES = ['João', 'Maria', 'José', 'Ana', 'Antônio', 'Francisca', 'Carlos', 'Adriana', 'Paulo',
+          'Juliana', 'Pedro', 'Márcia', 'Lucas', 'Fernanda', 'Luiz', 'Patrícia', 'Marcos', 'Aline',
+          'Luís', 'Sandra', 'Gabriel', 'Camila', 'Rafael', 'Letícia', 'Daniel', 'Beatriz']
+_SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira',
+               'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Araújo', 'Melo',
+               'Barbosa', 'Cardoso', 'Conceição', 'Simões', 'Gonçalves', 'Magalhães']
+_ESTADOS = ['RJ', 'SP', 'MG', 'ES', 'BA', 'PR', 'SC', 'RS', 'DF', 'PE']
+_COMPANHIAS = [
+    ('LATAM Airlines Brasil', '02.012.862/0001-60'),
+    ('Gol Linhas Aéreas', '07.575.651/0001-59'),
+    ('Azul Linhas Aéreas', '09.296.295/0001-60'),
+    ('TAP Air Portugal', '33.136.896/0001-90'),
+    ('American Airlines', '36.212.637/0001-99'),
+    ('Air France', '33.013.988/0001-82'),
+]
+_SECOES = ['deveres_transportador', 'da_inteligencia', 'da_responsabilidade', 'dos_prejuizos']
+
+
+def _format_cpf(number: int) -> str:
+    digits = f'{number:011d}'
+    return f'{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}'
+
+
+def seed_database(database: SQLiteDatabase, clientes: int = 100_000, casos_por_cliente: float = 1.5,
+                  jurisprudencias: int = 200, seed: int = 42, batch_size: int = 10_000):
+    """
+    Popula o banco com dados sintéticos em volume realista
+
+    Args:
+        clientes: Número de clientes
+        casos_por_cliente: Média de casos por cliente
+        jurisprudencias: Número de jurisprudências (com texto de ~2 KB)
+        seed: Semente do gerador, para dados reproduzíveis
+    """
+    rng = random.Random(seed)
+    start = datetime(2022, 1, 1)
+    conn = database._conn
+
+    with database._lock, conn:
+        first_id = (conn.execute('SELECT coalesce(max(id), 0) FROM clientes').fetchone()[0]) + 1
+        for offset in range(0, clientes, batch_size):
+            client_rows, case_rows = [], []
+            for i in range(first_id + offset, first_id + min(offset + batch_size, clientes)):
+                nome = f"{rng.choice(_NOMES)} {rng.choice(_SOBRENOMES)} {rng.choice(_SOBRENOMES)}"
+                created_at = (start + timedelta(minutes=i * 7)).isoformat()
+                client_rows.append((
+                    i, nome, 'Brasileira', rng.choice(['Solteiro(a)', 'Casado(a)', 'Divorciado(a)']),
+                    'Autônomo', f'cliente{i}@example.com', f'(21) 9{i % 100000000:08d}',
+                    f'{rng.randint(1950, 2004)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+                    f'{i:09d}', _format_cpf(i), f'Rua {rng.choice(_SOBRENOMES)}, {rng.randint(1, 999)}',
+                    'Centro', 'Rio de Janeiro', rng.choice(_ESTADOS), f'{rng.randint(20000, 28999)}-000',
+                    f'pasta-{i}', created_at, created_at
+                ))
+                for n in range(int(casos_por_cliente) + (rng.random() < casos_por_cliente % 1)):
+                    case_rows.append((
+                        i, nome, 'Aéreo', rng.choice(['Atraso de voo', 'Cancelamento', 'Extravio de bagagem']),
+                        'Comercial', f'caso-{i}-{n}', f'https://drive.google.com/drive/folders/caso-{i}-{n}',
+                        f'{i:07d}-{n + 1:02d}', created_at
+                    ))
+            conn.executemany(
+                'INSERT INTO clientes (id, nome_completo, nacionalidade, estado_civil, profissao, email, '
+                'celular, data_nascimento, rg, cpf, endereco, bairro, cidade, estado, cep, pasta_drive_id, '
+                'created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                client_rows
+            )
+            conn.executemany(
+                'INSERT INTO casos (cliente_id, nome_cliente, caso, assunto_caso, responsavel_comercial, '
+                'pasta_caso_id, pasta_caso_url, chave_caso, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                case_rows
+            )
+
+        if not conn.execute('SELECT 1 FROM "companhiasAereas" LIMIT 1').fetchone():
+            conn.executemany(
+                'INSERT INTO "companhiasAereas" (nome, cnpj, endereco) VALUES (?, ?, ?)',
+                [(nome, cnpj, 'Endereço da sede') for nome, cnpj in _COMPANHIAS]
+            )
+
+        texto = ' '.join(['O transportador responde objetivamente pelos danos causados ao passageiro.'] * 28)
+        conn.executemany(
+            'INSERT INTO "jurisprudenciaAereo" (nome, texto, secao, "Tribunal") VALUES (?, ?, ?, ?)',
+            [(f'jurisprudencia_{n:04d}', texto, rng.choice(_SECOES), rng.choice(['TJRJ', 'TJSP', 'STJ']))
+             for n in range(jurisprudencias)]
+        )
+
+    logger.info("Banco SQLite populado com %s clientes", clientes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cria e popula um banco SQLite para benchmarks offline")
+    parser.add_argument('path', help="Arquivo do banco SQLite")
+    parser.add_argument('--clientes', type=int, default=100_000)
+    parser.add_argument('--casos-por-cliente', type=float, default=1.5)
+    parser.add_argument('--jurisprudencias', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    database = SQLiteDatabase(args.path)
+    seed_database(database, args.clientes, args.casos_por_cliente, args.jurisprudencias, args.seed)
+    database.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,425 @@
 from supabase import create_client, Client
-from config.settings import SUPABASE_URL, SUPABASE_KEY
-from typing import Dict, Any, List, Optional
+from utils.supabase_pool import get_pool_stats
+from utils.database_backend import get_database_client
+from utils.search_index import TrigramIndex, only_digits
+from utils.bm25_index import BM25Index
+from utils.similarity_index import HashedTfidfIndex
+from utils.date_utils import latest_timestamp, rewind_timestamp
+from utils.metrics import MetricsRegistry, instrument_methods
+from utils.resilience import RetryPolicy, CircuitBreaker, call_with_resilience
+from config.settings import (
+    REFERENCE_CACHE_TTL,
+    REFERENCE_CACHE_MAXSIZE,
+    CLIENT_INDEX_REFRESH_INTERVAL,
+    JURISPRUDENCIA_INDEX_REFRESH_INTERVAL,
+    CLIENT_SYNC_OVERLAP,
+    CLIENT_TOMBSTONE_RETENTION_DAYS,
+    SLOW_QUERY_THRESHOLD_MS,
+    METRICS_RESERVOIR_SIZE,
+    SUPABASE_RETRY_MAX_ATTEMPTS,
+    SUPABASE_RETRY_BASE_DELAY,
+    SUPABASE_RETRY_MAX_DELAY,
+    SUPABASE_CIRCUIT_FAILURE_THRESHOLD,
+    SUPABASE_CIRCUIT_RECOVERY_TIMEOUT
+)
+from typing import Dict, Any, List, Optional, Hashable
+from collections import OrderedDict
 import streamlit as st
 import logging
+import math
+import threading
+import time
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+# Número máximo de linhas enviadas numa única requisição de escrita em lote
+BULK_CHUNK_SIZE = 500
+
+# Tamanho das páginas usadas para carregar o índice de busca de clientes
+CLIENT_INDEX_PAGE_SIZE = 1000
+
+# Campos obrigatórios verificados antes de inserir em cada tabela
+REQUIRED_FIELDS = {
+    'clientes': ['nome_completo', 'email', 'cpf'],
+    'casos': ['cliente_id', 'nome_cliente', 'caso', 'assunto_caso', 'responsavel_comercial'],
+}
+
+# Colunas pelas quais a grade de clientes pode ser ordenada (sem valores nulos)
+CLIENT_SORT_COLUMNS = ['nome_completo', 'created_at', 'id']
+
+# Projeções de colunas: cada tela pede só os campos que usa
+CLIENT_SUMMARY_COLUMNS = 'id,nome_completo,cpf,email'
+CLIENT_DETAIL_COLUMNS = (
+    'id,nome_completo,nacionalidade,estado_civil,profissao,email,celular,'
+    'data_nascimento,rg,cpf,endereco,bairro,cidade,estado,cep,pasta_drive_id,created_at'
+)
+COMPANY_COLUMNS = 'id,nome,cnpj,endereco'
+CASE_COLUMNS = (
+    'id,nome_cliente,caso,assunto_caso,responsavel_comercial,'
+    'pasta_caso_id,pasta_caso_url,created_at,chave_caso'
+)
+# Só o necessário para o seletor de casos; o caso completo é lido ao selecionar
+CASE_SUMMARY_COLUMNS = 'id,chave_caso,assunto_caso'
+CASES_PAGE_SIZE = 20
+# Lista leve para selectboxes; o "texto" (pesado) é buscado por ID quando necessário
+JURISPRUDENCIA_LIST_COLUMNS = 'id,nome,secao,"Tribunal"'
+JURISPRUDENCIA_DETAIL_COLUMNS = 'id,nome,texto,secao,"Tribunal",created_at'
+# Campos da busca textual de jurisprudências e seus pesos
+JURISPRUDENCIA_SEARCH_FIELDS = {'nome': 3.0, 'secao': 2.0, 'Tribunal': 1.5, 'texto': 1.0}
+TRAINING_FACT_COLUMNS = 'id,caso,input,output,created_at'
+
+class TTLCache:
+    """Cache em memória com tempo de expiração e tamanho máximo (LRU)"""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna o valor em cache ou default se ausente/expirado"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def contains(self, key: Hashable) -> bool:
+        """Se a chave está em cache e não expirou (não conta como acerto/falha)"""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[0] >= time.monotonic()
+
+    def set(self, key: Hashable, value: Any):
+        """Armazena o valor, descartando a entrada menos usada se cheio"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, table: str = None):
+        """Remove as entradas de uma tabela (chaves (tabela, ...)) ou todas"""
+        with self._lock:
+            if table is None:
+                self._data.clear()
+                return
+            for key in [k for k in self._data if isinstance(k, tuple) and k[0] == table]:
+                del self._data[key]
+
+def _quote_filter_value(value: Any) -> str:
+    """Coloca o valor entre aspas para uso seguro em filtros lógicos do PostgREST"""
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+def _logic_filter(query, operator: str, filters: str):
+    """Aplica um filtro lógico do PostgREST, ex.: or=(a.eq.1,b.eq.2)
+    
+    O postgrest-py 0.10 não expõe .or_(), então o parâmetro é adicionado direto.
+    """
+    query.params = query.params.add(operator, f'({filters})')
+    return query
+
+def _client_cases_page_query(query, client_id, cursor: Optional[tuple], page_size: int):
+    """
+    Filtros e ordenação de uma página de casos do cliente: chave_caso
+    decrescente (sem chave por último), desempate por id decrescente
+    
+    cursor é (chave_caso, id) da última linha da página anterior.
+    """
+    query = query.eq('cliente_id', client_id)
+    if cursor:
+        last_key, last_id = cursor
+        if last_key is None:
+            query = _logic_filter(query, 'and', f"chave_caso.is.null,id.lt.{last_id}")
+        else:
+            value = _quote_filter_value(last_key)
+            query = _logic_filter(
+                query, 'or',
+                f"chave_caso.lt.{value},and(chave_caso.eq.{value},id.lt.{last_id}),chave_caso.is.null"
+            )
+    # Uma linha a mais indica se existe próxima página
+    return query.order('chave_caso.desc.nullslast,id', desc=True).limit(page_size + 1)
+
+def _cases_page_result(rows: List[Dict[str, Any]], page_size: int) -> Dict[str, Any]:
+    """Monta {'rows', 'next_cursor'} a partir das page_size + 1 linhas lidas"""
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = (rows[-1].get('chave_caso'), rows[-1]['id']) if has_more and rows else None
+    return {'rows': rows, 'next_cursor': next_cursor}
+
+# Cache compartilhado das tabelas de referência, que mudam raramente
+_reference_cache = TTLCache(ttl=REFERENCE_CACHE_TTL, maxsize=REFERENCE_CACHE_MAXSIZE)
+
+# Métricas por método do SupabaseManager (chamadas, latência, linhas, bytes)
+_metrics = MetricsRegistry(slow_threshold_ms=SLOW_QUERY_THRESHOLD_MS, reservoir_size=METRICS_RESERVOIR_SIZE)
+
+# Novas tentativas em falhas transitórias e disjuntor compartilhado pelo processo
+_retry_policy = RetryPolicy(
+    max_attempts=SUPABASE_RETRY_MAX_ATTEMPTS,
+    base_delay=SUPABASE_RETRY_BASE_DELAY,
+    max_delay=SUPABASE_RETRY_MAX_DELAY
+)
+_circuit_breaker = CircuitBreaker(
+    failure_threshold=SUPABASE_CIRCUIT_FAILURE_THRESHOLD,
+    recovery_timeout=SUPABASE_CIRCUIT_RECOVERY_TIMEOUT
+)
+
+# Índice de busca de clientes do processo (nome, CPF e email)
+_client_index = TrigramIndex()
+_client_index_lock = threading.Lock()
+_client_index_state = {'loaded': False, 'refreshed_at': 0.0, 'synced_at': 0.0,
+                       'watermark': None, 'deleted_watermark': None}
+
+# Índice de busca textual (BM25) das jurisprudências do processo
+_jurisprudencia_index = BM25Index(JURISPRUDENCIA_SEARCH_FIELDS)
+_jurisprudencia_index_lock = threading.Lock()
+_jurisprudencia_index_state = {'loaded': False, 'loaded_at': 0.0}
+
+# Matriz TF-IDF das jurisprudências para sugerir as mais parecidas com os
+# fatos; refeita quando a lista em cache muda (escrita ou expiração)
+_jurisprudencia_vectors = {'rows': None, 'index': None}
+_jurisprudencia_vectors_lock = threading.Lock()
+
+@instrument_methods(_metrics)
 class SupabaseManager:
     def __init__(self):
-        self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        # Cliente compartilhado pelo processo (Supabase com conexões keep-alive,
+        # ou SQLite local, conforme DATABASE_BACKEND)
+        self.supabase: Client = get_database_client()
+
+    @staticmethod
+    def get_pool_stats() -> Dict[str, Any]:
+        """Retorna os contadores do pool de conexões (tamanho, reuso e latência)"""
+        return get_pool_stats()
+
+    @staticmethod
+    def _execute(query, idempotent: bool = True):
+        """
+        Executa a consulta com novas tentativas e disjuntor (utils/resilience.py)
+        
+        Args:
+            query: Consulta montada (table(...)... ou rpc(...)), ainda não executada
+            idempotent: False para inserts e RPCs que criam registros; nesse
+                caso só repete quando é certo que nada foi gravado
+        """
+        return call_with_resilience(query.execute, _retry_policy, _circuit_breaker, idempotent=idempotent)
+
+    @staticmethod
+    def get_circuit_state() -> str:
+        """Estado do disjuntor do banco: closed, open ou half_open"""
+        return _circuit_breaker.state
+
+    @staticmethod
+    def get_metrics() -> Dict[str, Dict[str, Any]]:
+        """Métricas por método: chamadas, erros, p50/p95/p99 (ms), linhas e bytes"""
+        return _metrics.snapshot()
+
+    @staticmethod
+    def export_metrics(path: str = None) -> str:
+        """Exporta as métricas em JSON (e grava em path, se informado)"""
+        return _metrics.export(path)
+
+    @staticmethod
+    def reset_metrics():
+        """Zera as métricas dos métodos"""
+        _metrics.reset()
+
+    @staticmethod
+    def invalidate_reference_cache(table: str = None):
+        """Descarta o cache das tabelas de referência (todas, se table=None)"""
+        _reference_cache.invalidate(table)
+
+    def _fetch_changed_rows(self, table: str, columns: str, ts_column: str,
+                            since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Busca as linhas com ts_column >= since, em páginas por (ts_column, id)
+        
+        columns deve incluir id e ts_column, usados como cursor das páginas.
+        """
+        rows = []
+        cursor = None
+        while True:
+            query = self.supabase.table(table).select(columns)
+            if cursor:
+                value = _quote_filter_value(cursor[0])
+                query = _logic_filter(
+                    query, 'or',
+                    f"{ts_column}.gt.{value},and({ts_column}.eq.{value},id.gt.{cursor[1]})"
+                )
+            elif since:
+                query = query.gte(ts_column, since)
+            page = self._execute(query.order(f"{ts_column},id").limit(CLIENT_INDEX_PAGE_SIZE)).data
+            rows.extend(page)
+            if len(page) < CLIENT_INDEX_PAGE_SIZE:
+                return rows
+            cursor = (page[-1][ts_column], page[-1]['id'])
+
+    def get_client_changes(self, since: Optional[str] = None, deleted_since: Optional[str] = None,
+                           columns: str = CLIENT_SUMMARY_COLUMNS) -> Dict[str, Any]:
+        """
+        Busca os clientes alterados e excluídos desde as marcas d'água informadas
+        
+        Usa clientes.updated_at e a tabela clientes_excluidos (sql/client_sync.sql).
+        Relê os últimos CLIENT_SYNC_OVERLAP segundos antes de cada marca, para
+        não perder transações que terminaram fora de ordem; reaplicar uma linha
+        já vista não tem efeito.
+        
+        Args:
+            since: Marca d'água das alterações (None = carga completa)
+            deleted_since: Marca d'água das exclusões (padrão: since)
+            columns: Colunas a retornar (id e updated_at são sempre incluídas)
+        
+        Returns:
+            {'rows': clientes novos/alterados, 'deleted_ids': IDs excluídos,
+            'watermark': ..., 'deleted_watermark': ..., 'full': carga completa}
+        """
+        if columns != '*':
+            columns = ','.join(dict.fromkeys(['id', *columns.split(','), 'updated_at']))
+        
+        try:
+            rows = self._fetch_changed_rows(
+                'clientes', columns, 'updated_at',
+                rewind_timestamp(since, CLIENT_SYNC_OVERLAP) if since else None
+            )
+            # As linhas vêm em ordem de (updated_at, id): a última tem o maior horário
+            watermark = latest_timestamp(since, [rows[-1]['updated_at']] if rows else [])
+            
+            deleted_ids = []
+            if since is None:
+                # Carga completa: as exclusões anteriores já não aparecem em rows
+                deleted_watermark = watermark
+            else:
+                deleted_since = deleted_since or since
+                tombstones = self._fetch_changed_rows(
+                    'clientes_excluidos', 'id,deleted_at', 'deleted_at',
+                    rewind_timestamp(deleted_since, CLIENT_SYNC_OVERLAP)
+                )
+                deleted_ids = [row['id'] for row in tombstones]
+                deleted_watermark = latest_timestamp(
+                    deleted_since, [tombstones[-1]['deleted_at']] if tombstones else []
+                )
+            
+            return {
+                'rows': rows,
+                'deleted_ids': deleted_ids,
+                'watermark': watermark,
+                'deleted_watermark': deleted_watermark,
+                'full': since is None
+            }
+        except Exception as e:
+            logger.error("Erro ao buscar alterações de clientes: %s", e)
+            raise Exception(f"Erro ao buscar alterações de clientes: {str(e)}")
+
+    @staticmethod
+    def _tombstones_expired(synced_at: Optional[float]) -> bool:
+        """True se a última sincronização é mais antiga que a retenção das exclusões"""
+        return bool(synced_at) and time.time() - synced_at > CLIENT_TOMBSTONE_RETENTION_DAYS * 86400
+
+    def _get_client_index(self) -> TrigramIndex:
+        """
+        Retorna o índice de busca de clientes, carregando-o na primeira chamada
+        
+        Depois da carga inicial, no máximo a cada CLIENT_INDEX_REFRESH_INTERVAL
+        segundos aplica só os clientes criados, alterados ou excluídos desde a
+        última sincronização (get_client_changes).
+        Alterações feitas por este processo já são aplicadas na hora.
+        """
+        now = time.monotonic()
+        if _client_index_state['loaded'] and now - _client_index_state['refreshed_at'] < CLIENT_INDEX_REFRESH_INTERVAL:
+            return _client_index
+        
+        with _client_index_lock:
+            state = _client_index_state
+            if state['loaded'] and self._tombstones_expired(state['synced_at']):
+                state['loaded'] = False
+            
+            if not state['loaded']:
+                changes = self.get_client_changes()
+                _client_index.clear()
+                _client_index.add_many(self._summary(row) for row in changes['rows'])
+                state['loaded'] = True
+                logger.info("Índice de busca de clientes carregado com %s clientes", len(changes['rows']))
+            elif now - state['refreshed_at'] >= CLIENT_INDEX_REFRESH_INTERVAL:
+                changes = self.get_client_changes(state['watermark'], state['deleted_watermark'])
+                _client_index.add_many(self._summary(row) for row in changes['rows'])
+                for client_id in changes['deleted_ids']:
+                    _client_index.remove(client_id)
+            else:
+                return _client_index
+            
+            state['watermark'] = changes['watermark']
+            state['deleted_watermark'] = changes['deleted_watermark']
+            state['synced_at'] = time.time()
+            state['refreshed_at'] = time.monotonic()
+        return _client_index
+
+    @staticmethod
+    def _summary(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Projeta uma linha de clientes nas colunas do índice de busca"""
+        return {column: row.get(column) for column in CLIENT_SUMMARY_COLUMNS.split(',')}
+
+    @staticmethod
+    def _sync_client_index(row: Optional[Dict[str, Any]] = None, removed_id: Any = None):
+        """Aplica no índice de busca uma escrita local na tabela clientes"""
+        if not _client_index_state['loaded']:
+            return
+        if removed_id is not None:
+            _client_index.remove(removed_id)
+        if row and row.get('id') is not None:
+            _client_index.add(SupabaseManager._summary(row))
+
+    @staticmethod
+    def reset_client_index():
+        """Descarta o índice de busca; a próxima busca o recarrega do banco"""
+        with _client_index_lock:
+            _client_index.clear()
+            _client_index_state.update({
+                'loaded': False, 'refreshed_at': 0.0, 'synced_at': 0.0,
+                'watermark': None, 'deleted_watermark': None
+            })
+
+    @staticmethod
+    def _cached(key: tuple, fetch):
+        """
+        Valor compartilhado em cache (não deve ser alterado); só chama fetch()
+        quando a chave não está em cache
+        
+        O objeto só muda quando a chave é buscada de novo (expiração ou
+        escrita na tabela), então serve para saber se dados derivados dele
+        ainda valem.
+        """
+        data = _reference_cache.get(key, _MISSING)
+        if data is _MISSING:
+            data = fetch()
+            _reference_cache.set(key, data)
+        return data
+
+    def _cached_select(self, key: tuple, fetch):
+        """Leitura via cache: só chama fetch() quando a chave não está em cache"""
+        # Cópia rasa para que quem chama não altere a lista em cache
+        return list(self._cached(key, fetch))
     
     def check_email_exists(self, email: str) -> bool:
         """Verifica se o email já existe no banco"""
         try:
-            response = self.supabase.table('clientes')\
+            response = self._execute(self.supabase.table('clientes')\
                 .select('email')\
-                .eq('email', email)\
-                .execute()
+                .eq('email', email))
             return len(response.data) > 0
         except Exception as e:
             raise Exception(f"Erro ao verificar email: {str(e)}")
@@ -25,69 +427,145 @@ class SupabaseManager:
     def insert_client_data(self, table: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Insere dados na tabela especificada"""
         try:
-            # Log dos dados que estão sendo inseridos
-            logger.info(f"Tentando inserir dados na tabela {table}: {data}")
-            
-            # Verifica se é a tabela de clientes
-            if table == 'clientes':
-                # Verifica se o email já existe
-                if self.check_email_exists(data['email']):
-                    raise Exception("Email já cadastrado no sistema")
-                
-                # Verifica campos obrigatórios para clientes
-                required_fields = ['nome_completo', 'email', 'cpf']
-                for field in required_fields:
-                    if not data.get(field):
-                        raise Exception(f"Campo obrigatório não preenchido: {field}")
+            # Só os campos (sem os valores: são dados pessoais e o log fica em disco)
+            logger.debug("Inserindo na tabela %s os campos %s", table, sorted(data))
             
-            # Verifica se é a tabela de casos
-            elif table == 'casos':
-                # Verifica campos obrigatórios para casos
-                required_fields = ['cliente_id', 'nome_cliente', 'caso', 'assunto_caso', 'responsavel_comercial']
-                for field in required_fields:
-                    if not data.get(field):
-                        raise Exception(f"Campo obrigatório não preenchido: {field}")
+            # Verifica campos obrigatórios (clientes e casos)
+            self._check_required_fields(table, data)
             
             # Tenta inserir os dados
             try:
-                response = self.supabase.table(table)\
-                    .insert(data)\
-                    .execute()
+                if table == 'clientes':
+                    # Verificação de email e inserção numa única transação (sql/functions.sql)
+                    response = self._execute(self.supabase.rpc('insert_client', {'p_client': data}), idempotent=False)
+                else:
+                    response = self._execute(self.supabase.table(table)\
+                        .insert(data), idempotent=False)
+                row = response.data[0] if response.data else None
                 
-                if not response.data or len(response.data) == 0:
+                if not row:
                     raise Exception("Nenhum dado retornado após inserção")
                     
-                logger.info(f"Dados inseridos com sucesso na tabela {table}")
-                return response.data[0]
+                logger.info("Dados inseridos com sucesso na tabela %s", table)
+                _reference_cache.invalidate(table)
+                if table == 'clientes':
+                    self._sync_client_index(row)
+                return row
                 
             except Exception as e:
-                # Tenta obter mais detalhes do erro
-                error_details = str(e)
-                if hasattr(e, 'code'):
-                    error_details += f" (Code: {e.code})"
-                if hasattr(e, 'details'):
-                    error_details += f" (Details: {e.details})"
-                    
-                logger.error(f"Erro na inserção no Supabase: {error_details}")
+                error_details = self._error_details(e)
+                logger.error("Erro na inserção no Supabase: %s", error_details)
                 raise Exception(f"Erro na inserção: {error_details}")
                 
         except Exception as e:
-            logger.error(f"Erro ao inserir dados na tabela {table}: {str(e)}")
-            logger.error(f"Dados que tentaram ser inseridos: {data}")
+            logger.error("Erro ao inserir dados na tabela %s (campos %s): %s", table, sorted(data), e)
             raise Exception(f"Erro ao inserir dados: {str(e)}")
     
+    @staticmethod
+    def _check_required_fields(table: str, data: Dict[str, Any]):
+        """Levanta exceção se faltar algum campo obrigatório da tabela"""
+        for field in REQUIRED_FIELDS.get(table, []):
+            if not data.get(field):
+                raise Exception(f"Campo obrigatório não preenchido: {field}")
+
+    @staticmethod
+    def _error_details(e: Exception) -> str:
+        """Mensagem do erro com código e detalhes do PostgREST, se houver"""
+        error_details = str(e)
+        if hasattr(e, 'code'):
+            error_details += f" (Code: {e.code})"
+        if hasattr(e, 'details'):
+            error_details += f" (Details: {e.details})"
+        return error_details
+
+    def create_client_with_case(self, client_data: Dict[str, Any], case_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cadastra um cliente novo e seu primeiro caso numa única transação
+        
+        Chama a função create_client_with_case (sql/functions.sql): verifica o
+        email, insere o cliente e insere o caso com o cliente_id gerado. Se
+        qualquer passo falhar, nada é gravado.
+        
+        Args:
+            client_data: Dados do cliente
+            case_data: Dados do caso (cliente_id e nome_cliente são preenchidos
+                a partir do cliente criado)
+        
+        Returns:
+            {'cliente': linha do cliente, 'caso': linha do caso}
+        """
+        try:
+            self._check_required_fields('clientes', client_data)
+            # cliente_id e nome_cliente vêm do cliente criado na própria transação
+            for field in REQUIRED_FIELDS['casos']:
+                if field not in ('cliente_id', 'nome_cliente') and not case_data.get(field):
+                    raise Exception(f"Campo obrigatório não preenchido: {field}")
+            
+            try:
+                response = self._execute(self.supabase.rpc(
+                    'create_client_with_case',
+                    {'p_client': client_data, 'p_case': case_data}
+                ), idempotent=False)
+            except Exception as e:
+                error_details = self._error_details(e)
+                logger.error("Erro no cadastro de cliente e caso no Supabase: %s", error_details)
+                raise Exception(f"Erro na inserção: {error_details}")
+            
+            result = response.data[0] if response.data else None
+            if not result or not result.get('cliente'):
+                raise Exception("Nenhum dado retornado após inserção")
+            
+            logger.info("Cliente %s e caso cadastrados com sucesso", result['cliente'].get('id'))
+            _reference_cache.invalidate('clientes')
+            _reference_cache.invalidate('casos')
+            self._sync_client_index(result['cliente'])
+            return result
+        except Exception as e:
+            logger.error("Erro ao cadastrar cliente e caso: %s", e)
+            raise Exception(f"Erro ao cadastrar cliente e caso: {str(e)}")
+
+    def delete_client_if_no_cases(self, client_id) -> Dict[str, Any]:
+        """
+        Exclui o cliente somente se ele não tiver casos associados
+        
+        A contagem de casos e a exclusão acontecem na mesma transação
+        (sql/functions.sql), sem janela para um caso ser criado no meio.
+        
+        Args:
+            client_id: ID do cliente
+        
+        Returns:
+            {'deleted': bool, 'client_exists': bool, 'case_count': int}
+        """
+        try:
+            response = self._execute(self.supabase.rpc(
+                'delete_client_if_no_cases',
+                {'p_client_id': client_id}
+            ), idempotent=False)
+            result = response.data[0]
+            if result.get('deleted'):
+                _reference_cache.invalidate('clientes')
+                self._sync_client_index(removed_id=client_id)
+            return result
+        except Exception as e:
+            logger.error("Erro ao excluir cliente: %s", e)
+            raise Exception(f"Erro ao excluir cliente: {str(e)}")
+
     def update_client_data(self, table: str, id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Atualiza dados do cliente na tabela especificada"""
         try:
-            response = self.supabase.table(table).update(data).eq('id', id).execute()
+            response = self._execute(self.supabase.table(table).update(data).eq('id', id))
+            _reference_cache.invalidate(table)
+            if table == 'clientes':
+                self._sync_client_index(response.data[0])
             return response.data[0]
         except Exception as e:
             raise Exception(f"Erro ao atualizar dados: {str(e)}")
     
-    def get_client_data(self, table: str, id: int) -> Dict[str, Any]:
+    def get_client_data(self, table: str, id: int, columns: str = '*') -> Dict[str, Any]:
         """Recupera dados do cliente da tabela especificada"""
         try:
-            response = self.supabase.table(table).select("*").eq('id', id).execute()
+            response = self._execute(self.supabase.table(table).select(columns).eq('id', id))
             return response.data[0] if response.data else None
         except Exception as e:
             raise Exception(f"Erro ao recuperar dados: {str(e)}")
@@ -95,93 +573,289 @@ class SupabaseManager:
     def delete_client_data(self, table: str, id: int) -> bool:
         """Deleta dados do cliente da tabela especificada"""
         try:
-            self.supabase.table(table).delete().eq('id', id).execute()
+            self._execute(self.supabase.table(table).delete().eq('id', id))
+            _reference_cache.invalidate(table)
+            if table == 'clientes':
+                self._sync_client_index(removed_id=id)
             return True
         except Exception as e:
             raise Exception(f"Erro ao deletar dados: {str(e)}")
 
-    def search_clients(self, search_term: str = None, limit: int = 10):
+    @staticmethod
+    def _json_safe(value: Any) -> Any:
+        """Converte valores vindos do pandas (NaN, escalares numpy) para tipos JSON"""
+        if hasattr(value, 'item') and not isinstance(value, (list, dict, str)):
+            value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return value
+
+    def _write_many(self, table: str, rows: List[Dict[str, Any]], chunk_size: int,
+                    build_query, idempotent: bool = True) -> List[Dict[str, Any]]:
+        """
+        Envia as linhas em blocos de até chunk_size, um bloco por requisição
+        
+        build_query(payload) monta a escrita de um bloco (lista) ou de uma linha
+        (dict). Se um bloco for rejeitado, suas linhas são reenviadas uma a uma
+        para identificar exatamente quais falharam. As linhas devolvidas são
+        associadas às enviadas pela posição.
+        """
+        rows = [{k: self._json_safe(v) for k, v in row.items()} for row in rows]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+        
+        # O PostgREST exige que todas as linhas de um lote tenham as mesmas colunas
+        groups: Dict[tuple, List[int]] = {}
+        for index, row in enumerate(rows):
+            groups.setdefault(tuple(sorted(row.keys())), []).append(index)
+        
+        for indexes in groups.values():
+            for start in range(0, len(indexes), chunk_size):
+                chunk = indexes[start:start + chunk_size]
+                payload = [rows[i] for i in chunk]
+                try:
+                    response = self._execute(build_query(payload), idempotent=idempotent)
+                    returned = response.data or []
+                    for position, i in enumerate(chunk):
+                        data = returned[position] if position < len(returned) else None
+                        results[i] = {'row': rows[i], 'ok': True, 'data': data, 'error': None}
+                except Exception as e:
+                    logger.warning("Lote rejeitado na tabela %s, reenviando linha a linha: %s", table, e)
+                    for i in chunk:
+                        try:
+                            response = self._execute(build_query(rows[i]), idempotent=idempotent)
+                            data = response.data[0] if response.data else None
+                            results[i] = {'row': rows[i], 'ok': True, 'data': data, 'error': None}
+                        except Exception as row_error:
+                            results[i] = {'row': rows[i], 'ok': False, 'data': None, 'error': str(row_error)}
+        
+        _reference_cache.invalidate(table)
+        if table == 'clientes':
+            for result in results:
+                if result['ok']:
+                    self._sync_client_index(result['data'] or result['row'])
+        elif table == 'jurisprudenciaAereo':
+            for result in results:
+                if result['ok']:
+                    self._sync_jurisprudencia_index(result['data'] or result['row'])
+        return results
+
+    def insert_many(self, table: str, rows: List[Dict[str, Any]],
+                    chunk_size: int = BULK_CHUNK_SIZE) -> List[Dict[str, Any]]:
+        """
+        Insere várias linhas novas em lote
+        
+        As linhas são enviadas em blocos de até chunk_size, um bloco por
+        requisição. Se um bloco for rejeitado, suas linhas são reenviadas uma a
+        uma para identificar exatamente quais falharam.
+        
+        Diferente de insert_client_data, não passa pela função insert_client:
+        a unicidade do email deve ser verificada antes (ver utils/client_importer.py).
+        O CPF continua protegido pela constraint do banco.
+        
+        Returns:
+            Um resultado por linha, na ordem recebida, no formato
+            {'row': linha enviada, 'ok': bool, 'data': linha gravada, 'error': mensagem}
+        """
+        return self._write_many(
+            table, rows, chunk_size,
+            lambda payload: self.supabase.table(table).insert(payload),
+            idempotent=False
+        )
+
+    def get_client_keys(self) -> Dict[str, set]:
+        """CPFs (só dígitos) e emails (minúsculos) de todos os clientes, para deduplicação em lote"""
+        cpfs, emails = set(), set()
+        for row in self.get_client_changes(columns='cpf,email')['rows']:
+            cpf = only_digits(row.get('cpf'))
+            if cpf:
+                cpfs.add(cpf)
+            email = (row.get('email') or '').strip().lower()
+            if email:
+                emails.add(email)
+        return {'cpfs': cpfs, 'emails': emails}
+
+    def update_many(self, table: str, rows: List[Dict[str, Any]],
+                    chunk_size: int = BULK_CHUNK_SIZE) -> List[Dict[str, Any]]:
+        """
+        Atualiza várias linhas existentes, identificadas pelo 'id'
+        
+        Cada linha traz o 'id' e só as colunas alteradas: nenhuma outra coluna
+        é gravada, e nunca se cria registro (UPDATE, não upsert). Linhas com as
+        mesmas alterações vão numa única requisição (update ... id=in.(...)).
+        Se um bloco for rejeitado, suas linhas são reenviadas uma a uma.
+        
+        Returns:
+            Um resultado por linha, no mesmo formato de insert_many; uma linha
+            cujo id não existe mais volta com ok=False
+        """
+        rows = [{k: self._json_safe(v) for k, v in row.items()} for row in rows]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+        
+        # Agrupa as linhas com alterações idênticas (mesmas colunas e valores)
+        groups: Dict[tuple, List[int]] = {}
+        for index, row in enumerate(rows):
+            changes = {k: v for k, v in row.items() if k != 'id'}
+            if row.get('id') is None:
+                results[index] = {'row': row, 'ok': False, 'data': None, 'error': "Linha sem 'id'"}
+            elif not changes:
+                results[index] = {'row': row, 'ok': True, 'data': None, 'error': None}
+            else:
+                groups.setdefault(tuple(sorted((k, repr(v)) for k, v in changes.items())), []).append(index)
+        
+        def apply(indexes: List[int], response_data: List[Dict[str, Any]]):
+            by_id = {r.get('id'): r for r in response_data or []}
+            for i in indexes:
+                data = by_id.get(rows[i]['id'])
+                results[i] = {
+                    'row': rows[i], 'ok': data is not None, 'data': data,
+                    'error': None if data is not None else 'Registro não encontrado'
+                }
+        
+        for indexes in groups.values():
+            changes = {k: v for k, v in rows[indexes[0]].items() if k != 'id'}
+            for start in range(0, len(indexes), chunk_size):
+                chunk = indexes[start:start + chunk_size]
+                try:
+                    query = self.supabase.table(table).update(changes).in_('id', [rows[i]['id'] for i in chunk])
+                    apply(chunk, self._execute(query).data)
+                except Exception as e:
+                    logger.warning("Lote de atualizações rejeitado na tabela %s, reenviando linha a linha: %s", table, e)
+                    for i in chunk:
+                        try:
+                            query = self.supabase.table(table).update(changes).eq('id', rows[i]['id'])
+                            apply([i], self._execute(query).data)
+                        except Exception as row_error:
+                            results[i] = {'row': rows[i], 'ok': False, 'data': None, 'error': str(row_error)}
+        
+        _reference_cache.invalidate(table)
+        if table == 'clientes':
+            for result in results:
+                if result['ok'] and result['data']:
+                    self._sync_client_index(result['data'])
+        elif table == 'jurisprudenciaAereo':
+            for result in results:
+                if result['ok'] and result['data']:
+                    self._sync_jurisprudencia_index(result['data'])
+        return results
+
+    def search_clients(self, search_term: str = None, limit: int = 10,
+                       columns: str = CLIENT_SUMMARY_COLUMNS):
         """
         Busca clientes por nome, email ou CPF
         
         Args:
             search_term: Termo para busca (nome, email ou CPF)
             limit: Número máximo de resultados
+            columns: Colunas a retornar
         
         Returns:
             Lista de clientes encontrados
         """
         try:
-            query = self.supabase.table('clientes').select('*')
+            query = self.supabase.table('clientes').select(columns)
             
             if search_term:
-                search_term = search_term.strip().lower()
-                query = query.or_(
-                    f"nome_completo.ilike.%{search_term}%,"
-                    f"email.ilike.%{search_term}%,"
-                    f"cpf.ilike.%{search_term}%"
+                pattern = _quote_filter_value(f"*{search_term.strip().lower()}*")
+                query = _logic_filter(
+                    query,
+                    'or',
+                    f"nome_completo.ilike.{pattern},"
+                    f"email.ilike.{pattern},"
+                    f"cpf.ilike.{pattern}"
                 )
             
-            response = query.limit(limit).execute()
+            response = self._execute(query.limit(limit))
             return response.data
         except Exception as e:
             raise Exception(f"Erro ao buscar clientes: {str(e)}")
 
-    def get_client_by_name(self, nome_completo: str):
+    def get_client_by_id(self, client_id, columns: str = CLIENT_DETAIL_COLUMNS) -> Optional[Dict[str, Any]]:
+        """
+        Busca os dados completos de um cliente pelo ID
+        
+        Args:
+            client_id: ID do cliente
+            columns: Colunas a retornar
+        
+        Returns:
+            Dados do cliente ou None se não encontrado
+        """
+        try:
+            response = self._execute(self.supabase.table('clientes')\
+                .select(columns)\
+                .eq('id', client_id))
+            return response.data[0] if response.data else None
+        except Exception as e:
+            raise Exception(f"Erro ao buscar cliente por ID: {str(e)}")
+
+    def get_client_by_name(self, nome_completo: str, columns: str = CLIENT_DETAIL_COLUMNS):
         """
         Busca cliente pelo nome completo exato
         
         Args:
             nome_completo: Nome completo do cliente
+            columns: Colunas a retornar
         
         Returns:
             Dados do cliente ou None se não encontrado
         """
         try:
-            response = self.supabase.table('clientes')\
-                .select('*')\
-                .eq('nome_completo', nome_completo)\
-                .execute()
+            response = self._execute(self.supabase.table('clientes')\
+                .select(columns)\
+                .eq('nome_completo', nome_completo))
             return response.data[0] if response.data else None
         except Exception as e:
             raise Exception(f"Erro ao buscar cliente por nome: {str(e)}")
 
-    def search_clients_by_partial_name(self, partial_name: str, limit: int = 10):
+    def search_clients_by_partial_name(self, partial_name: str, limit: int = 10,
+                                       columns: str = CLIENT_SUMMARY_COLUMNS):
         """
         Busca clientes por parte do nome
         
+        Com as colunas de resumo (padrão), a busca é feita no índice local de
+        trigramas: não faz requisição por tecla digitada, ignora acentos
+        ("Joao" encontra "João") e também casa CPF e email. Se o índice não
+        puder ser carregado, ou outras colunas forem pedidas, consulta o banco.
+        
         Args:
             partial_name: Parte do nome para busca
             limit: Número máximo de resultados
+            columns: Colunas a retornar (por padrão só o resumo para a lista
+                de sugestões; use get_client_by_id para os dados completos)
         
         Returns:
-            Lista de clientes encontrados
+            Lista de clientes encontrados, do mais para o menos relevante
         """
+        if columns == CLIENT_SUMMARY_COLUMNS:
+            try:
+                return self._get_client_index().search(partial_name, limit=limit)
+            except Exception as e:
+                logger.warning("Índice de busca indisponível, consultando o banco: %s", e)
+        
         try:
-            response = self.supabase.table('clientes')\
-                .select('*')\
+            response = self._execute(self.supabase.table('clientes')\
+                .select(columns)\
                 .ilike('nome_completo', f'%{partial_name}%')\
-                .limit(limit)\
-                .execute()
+                .limit(limit))
             return response.data
         except Exception as e:
             raise Exception(f"Erro ao buscar clientes por nome parcial: {str(e)}")
 
-    def get_client_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+    def get_client_by_email(self, email: str, columns: str = CLIENT_DETAIL_COLUMNS) -> Optional[Dict[str, Any]]:
         """
         Busca cliente pelo email
         
         Args:
             email: Email do cliente
+            columns: Colunas a retornar
         
         Returns:
             Dados do cliente ou None se não encontrado
         """
         try:
-            response = self.supabase.table('clientes')\
-                .select('*')\
-                .eq('email', email)\
-                .execute()
+            response = self._execute(self.supabase.table('clientes')\
+                .select(columns)\
+                .eq('email', email))
             return response.data[0] if response.data else None
         except Exception as e:
             raise Exception(f"Erro ao buscar cliente por email: {str(e)}")
@@ -189,7 +863,7 @@ class SupabaseManager:
     def check_table_exists(self, table: str) -> bool:
         """Verifica se a tabela existe"""
         try:
-            response = self.supabase.table(table).select('count').limit(1).execute()
+            response = self._execute(self.supabase.table(table).select('count').limit(1))
             return True
         except Exception:
             return False
@@ -197,12 +871,85 @@ class SupabaseManager:
     def get_all_clients(self):
         """Fetch all clients from the database"""
         try:
-            response = self.supabase.table('clientes').select('*').execute()
+            response = self._execute(self.supabase.table('clientes').select('*'))
             return response.data
         except Exception as e:
-            print(f"Error fetching clients: {str(e)}")
+            logger.error("Error fetching clients: %s", e)
             raise e
 
+    def get_clients_page(self, page_size: int = 50, cursor: Optional[tuple] = None,
+                         sort_column: str = 'nome_completo', desc: bool = False,
+                         filter_text: str = None, columns: str = '*') -> Dict[str, Any]:
+        """
+        Busca uma página de clientes usando paginação por chave (keyset)
+        
+        A ordenação é (sort_column, id), e a página seguinte começa logo após o
+        cursor da anterior, sem OFFSET: o custo de cada página independe de
+        quantas vieram antes.
+        
+        Args:
+            page_size: Número de clientes por página
+            cursor: (valor de sort_column, id) da última linha da página anterior
+            sort_column: Coluna de ordenação (uma de CLIENT_SORT_COLUMNS)
+            desc: Ordem decrescente
+            filter_text: Filtro por nome, email ou CPF (aplicado no Supabase)
+            columns: Colunas a retornar
+        
+        Returns:
+            {'rows': clientes da página, 'next_cursor': cursor da próxima
+            página ou None se esta for a última}
+        """
+        if sort_column not in CLIENT_SORT_COLUMNS:
+            raise ValueError(f"Coluna de ordenação inválida: {sort_column}")
+        
+        try:
+            query = self.supabase.table('clientes').select(columns)
+            
+            conditions = []
+            if filter_text:
+                pattern = _quote_filter_value(f"*{filter_text.strip()}*")
+                conditions.append(
+                    f"or(nome_completo.ilike.{pattern},"
+                    f"email.ilike.{pattern},"
+                    f"cpf.ilike.{pattern})"
+                )
+            
+            op = 'lt' if desc else 'gt'
+            if cursor:
+                last_value, last_id = cursor
+                if sort_column == 'id':
+                    conditions.append(f"id.{op}.{last_id}")
+                else:
+                    value = _quote_filter_value(last_value)
+                    conditions.append(
+                        f"or({sort_column}.{op}.{value},"
+                        f"and({sort_column}.eq.{value},id.{op}.{last_id}))"
+                    )
+            
+            if conditions:
+                query = _logic_filter(query, 'and', ",".join(conditions))
+            
+            # O id desempata linhas com o mesmo valor na coluna de ordenação;
+            # as duas colunas vão num único parâmetro order=col[.desc],id[.desc]
+            if sort_column == 'id':
+                query = query.order('id', desc=desc)
+            else:
+                query = query.order(f"{sort_column}{'.desc' if desc else ''},id", desc=desc)
+            
+            # Uma linha a mais indica se existe próxima página
+            rows = self._execute(query.limit(page_size + 1)).data
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            
+            next_cursor = None
+            if has_more and rows:
+                next_cursor = (rows[-1].get(sort_column), rows[-1]['id'])
+            
+            return {'rows': rows, 'next_cursor': next_cursor}
+        except Exception as e:
+            logger.error("Erro ao buscar página de clientes: %s", e)
+            raise Exception(f"Erro ao buscar página de clientes: {str(e)}")
+
     def update_client(self, client_id, data):
         """Update a client in the database
         
@@ -211,10 +958,12 @@ class SupabaseManager:
             data: Dictionary containing the fields to update
         """
         try:
-            response = self.supabase.table('clientes').update(data).eq('id', client_id).execute()
+            response = self._execute(self.supabase.table('clientes').update(data).eq('id', client_id))
+            for row in response.data or []:
+                self._sync_client_index(row)
             return response.data
         except Exception as e:
-            print(f"Error updating client: {str(e)}")
+            logger.error("Error updating client: %s", e)
             raise e
 
     def delete_client(self, client_id):
@@ -224,32 +973,92 @@ class SupabaseManager:
             client_id: The ID of the client to delete
         """
         try:
-            response = self.supabase.table('clientes').delete().eq('id', client_id).execute()
+            response = self._execute(self.supabase.table('clientes').delete().eq('id', client_id))
+            self._sync_client_index(removed_id=client_id)
             return response.data
         except Exception as e:
-            print(f"Error deleting client: {str(e)}")
+            logger.error("Error deleting client: %s", e)
             raise e
 
-    def get_client_cases(self, client_id):
+    def get_client_cases(self, client_id, columns: str = CASE_COLUMNS):
         """Busca todos os casos de um cliente específico"""
         try:
-            response = self.supabase.table('casos')\
-                .select('id, nome_cliente, caso, assunto_caso, responsavel_comercial, pasta_caso_id, pasta_caso_url, created_at, chave_caso')\
+            response = self._execute(self.supabase.table('casos')\
+                .select(columns)\
                 .eq('cliente_id', client_id)\
-                .order('chave_caso', desc=True)\
-                .execute()
+                .order('chave_caso', desc=True))
             return response.data
         except Exception as e:
-            logger.error(f"Erro ao buscar casos do cliente: {str(e)}")
+            logger.error("Erro ao buscar casos do cliente: %s", e)
             return []
 
-    def get_all_companies(self):
-        """Fetch all airline companies from the database"""
+    def get_case_folder_ids(self) -> List[Dict[str, Any]]:
+        """
+        Pastas do Drive de todos os casos ({'id', 'cliente_id', 'assunto_caso', 'pasta_caso_id'})
+
+        Lidas em páginas por ID; usadas para semear o cache local de pastas.
+        """
         try:
-            response = self.supabase.table('companhiasAereas').select('*').execute()
-            return response.data
+            rows = []
+            after_id = None
+            while True:
+                query = self.supabase.table('casos').select('id,cliente_id,assunto_caso,pasta_caso_id')
+                if after_id is not None:
+                    query = query.gt('id', after_id)
+                page = self._execute(query.order('id').limit(CLIENT_INDEX_PAGE_SIZE)).data
+                rows.extend(row for row in page if row.get('pasta_caso_id'))
+                if len(page) < CLIENT_INDEX_PAGE_SIZE:
+                    return rows
+                after_id = page[-1]['id']
+        except Exception as e:
+            logger.error("Erro ao buscar pastas dos casos: %s", e)
+            raise Exception(f"Erro ao buscar pastas dos casos: {str(e)}")
+
+    def get_client_cases_page(self, client_id, cursor: Optional[tuple] = None,
+                              page_size: int = CASES_PAGE_SIZE,
+                              columns: str = CASE_SUMMARY_COLUMNS) -> Dict[str, Any]:
+        """
+        Busca uma página dos casos de um cliente (paginação por chave em chave_caso)
+        
+        Por padrão traz só id, chave e assunto, para o seletor de casos; o caso
+        completo é lido com get_case_by_id depois da seleção.
+        
+        Returns:
+            {'rows': casos da página, 'next_cursor': cursor da próxima página
+            ou None se esta for a última}
+        """
+        try:
+            query = self.supabase.table('casos').select(columns)
+            rows = self._execute(_client_cases_page_query(query, client_id, cursor, page_size)).data
+            return _cases_page_result(rows, page_size)
+        except Exception as e:
+            logger.error("Erro ao buscar casos do cliente: %s", e)
+            raise Exception(f"Erro ao buscar casos do cliente: {str(e)}")
+
+    def get_case_by_id(self, case_id, columns: str = CASE_COLUMNS) -> Optional[Dict[str, Any]]:
+        """Busca os dados completos de um caso pelo ID"""
+        try:
+            response = self._execute(self.supabase.table('casos')\
+                .select(columns)\
+                .eq('id', case_id))
+            return response.data[0] if response.data else None
         except Exception as e:
-            print(f"Error fetching companies: {str(e)}")
+            logger.error("Erro ao buscar caso por ID: %s", e)
+            raise Exception(f"Erro ao buscar caso por ID: {str(e)}")
+
+    def get_all_companies(self, columns: str = COMPANY_COLUMNS):
+        """Fetch all airline companies from the database
+        
+        Args:
+            columns: Columns to fetch
+        """
+        try:
+            return self._cached_select(
+                ('companhiasAereas', 'all', columns),
+                lambda: self._execute(self.supabase.table('companhiasAereas').select(columns)).data
+            )
+        except Exception as e:
+            logger.error("Error fetching companies: %s", e)
             raise e
 
     def add_company(self, company_data):
@@ -259,10 +1068,11 @@ class SupabaseManager:
             company_data: Dictionary containing the company data
         """
         try:
-            response = self.supabase.table('companhiasAereas').insert(company_data).execute()
+            response = self._execute(self.supabase.table('companhiasAereas').insert(company_data), idempotent=False)
+            _reference_cache.invalidate('companhiasAereas')
             return response.data
         except Exception as e:
-            print(f"Error adding company: {str(e)}")
+            logger.error("Error adding company: %s", e)
             raise e
 
     def update_company(self, company_id, data):
@@ -273,10 +1083,11 @@ class SupabaseManager:
             data: Dictionary containing the fields to update
         """
         try:
-            response = self.supabase.table('companhiasAereas').update(data).eq('id', company_id).execute()
+            response = self._execute(self.supabase.table('companhiasAereas').update(data).eq('id', company_id))
+            _reference_cache.invalidate('companhiasAereas')
             return response.data
         except Exception as e:
-            print(f"Error updating company: {str(e)}")
+            logger.error("Error updating company: %s", e)
             raise e
 
     def delete_company(self, company_id):
@@ -286,10 +1097,11 @@ class SupabaseManager:
             company_id: The ID of the company to delete
         """
         try:
-            response = self.supabase.table('companhiasAereas').delete().eq('id', company_id).execute()
+            response = self._execute(self.supabase.table('companhiasAereas').delete().eq('id', company_id))
+            _reference_cache.invalidate('companhiasAereas')
             return response.data
         except Exception as e:
-            print(f"Error deleting company: {str(e)}")
+            logger.error("Error deleting company: %s", e)
             raise e
 
     def save_facts_for_training(self, caso: str, input_text: str, output_text: str):
@@ -302,33 +1114,60 @@ class SupabaseManager:
                 'created_at': datetime.now().isoformat()
             }
             
-            response = self.supabase.table('fatosGPT').insert(data).execute()
+            response = self._execute(self.supabase.table('fatosGPT').insert(data), idempotent=False)
             return response.data
         except Exception as e:
-            logger.error(f"Erro ao salvar fatos para treinamento: {str(e)}")
+            logger.error("Erro ao salvar fatos para treinamento: %s", e)
             raise Exception(f"Erro ao salvar para treinamento: {str(e)}")
 
-    def get_all_jurisprudencias(self):
-        """Busca todas as jurisprudências do banco de dados"""
+    def get_training_facts_page(self, after_id=None, limit: int = 1000, caso: str = None,
+                                start: str = None, end: str = None,
+                                columns: str = TRAINING_FACT_COLUMNS) -> List[Dict[str, Any]]:
+        """
+        Busca uma página de fatosGPT em ordem de ID (paginação por chave)
+        
+        Args:
+            after_id: Último ID da página anterior (None = desde o início)
+            limit: Número máximo de linhas
+            caso: Filtra pelo tipo de caso
+            start: created_at a partir desta data/hora (inclusive, ISO 8601)
+            end: created_at antes desta data/hora (exclusive, ISO 8601)
+        """
         try:
-            print("Tentando buscar jurisprudências...")  # Debug
-            response = self.supabase.table('jurisprudenciaAereo').select('id, nome, texto, secao, "Tribunal", created_at').order('created_at', desc=True).execute()
-            
-            if not response:
-                print("Resposta vazia do Supabase")  # Debug
-                return []
-                
-            print(f"Dados recebidos: {response.data}")  # Debug
+            query = self.supabase.table('fatosGPT').select(columns)
+            if after_id is not None:
+                query = query.gt('id', after_id)
+            if caso:
+                query = query.eq('caso', caso)
+            if start:
+                query = query.gte('created_at', start)
+            if end:
+                query = query.lt('created_at', end)
+            return self._execute(query.order('id').limit(limit)).data
+        except Exception as e:
+            logger.error("Erro ao buscar fatos para treinamento: %s", e)
+            raise Exception(f"Erro ao buscar fatos para treinamento: {str(e)}")
+
+    def _all_jurisprudencias(self) -> List[Dict[str, Any]]:
+        """Lista de jurisprudências em cache, compartilhada (não alterar)"""
+        def fetch():
+            response = self._execute(self.supabase.table('jurisprudenciaAereo').select('id, nome, texto, secao, "Tribunal", created_at').order('created_at', desc=True))
             
-            if not response.data:
-                print("response.data está vazio")  # Debug
+            if not response or not response.data:
+                logger.debug("Nenhuma jurisprudência retornada pelo Supabase")
                 return []
                 
+            logger.debug("%s jurisprudências recebidas", len(response.data))
             return response.data
-            
+        
+        return self._cached(('jurisprudenciaAereo', 'all_by_created_at'), fetch)
+
+    def get_all_jurisprudencias(self):
+        """Busca todas as jurisprudências do banco de dados"""
+        try:
+            return list(self._all_jurisprudencias())
         except Exception as e:
-            print(f"Erro detalhado ao buscar jurisprudências: {str(e)}")  # Debug
-            logger.error(f"Erro ao buscar jurisprudências: {str(e)}")
+            logger.error("Erro ao buscar jurisprudências: %s", e)
             raise e
 
     def add_jurisprudencia(self, jurisprudencia_data):
@@ -342,10 +1181,13 @@ class SupabaseManager:
             if 'Tribunal' not in jurisprudencia_data:
                 jurisprudencia_data['Tribunal'] = ''  # ou outro valor padrão
             
-            response = self.supabase.table('jurisprudenciaAereo').insert(jurisprudencia_data).execute()
+            response = self._execute(self.supabase.table('jurisprudenciaAereo').insert(jurisprudencia_data), idempotent=False)
+            _reference_cache.invalidate('jurisprudenciaAereo')
+            for row in response.data or []:
+                self._sync_jurisprudencia_index(row)
             return response.data
         except Exception as e:
-            print(f"Erro ao adicionar jurisprudência: {str(e)}")
+            logger.error("Erro ao adicionar jurisprudência: %s", e)
             raise e
 
     def update_jurisprudencia(self, jurisprudencia_id, data):
@@ -356,10 +1198,13 @@ class SupabaseManager:
             data: Dicionário contendo os campos a serem atualizados
         """
         try:
-            response = self.supabase.table('jurisprudenciaAereo').update(data).eq('id', jurisprudencia_id).execute()
+            response = self._execute(self.supabase.table('jurisprudenciaAereo').update(data).eq('id', jurisprudencia_id))
+            _reference_cache.invalidate('jurisprudenciaAereo')
+            for row in response.data or []:
+                self._sync_jurisprudencia_index(row)
             return response.data
         except Exception as e:
-            print(f"Erro ao atualizar jurisprudência: {str(e)}")
+            logger.error("Erro ao atualizar jurisprudência: %s", e)
             raise e
 
     def delete_jurisprudencia(self, jurisprudencia_id):
@@ -369,30 +1214,158 @@ class SupabaseManager:
             jurisprudencia_id: ID da jurisprudência a ser deletada
         """
         try:
-            response = self.supabase.table('jurisprudenciaAereo').delete().eq('id', jurisprudencia_id).execute()
+            response = self._execute(self.supabase.table('jurisprudenciaAereo').delete().eq('id', jurisprudencia_id))
+            _reference_cache.invalidate('jurisprudenciaAereo')
+            self._sync_jurisprudencia_index(removed_id=jurisprudencia_id)
             return response.data
         except Exception as e:
-            print(f"Erro ao deletar jurisprudência: {str(e)}")
+            logger.error("Erro ao deletar jurisprudência: %s", e)
             raise e
 
-    def get_jurisprudencias_aereo(self):
-        """Busca todas as jurisprudências da tabela jurisprudenciaAereo"""
+    def _get_jurisprudencia_index(self) -> BM25Index:
+        """
+        Retorna o índice BM25 das jurisprudências, construindo-o na primeira chamada
+
+        A reconstrução completa só acontece a cada JURISPRUDENCIA_INDEX_REFRESH_INTERVAL
+        segundos (para ver alterações de outros processos); as escritas deste
+        processo são aplicadas no índice na hora.
+        """
+        state = _jurisprudencia_index_state
+        if state['loaded'] and time.monotonic() - state['loaded_at'] < JURISPRUDENCIA_INDEX_REFRESH_INTERVAL:
+            return _jurisprudencia_index
+
+        with _jurisprudencia_index_lock:
+            if state['loaded'] and time.monotonic() - state['loaded_at'] < JURISPRUDENCIA_INDEX_REFRESH_INTERVAL:
+                return _jurisprudencia_index
+            started = time.perf_counter()
+            rows = self.get_all_jurisprudencias()
+            index = BM25Index(JURISPRUDENCIA_SEARCH_FIELDS)
+            index.add_many(rows)
+            _jurisprudencia_index.replace_with(index)
+            state['loaded'] = True
+            state['loaded_at'] = time.monotonic()
+            logger.info("Índice de jurisprudências construído com %s documentos em %.0f ms",
+                        len(rows), (time.perf_counter() - started) * 1000)
+        return _jurisprudencia_index
+
+    @staticmethod
+    def _sync_jurisprudencia_index(row: Optional[Dict[str, Any]] = None, removed_id: Any = None):
+        """Aplica no índice BM25 uma escrita local na tabela jurisprudenciaAereo"""
+        if not _jurisprudencia_index_state['loaded']:
+            return
+        if removed_id is not None:
+            _jurisprudencia_index.remove(removed_id)
+        if row and row.get('id') is not None:
+            if row.get('texto') is None and row['id'] in _jurisprudencia_index:
+                # Escrita parcial (sem o texto): mantém os campos já indexados
+                row = {**_jurisprudencia_index.get(row['id']), **row}
+            _jurisprudencia_index.add(row)
+
+    @staticmethod
+    def reset_jurisprudencia_index():
+        """Descarta o índice BM25; a próxima busca o reconstrói do banco"""
+        with _jurisprudencia_index_lock:
+            _jurisprudencia_index.clear()
+            _jurisprudencia_index_state.update({'loaded': False, 'loaded_at': 0.0})
+
+    def search_jurisprudencias(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Busca textual nas jurisprudências (nome, seção, tribunal e texto)
+
+        Args:
+            query: Texto da busca (acentos, maiúsculas e plurais são ignorados)
+            limit: Número máximo de resultados
+
+        Returns:
+            Jurisprudências em ordem de relevância, cada uma com a chave 'score'
+        """
         try:
-            response = self.supabase.table('jurisprudenciaAereo').select('*').execute()
-            return response.data
+            hits = self._get_jurisprudencia_index().search(query, limit=limit)
+            return [{**doc, 'score': score} for doc, score in hits]
+        except Exception as e:
+            logger.error("Erro na busca de jurisprudências: %s", e)
+            raise Exception(f"Erro na busca de jurisprudências: {str(e)}")
+
+    def rank_jurisprudencias(self, text: str, sections: List[str],
+                             limit: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Ordena as jurisprudências pela semelhança com os fatos, por seção da petição
+
+        Tudo é calculado localmente (sem chamada ao modelo): similaridade de
+        cosseno TF-IDF com o texto, mais um bônus para as jurisprudências da
+        própria seção.
+
+        Args:
+            text: Fatos do caso (e dados do voo)
+            sections: Nomes das seções (ex.: "Deveres do Transportador")
+            limit: Máximo de jurisprudências por seção (padrão: todas)
+
+        Returns:
+            Seção -> lista de {'id', 'score'} da mais para a menos relevante
+        """
+        try:
+            # A própria lista em cache (não uma cópia): muda só quando é buscada de novo
+            rows = self._all_jurisprudencias()
+            with _jurisprudencia_vectors_lock:
+                if _jurisprudencia_vectors['rows'] is not rows:
+                    started = time.perf_counter()
+                    _jurisprudencia_vectors['index'] = HashedTfidfIndex(rows)
+                    _jurisprudencia_vectors['rows'] = rows
+                    logger.info("Matriz TF-IDF de %s jurisprudências montada em %.0f ms",
+                                len(rows), (time.perf_counter() - started) * 1000)
+                index = _jurisprudencia_vectors['index']
+            return index.rank_for_sections(text, sections, limit=limit)
         except Exception as e:
-            logger.error(f"Erro ao buscar jurisprudências: {str(e)}")
+            logger.error("Erro ao ranquear jurisprudências: %s", e)
+            raise Exception(f"Erro ao ranquear jurisprudências: {str(e)}")
+
+    def get_jurisprudencias_aereo(self, columns: str = JURISPRUDENCIA_LIST_COLUMNS):
+        """Busca todas as jurisprudências da tabela jurisprudenciaAereo
+        
+        Por padrão não traz o "texto"; use get_jurisprudencia_by_id para isso.
+        
+        Args:
+            columns: Colunas a retornar
+        """
+        try:
+            return self._cached_select(
+                ('jurisprudenciaAereo', 'all', columns),
+                lambda: self._execute(self.supabase.table('jurisprudenciaAereo').select(columns)).data
+            )
+        except Exception as e:
+            logger.error("Erro ao buscar jurisprudências: %s", e)
             raise Exception(f"Erro ao buscar jurisprudências: {str(e)}")
 
-    def get_client_by_cpf(self, cpf):
+    def get_jurisprudencia_by_id(self, jurisprudencia_id, columns: str = JURISPRUDENCIA_DETAIL_COLUMNS):
+        """Busca uma jurisprudência com o texto completo pelo ID
+        
+        Args:
+            jurisprudencia_id: ID da jurisprudência
+            columns: Colunas a retornar
+        """
+        try:
+            key = ('jurisprudenciaAereo', 'by_id', jurisprudencia_id, columns)
+            data = _reference_cache.get(key, _MISSING)
+            if data is _MISSING:
+                response = self._execute(self.supabase.table('jurisprudenciaAereo')\
+                    .select(columns)\
+                    .eq('id', jurisprudencia_id))
+                data = response.data[0] if response.data else None
+                _reference_cache.set(key, data)
+            return dict(data) if data else None
+        except Exception as e:
+            logger.error("Erro ao buscar jurisprudência: %s", e)
+            raise Exception(f"Erro ao buscar jurisprudência: {str(e)}")
+
+    def get_client_by_cpf(self, cpf, columns: str = CLIENT_DETAIL_COLUMNS):
         """Busca um cliente pelo CPF"""
         try:
-            response = self.supabase.table('clientes').select('*').eq('cpf', cpf).execute()
+            response = self._execute(self.supabase.table('clientes').select(columns).eq('cpf', cpf))
             if response.data and len(response.data) > 0:
                 return response.data[0]
             return None
         except Exception as e:
-            logger.error(f"Erro ao buscar cliente por CPF: {str(e)}")
+            logger.error("Erro ao buscar cliente por CPF: %s", e)
             return None
 
 def init_supabase() -> Client:
@@ -0,0 +1,204 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from postgrest.utils import SyncClient
+from supabase import create_client, Client
+
+from utils.metrics import add_bytes
+
+from config.settings import (
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    SUPABASE_POOL_MAX_CONNECTIONS,
+    SUPABASE_POOL_MAX_KEEPALIVE,
+    SUPABASE_POOL_KEEPALIVE_EXPIRY
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Contadores do pool de conexões do Supabase"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zera todos os contadores"""
+        with self._lock:
+            self.clients_created = 0
+            self.client_reuses = 0
+            self.requests = 0
+            self.connections_opened = 0
+            self.latency_total = 0.0
+            self.latency_max = 0.0
+
+    def record_client(self, created: bool):
+        with self._lock:
+            if created:
+                self.clients_created += 1
+            else:
+                self.client_reuses += 1
+
+    def record_connection(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_request(self, elapsed: float):
+        with self._lock:
+            self.requests += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+
+    def snapshot(self, pool_size: int) -> Dict[str, Any]:
+        """Retorna uma cópia dos contadores atuais"""
+        with self._lock:
+            requests = self.requests
+            return {
+                'pool_size': pool_size,
+                'max_connections': SUPABASE_POOL_MAX_CONNECTIONS,
+                'max_keepalive_connections': SUPABASE_POOL_MAX_KEEPALIVE,
+                'clients_created': self.clients_created,
+                'client_reuses': self.client_reuses,
+                'requests': requests,
+                'connections_opened': self.connections_opened,
+                'connections_reused': max(requests - self.connections_opened, 0),
+                'latency_avg_ms': (self.latency_total / requests * 1000) if requests else 0.0,
+                'latency_max_ms': self.latency_max * 1000,
+                'latency_total_ms': self.latency_total * 1000
+            }
+
+
+class CountingByteStream(httpx.SyncByteStream):
+    """Stream da resposta que informa às métricas os bytes recebidos"""
+
+    def __init__(self, stream: httpx.SyncByteStream):
+        self._stream = stream
+
+    def __iter__(self):
+        for chunk in self._stream:
+            add_bytes(len(chunk))
+            yield chunk
+
+    def close(self):
+        self._stream.close()
+
+
+class TimedTransport(httpx.HTTPTransport):
+    """Transport HTTP com keep-alive que mede latência e abertura de conexões"""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    def _trace(self, event_name: str, info: Dict[str, Any]):
+        # Só é emitido quando o pool precisa abrir uma conexão TCP nova
+        if event_name == 'connection.connect_tcp.complete':
+            self._stats.record_connection()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions['trace'] = self._trace
+        start = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+            response.stream = CountingByteStream(response.stream)
+            return response
+        finally:
+            self._stats.record_request(time.perf_counter() - start)
+
+    @property
+    def pool_size(self) -> int:
+        """Número de conexões atualmente abertas no pool"""
+        try:
+            return len(self._pool.connections)
+        except AttributeError:
+            return 0
+
+
+class SupabaseClientPool:
+    """
+    Registro do cliente Supabase compartilhado pelo processo
+
+    O Streamlit reexecuta o script a cada interação e cada seção cria seu
+    próprio SupabaseManager. Em vez de um create_client (e um handshake TLS)
+    por instância, todas recebem o mesmo Client, cuja sessão HTTP mantém as
+    conexões vivas entre as reexecuções.
+    """
+
+    def __init__(self, url: str, key: str):
+        self._url = url
+        self._key = key
+        self._lock = threading.Lock()
+        self._client: Optional[Client] = None
+        self._transport: Optional[TimedTransport] = None
+        self.stats = PoolStats()
+
+    def _create_client(self) -> Client:
+        client = create_client(self._url, self._key)
+
+        # Substitui a sessão padrão do postgrest por uma com limites de pool
+        # explícitos e instrumentação de latência
+        old_session = client.postgrest.session
+        self._transport = TimedTransport(
+            self.stats,
+            limits=httpx.Limits(
+                max_connections=SUPABASE_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=SUPABASE_POOL_KEEPALIVE_EXPIRY
+            )
+        )
+        client.postgrest.session = SyncClient(
+            base_url=old_session.base_url,
+            headers=old_session.headers,
+            timeout=old_session.timeout,
+            transport=self._transport
+        )
+        old_session.close()
+
+        logger.info("Cliente Supabase compartilhado criado")
+        return client
+
+    def get_client(self) -> Client:
+        """Retorna o cliente compartilhado, criando-o na primeira chamada"""
+        client = self._client
+        if client is not None:
+            self.stats.record_client(created=False)
+            return client
+
+        with self._lock:
+            if self._client is None:
+                self._client = self._create_client()
+                self.stats.record_client(created=True)
+            else:
+                self.stats.record_client(created=False)
+            return self._client
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do pool (tamanho, reuso e latência)"""
+        pool_size = self._transport.pool_size if self._transport else 0
+        return self.stats.snapshot(pool_size)
+
+    def close(self):
+        """Fecha as conexões do pool; o próximo get_client cria um cliente novo"""
+        with self._lock:
+            if self._client is not None:
+                self._client.postgrest.session.close()
+                self._client = None
+                self._transport = None
+
+
+_pool = SupabaseClientPool(SUPABASE_URL, SUPABASE_KEY)
+
+
+def get_supabase_client() -> Client:
+    """Retorna o cliente Supabase compartilhado pelo processo"""
+    return _pool.get_client()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Retorna os contadores do pool de conexões do Supabase"""
+    return _pool.get_stats()
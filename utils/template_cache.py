@@ -0,0 +1,142 @@
+"""
+Cache dos templates .docx já compilados (CompiledTemplate)
+
+Templates locais (templates/) ficam em memória e só são relidos quando o
+arquivo muda (mtime/tamanho). Templates do Drive (ex.: a petição de atraso
+de voo) ficam em memória e em disco; a cada uso, uma consulta barata aos
+metadados (md5Checksum e modifiedTime) diz se a cópia ainda vale, e o
+arquivo só é baixado de novo quando o template muda no Drive. A cópia em
+disco é conferida pelo md5 do conteúdo, então sobrevive a reinícios do
+processo sem download.
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from googleapiclient.http import MediaIoBaseDownload
+
+from utils.docx_renderer import CompiledTemplate
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateCache:
+    """
+    Templates compilados, locais e do Drive
+
+    Args:
+        cache_dir: Pasta das cópias dos templates do Drive (None: só em memória)
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        # caminho -> ((mtime, tamanho), template)
+        self._local: Dict[str, Tuple[Tuple[int, int], CompiledTemplate]] = {}
+        # ID no Drive -> ((md5Checksum, modifiedTime), template)
+        self._drive: Dict[str, Tuple[Tuple[str, str], CompiledTemplate]] = {}
+
+    def local(self, path: str) -> CompiledTemplate:
+        """Template local, compilado de novo só se o arquivo mudou"""
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        entry = self._local.get(path)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        with self._lock:
+            entry = self._local.get(path)
+            if entry is None or entry[0] != version:
+                entry = self._local[path] = (version, CompiledTemplate.from_path(path))
+                logger.info("Template %s compilado", os.path.basename(path))
+        return entry[1]
+
+    def _disk_path(self, file_id: str) -> str:
+        return os.path.join(self.cache_dir, re.sub(r'[^A-Za-z0-9_-]', '_', file_id) + '.docx')
+
+    def _read_disk(self, file_id: str, md5_checksum: str) -> Optional[bytes]:
+        """Cópia em disco, se o conteúdo bater com o md5 do Drive"""
+        if not self.cache_dir or not md5_checksum:
+            return None
+        try:
+            with open(self._disk_path(file_id), 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning("Cópia local do template %s ilegível: %s", file_id, e)
+            return None
+        return content if hashlib.md5(content).hexdigest() == md5_checksum else None
+
+    def _write_disk(self, file_id: str, content: bytes):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._disk_path(file_id)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Erro ao gravar cópia local do template %s: %s", file_id, e)
+
+    @staticmethod
+    def _download(drive_service, file_id: str) -> bytes:
+        content = io.BytesIO()
+        downloader = MediaIoBaseDownload(content, drive_service.files().get_media(fileId=file_id))
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+        return content.getvalue()
+
+    def drive(self, drive_service, file_id: str) -> CompiledTemplate:
+        """
+        Template do Drive, baixado de novo só quando md5Checksum/modifiedTime mudam
+
+        Se a consulta aos metadados falhar, usa a cópia em memória, se houver.
+        """
+        try:
+            metadata = drive_service.files().get(
+                fileId=file_id, fields='name, md5Checksum, modifiedTime'
+            ).execute()
+        except Exception as e:
+            entry = self._drive.get(file_id)
+            if entry is not None:
+                logger.warning("Erro ao revalidar template %s no Drive, usando a cópia em memória: %s", file_id, e)
+                return entry[1]
+            raise
+
+        version = (metadata.get('md5Checksum') or '', metadata.get('modifiedTime') or '')
+        entry = self._drive.get(file_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with self._lock:
+            entry = self._drive.get(file_id)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            content = self._read_disk(file_id, version[0])
+            if content is None:
+                content = self._download(drive_service, file_id)
+                logger.info("Template %s baixado do Drive (%s bytes)", file_id, len(content))
+                self._write_disk(file_id, content)
+            compiled = CompiledTemplate.from_bytes(content, metadata.get('name') or file_id)
+            self._drive[file_id] = (version, compiled)
+            return compiled
+
+
+_caches: Dict[Optional[str], TemplateCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_template_cache(cache_dir: Optional[str] = None) -> TemplateCache:
+    """Cache compartilhado pelo processo para a pasta informada"""
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = _caches[cache_dir] = TemplateCache(cache_dir)
+        return cache
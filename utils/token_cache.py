@@ -0,0 +1,191 @@
+"""
+Cache do token de acesso da conta de serviço do Google, compartilhado entre
+threads e processos
+
+O token fica num arquivo JSON (permissão 0600), protegido por um lock de
+arquivo (fcntl) para que vários workers não troquem o token ao mesmo
+tempo; sem fcntl (Windows) o lock vale só entre as threads do processo.
+Uma thread em segundo plano renova o token alguns minutos antes de expirar,
+então nenhuma requisição do usuário espera pela troca do token.
+"""
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from google.auth import credentials as google_credentials
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Com menos que isso (s) até expirar, uma requisição troca o token na hora
+MIN_TOKEN_TTL = 60
+
+
+def _utcnow() -> datetime:
+    # O google-auth usa datetimes UTC sem fuso
+    return datetime.utcnow()
+
+
+class SharedTokenCache:
+    """
+    Tokens por chave (conta de serviço + escopos) num arquivo JSON
+
+    Args:
+        path: Arquivo do cache (o lock usa path + '.lock')
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def _lock(self):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.path}.lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Cache de token ilegível em %s, ignorando: %s", self.path, e)
+            return {}
+
+    def _write(self, data: Dict[str, Dict[str, Any]]):
+        """Grava de forma atômica (arquivo temporário + rename), só para o dono"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _usable(entry: Optional[Dict[str, Any]], min_ttl: float, stale_token: Optional[str]) -> bool:
+        if not entry or entry.get('token') is None or entry['token'] == stale_token:
+            return False
+        expiry = datetime.fromisoformat(entry['expiry'])
+        return expiry - _utcnow() > timedelta(seconds=min_ttl)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Token em cache para a chave ({'token', 'expiry'}) ou None"""
+        return self._read().get(key)
+
+    def get_or_refresh(self, key: str, exchange: Callable[[], Tuple[str, datetime]],
+                       min_ttl: float = MIN_TOKEN_TTL, stale_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Token com pelo menos min_ttl segundos de validade, trocando-o se preciso
+
+        Só um processo troca o token por vez; os outros esperam o lock e
+        reaproveitam o token novo gravado no arquivo.
+
+        Args:
+            key: Chave do token
+            exchange: Troca o token de fato; retorna (token, expiry UTC)
+            min_ttl: Validade mínima (s) para reaproveitar o token do cache
+            stale_token: Token que o chamador já sabe que não serve (ex.: após
+                um 401); nunca é devolvido
+        """
+        entry = self.get(key)
+        if self._usable(entry, min_ttl, stale_token):
+            return entry
+        with self._lock():
+            data = self._read()
+            entry = data.get(key)
+            if self._usable(entry, min_ttl, stale_token):
+                return entry
+            token, expiry = exchange()
+            entry = {'token': token, 'expiry': expiry.isoformat()}
+            data[key] = entry
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._write(data)
+            logger.info("Token de acesso do Google renovado (válido até %s UTC)", entry['expiry'])
+            return entry
+
+
+class CachedTokenCredentials(google_credentials.Credentials):
+    """
+    Credenciais que obtêm o token pelo SharedTokenCache
+
+    Args:
+        inner: Credenciais da conta de serviço (fazem a troca do token)
+        cache: Cache compartilhado
+        refresh_margin: Antecedência (s) da renovação em segundo plano
+    """
+
+    def __init__(self, inner, cache: SharedTokenCache, refresh_margin: float = 300):
+        super().__init__()
+        self.inner = inner
+        self.cache = cache
+        self.refresh_margin = refresh_margin
+        self.key = f"{inner.service_account_email}|{' '.join(sorted(inner.scopes or []))}"
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    @property
+    def service_account_email(self) -> str:
+        return self.inner.service_account_email
+
+    def _exchange(self, request) -> Tuple[str, datetime]:
+        self.inner.refresh(request)
+        return self.inner.token, self.inner.expiry
+
+    def _load(self, request, min_ttl: float, stale_token: Optional[str] = None):
+        entry = self.cache.get_or_refresh(self.key, lambda: self._exchange(request), min_ttl, stale_token)
+        with self._lock:
+            self.token = entry['token']
+            self.expiry = datetime.fromisoformat(entry['expiry'])
+
+    def refresh(self, request):
+        """
+        Chamado antes da primeira requisição, com o token vencido ou após um 401
+
+        Se o cache tiver um token diferente do atual e ainda válido (renovado
+        por outra thread ou processo), usa-o; se o cache só tiver o próprio
+        token atual, troca de fato (o token foi recusado).
+        """
+        stale_token = self.token if self.valid else None
+        self._load(request, MIN_TOKEN_TTL, stale_token)
+
+    def start_background_refresh(self, request_factory: Callable[[], Any]):
+        """Renova o token refresh_margin segundos antes de expirar, numa thread daemon"""
+        if self._refresher is not None:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, args=(request_factory,), name='google-token-refresh', daemon=True
+        )
+        self._refresher.start()
+
+    def stop_background_refresh(self):
+        self._stop.set()
+
+    def _refresh_loop(self, request_factory: Callable[[], Any]):
+        request = request_factory()
+        wait = 0.0
+        while not self._stop.wait(wait):
+            try:
+                # Troca só se faltar menos que a margem (ou lê o token renovado por outro processo)
+                self._load(request, self.refresh_margin + MIN_TOKEN_TTL)
+                remaining = (self.expiry - _utcnow()).total_seconds()
+                wait = max(remaining - self.refresh_margin, MIN_TOKEN_TTL)
+            except Exception as e:
+                logger.warning("Falha ao renovar o token do Google em segundo plano: %s", e)
+                wait = 30.0
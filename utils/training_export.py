@@ -0,0 +1,189 @@
+"""
+Exportação dos fatos de treinamento (tabela fatosGPT) em JSONL
+
+Percorre a tabela em páginas por ID e grava cada página assim que chega,
+com memória constante. Com gzip, cada página vira um membro gzip próprio
+(arquivos com vários membros são lidos normalmente por gzip/zcat). Depois de
+cada página o arquivo é sincronizado em disco e o checkpoint é atualizado;
+uma exportação interrompida continua do último ID gravado.
+
+Uso:
+    python -m utils.training_export fatos.jsonl.gz --caso "Atraso de voo" \\
+        --desde 2024-01-01 --ate 2025-01-01 --checkpoint fatos.checkpoint.json
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EXPORT_PAGE_SIZE = 1000
+
+# Formatos de registro
+FORMAT_RAW = 'raw'    # id, caso, created_at, input, output
+FORMAT_CHAT = 'chat'  # {"messages": [...]}, formato de fine-tuning de modelos de chat
+
+
+def to_record(row: Dict[str, Any], record_format: str = FORMAT_RAW) -> Dict[str, Any]:
+    """Converte uma linha de fatosGPT no registro exportado"""
+    if record_format == FORMAT_CHAT:
+        return {'messages': [
+            {'role': 'user', 'content': row.get('input') or ''},
+            {'role': 'assistant', 'content': row.get('output') or ''}
+        ]}
+    return {
+        'id': row.get('id'),
+        'caso': row.get('caso'),
+        'created_at': row.get('created_at'),
+        'input': row.get('input'),
+        'output': row.get('output')
+    }
+
+
+class TrainingExporter:
+    """
+    Exporta fatosGPT em JSONL (opcionalmente gzip) com retomada por checkpoint
+
+    Args:
+        manager: SupabaseManager (usa get_training_facts_page)
+        page_size: Linhas por página/consulta
+    """
+
+    def __init__(self, manager, page_size: int = EXPORT_PAGE_SIZE):
+        self.manager = manager
+        self.page_size = page_size
+
+    def iter_pages(self, caso: str = None, start: str = None, end: str = None,
+                   after_id=None) -> Iterator[List[Dict[str, Any]]]:
+        """Páginas de fatosGPT em ordem de ID, a partir de after_id"""
+        while True:
+            page = self.manager.get_training_facts_page(
+                after_id=after_id, limit=self.page_size, caso=caso, start=start, end=end
+            )
+            if not page:
+                return
+            yield page
+            if len(page) < self.page_size:
+                return
+            after_id = page[-1]['id']
+
+    def export(self, path: str, caso: str = None, start: str = None, end: str = None,
+               compress: Optional[bool] = None, record_format: str = FORMAT_RAW,
+               checkpoint_path: Optional[str] = None,
+               on_progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+        """
+        Grava os registros em path
+
+        Se checkpoint_path existir e for da mesma exportação (mesmo arquivo,
+        filtros e formato), continua de onde parou; senão começa do zero.
+
+        Args:
+            path: Arquivo de saída
+            caso: Filtra pelo tipo de caso
+            start: created_at a partir de (inclusive)
+            end: created_at antes de (exclusive)
+            compress: Gzip; por padrão, se path terminar em .gz
+            record_format: FORMAT_RAW ou FORMAT_CHAT
+            checkpoint_path: Arquivo JSON com o progresso (padrão: path + '.checkpoint')
+            on_progress: Chamada após cada página com o total de registros
+
+        Returns:
+            O checkpoint final: {'last_id', 'records', 'offset', ...}
+        """
+        if compress is None:
+            compress = path.endswith('.gz')
+        checkpoint_path = checkpoint_path or f"{path}.checkpoint"
+        params = {
+            'path': os.path.abspath(path), 'caso': caso, 'start': start, 'end': end,
+            'compress': compress, 'record_format': record_format
+        }
+
+        checkpoint = self._load_checkpoint(checkpoint_path, params)
+        if checkpoint is None:
+            checkpoint = {**params, 'last_id': None, 'records': 0, 'offset': 0, 'done': False}
+        elif checkpoint['done']:
+            logger.info("Exportação para %s já concluída (%s registros)", path, checkpoint['records'])
+            return checkpoint
+        else:
+            logger.info("Retomando exportação para %s após o ID %s", path, checkpoint['last_id'])
+
+        with open(path, 'ab') as output:
+            # Descarta o que foi gravado depois do último checkpoint (página incompleta)
+            output.truncate(checkpoint['offset'])
+            output.seek(checkpoint['offset'])
+
+            for page in self.iter_pages(caso, start, end, after_id=checkpoint['last_id']):
+                data = ''.join(
+                    json.dumps(to_record(row, record_format), ensure_ascii=False) + '\n' for row in page
+                ).encode('utf-8')
+                output.write(gzip.compress(data) if compress else data)
+                output.flush()
+                os.fsync(output.fileno())
+
+                checkpoint['last_id'] = page[-1]['id']
+                checkpoint['records'] += len(page)
+                checkpoint['offset'] = output.tell()
+                self._save_checkpoint(checkpoint_path, checkpoint)
+                if on_progress:
+                    on_progress(checkpoint['records'])
+
+        checkpoint['done'] = True
+        self._save_checkpoint(checkpoint_path, checkpoint)
+        logger.info("Exportados %s registros de fatosGPT para %s", checkpoint['records'], path)
+        return checkpoint
+
+    @staticmethod
+    def _load_checkpoint(checkpoint_path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(checkpoint_path):
+            return None
+        try:
+            with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Checkpoint ilegível em %s, exportando do início: %s", checkpoint_path, e)
+            return None
+        if any(checkpoint.get(key) != value for key, value in params.items()):
+            logger.warning("Checkpoint %s é de outra exportação; exportando do início", checkpoint_path)
+            return None
+        if not os.path.exists(params['path']) or os.path.getsize(params['path']) < checkpoint['offset']:
+            logger.warning("Arquivo %s menor que o checkpoint; exportando do início", params['path'])
+            return None
+        return checkpoint
+
+    @staticmethod
+    def _save_checkpoint(checkpoint_path: str, checkpoint: Dict[str, Any]):
+        """Grava o checkpoint de forma atômica (arquivo temporário + rename)"""
+        tmp_path = f"{checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, checkpoint_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta os fatos de treinamento (fatosGPT) em JSONL")
+    parser.add_argument('path', help="Arquivo de saída (.jsonl ou .jsonl.gz)")
+    parser.add_argument('--caso', help="Filtra pelo tipo de caso")
+    parser.add_argument('--desde', help="created_at a partir de (inclusive), ex.: 2024-01-01")
+    parser.add_argument('--ate', help="created_at antes de (exclusive), ex.: 2025-01-01")
+    parser.add_argument('--formato', choices=[FORMAT_RAW, FORMAT_CHAT], default=FORMAT_RAW)
+    parser.add_argument('--checkpoint', help="Arquivo de checkpoint (padrão: <path>.checkpoint)")
+    parser.add_argument('--page-size', type=int, default=EXPORT_PAGE_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from utils.supabase_manager import SupabaseManager
+
+    exporter = TrainingExporter(SupabaseManager(), page_size=args.page_size)
+    exporter.export(
+        args.path, caso=args.caso, start=args.desde, end=args.ate,
+        record_format=args.formato, checkpoint_path=args.checkpoint
+    )
+
+
+if __name__ == '__main__':
+    main()